@@ -1,8 +1,58 @@
 # app/auth_utils.py
 
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
 import jwt
+from .services.scope import get_scope_version
+
+
+class Principal:
+    """
+    The authenticated user of the current request.
+
+    Built from the claims issued by auth.login, so handlers can read the
+    user's ID and role without looking the user up again.
+    """
+
+    def __init__(self, user_id, username, role, scope_version):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.scope_version = scope_version
+
+
+# Verified tokens, so repeated requests skip HMAC verification until expiry
+_token_cache_lock = threading.Lock()
+_verified_tokens = OrderedDict()  # token -> claims
+
+
+def _get_verified_claims(token):
+    """Return cached claims for a token that has already been verified and has not expired"""
+    with _token_cache_lock:
+        claims = _verified_tokens.get(token)
+        if claims is None:
+            return None
+        if claims['exp'] <= time.time():
+            del _verified_tokens[token]
+            return None
+        _verified_tokens.move_to_end(token)
+        return claims
+
+
+def _cache_verified_claims(token, claims):
+    """Remember a verified token, evicting the least recently used one when full"""
+    max_size = current_app.config.get('TOKEN_CACHE_SIZE', 1024)
+    if max_size <= 0 or 'exp' not in claims:
+        return
+    with _token_cache_lock:
+        _verified_tokens[token] = claims
+        _verified_tokens.move_to_end(token)
+        while len(_verified_tokens) > max_size:
+            _verified_tokens.popitem(last=False)
+
 
 def token_required(f):
     @wraps(f)
@@ -16,12 +66,26 @@ def token_required(f):
         if not token:
             return jsonify({'error': 'Token missing'}), 401
 
-        try:
-            jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'error': 'Invalid token'}), 401
+        claims = _get_verified_claims(token)
+        if claims is None:
+            try:
+                claims = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
+            except jwt.ExpiredSignatureError:
+                return jsonify({'error': 'Token expired'}), 401
+            except jwt.InvalidTokenError:
+                return jsonify({'error': 'Invalid token'}), 401
+
+            if 'user_id' not in claims or 'role' not in claims:
+                return jsonify({'error': 'Invalid token'}), 401
+
+            _cache_verified_claims(token, claims)
+
+        g.principal = Principal(
+            user_id=claims['user_id'],
+            username=claims.get('username'),
+            role=claims['role'],
+            scope_version=get_scope_version()
+        )
 
         return f(*args, **kwargs)
     return decorated
@@ -0,0 +1,78 @@
+# app/cache_utils.py
+
+import hashlib
+from functools import wraps
+from flask import request, current_app, make_response, g
+from .services.watermark import get_data_watermark
+
+# Tables that decide which clients a user can see, part of every watermark
+SCOPE_TABLES = ('client', 'directoraccountexecutive')
+
+
+def _build_etag(watermark):
+    """Hash the request, the requesting user and the data watermark into an ETag"""
+    principal = g.get('principal')
+    # Only values that are the same in every worker process; scope changes
+    # are already part of the watermark through SCOPE_TABLES
+    identity = (principal.user_id, principal.role) if principal else None
+    key = repr((
+        request.path,
+        sorted(request.args.items(multi=True)),
+        identity,
+        watermark
+    ))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Responses depend on the user, and must be revalidated before reuse
+    response.vary.add('Authorization')
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional_get(*table_names):
+    """
+    Answer repeat GET requests with 304 Not Modified while the data is unchanged
+
+    Adds ETag and Last-Modified headers derived from the watermark of the
+    given tables. Apply below token_required so the ETag covers the user.
+    Both only depend on committed database state, so every worker process
+    answers a revalidation the same way. Last-Modified has one second
+    resolution, so If-None-Match is preferred when a client sends both.
+
+    Args:
+        table_names: Names of the tables the endpoint reads
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not current_app.config.get('CONDITIONAL_GET_ENABLED', True):
+                return f(*args, **kwargs)
+
+            result = get_data_watermark(table_names + SCOPE_TABLES)
+            if result is None:
+                return f(*args, **kwargs)
+            watermark, last_modified = result
+            etag = _build_etag(watermark)
+
+            # If-None-Match takes precedence over If-Modified-Since
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = (
+                    request.if_modified_since is not None
+                    and last_modified <= request.if_modified_since
+                )
+            if not_modified:
+                return _set_validators(current_app.response_class(status=304), etag, last_modified)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified)
+            return response
+        return decorated
+    return decorator
@@ -4,12 +4,54 @@ Configuration Module
 This module defines configuration for the application.
 It uses environment variables loaded from a .env file to
 configure the application, especially database connections.
+
+Settings are read when they are first accessed (e.g. by
+app.config.from_object), not when this module is imported, and the .env
+file is only loaded at that point.
 """
 import os
-from dotenv import load_dotenv
+import threading
+
+_environment_lock = threading.Lock()
+_environment_loaded = False
+
+
+def load_environment():
+    """Load environment variables from the .env file, once per process"""
+    global _environment_loaded
+    with _environment_lock:
+        if not _environment_loaded:
+            # Imported here so importing the config doesn't pay for python-dotenv
+            from dotenv import load_dotenv
+            load_dotenv()
+            _environment_loaded = True
+
+
+def as_bool(value):
+    """Parse a 'true'/'false' environment value"""
+    return str(value).lower() == 'true'
+
+
+class EnvSetting:
+    """
+    A setting read from an environment variable on access.
+
+    Works as a class attribute, so Config.NAME and app.config.from_object
+    both see the current value after the .env file has been loaded.
+    """
+
+    def __init__(self, name, default=None, cast=None):
+        self.name = name
+        self.default = default
+        self.cast = cast
+
+    def __get__(self, instance, owner):
+        load_environment()
+        value = os.getenv(self.name, self.default)
+        if self.cast is not None and value is not None:
+            return self.cast(value)
+        return value
 
-# Load environment variables from .env file
-load_dotenv()
 
 class Config:
     """
@@ -18,12 +60,72 @@ class Config:
     This class contains settings common to all environments.
     """
     # Database configuration
-    SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI')
+    SQLALCHEMY_DATABASE_URI = EnvSetting('SQLALCHEMY_DATABASE_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # Disable event system for performance
     
     # Development mode enabled by default
     DEBUG = True
-    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
+    JWT_SECRET_KEY = EnvSetting('JWT_SECRET_KEY')
+
+    # Number of verified JWTs remembered to skip repeated signature checks
+    TOKEN_CACHE_SIZE = EnvSetting('TOKEN_CACHE_SIZE', 1024, int)
+
+    # Seconds a resolved director/AE client scope may be served from cache
+    SCOPE_CACHE_TTL = EnvSetting('SCOPE_CACHE_TTL', 300, int)
+
+    # How user scope is applied to queries: 'subquery' or 'id-list'
+    SCOPE_STRATEGY = EnvSetting('SCOPE_STRATEGY', 'subquery')
+
+    # Worker threads used by /api/landing/dashboard to compute sections concurrently
+    LANDING_DASHBOARD_WORKERS = EnvSetting('LANDING_DASHBOARD_WORKERS', 5, int)
+
+    # Landing chart rollups (see app/services/rollups.py)
+    ROLLUPS_ENABLED = EnvSetting('ROLLUPS_ENABLED', 'true', as_bool)
+    ROLLUP_MAX_AGE = EnvSetting('ROLLUP_MAX_AGE', 900, int)  # Seconds before rollups count as stale
+    ROLLUP_STATE_CHECK_INTERVAL = EnvSetting('ROLLUP_STATE_CHECK_INTERVAL', 30, int)
+
+    # Seconds a ranked AE leaderboard may be served from cache
+    LEADERBOARD_CACHE_TTL = EnvSetting('LEADERBOARD_CACHE_TTL', 300, int)
+
+    # Seconds a quarterly target attainment result may be served from cache
+    TARGETS_CACHE_TTL = EnvSetting('TARGETS_CACHE_TTL', 300, int)
+
+    # /api/clients/clients pagination and streaming
+    CLIENTS_PAGE_SIZE = EnvSetting('CLIENTS_PAGE_SIZE', 1000, int)
+    CLIENTS_MAX_PAGE_SIZE = EnvSetting('CLIENTS_MAX_PAGE_SIZE', 1000, int)
+    CLIENTS_STREAM_BATCH_SIZE = EnvSetting('CLIENTS_STREAM_BATCH_SIZE', 500, int)
+    CLIENTS_COUNT_CACHE_TTL = EnvSetting('CLIENTS_COUNT_CACHE_TTL', 300, int)  # Seconds a cached total_count is reused
+
+    # ETag/Last-Modified support on read endpoints (see app/cache_utils.py)
+    CONDITIONAL_GET_ENABLED = EnvSetting('CONDITIONAL_GET_ENABLED', 'true', as_bool)
+    WATERMARK_CHECK_INTERVAL = EnvSetting('WATERMARK_CHECK_INTERVAL', 5, int)  # Seconds between watermark reads
+
+    # /ai-insight question -> SQL translation cache (see app/services/translation_cache.py)
+    AI_TRANSLATION_CACHE_SIZE = EnvSetting('AI_TRANSLATION_CACHE_SIZE', 512, int)
+    AI_TRANSLATION_CACHE_TTL = EnvSetting('AI_TRANSLATION_CACHE_TTL', 86400, int)  # Seconds
+    AI_TRANSLATION_CACHE_PATH = EnvSetting('AI_TRANSLATION_CACHE_PATH', '')  # SQLite file, empty for memory only
+
+    # Limits for executing /ai-insight generated SQL (see app/services/ai_query.py)
+    AI_SQL_STATEMENT_TIMEOUT_MS = EnvSetting('AI_SQL_STATEMENT_TIMEOUT_MS', 10000, int)
+    AI_SQL_MAX_ROWS = EnvSetting('AI_SQL_MAX_ROWS', 1000, int)
+    AI_DIGEST_TOP_N = EnvSetting('AI_DIGEST_TOP_N', 10, int)  # Rows included in the summary prompt
+
+    # EXPLAIN budget for /ai-insight generated SQL (planner cost units and estimated rows)
+    AI_SQL_MAX_COST = EnvSetting('AI_SQL_MAX_COST', 1000000, float)
+    AI_SQL_MAX_ESTIMATED_ROWS = EnvSetting('AI_SQL_MAX_ESTIMATED_ROWS', 100000, int)
+    AI_SQL_ROW_BUDGET_ACTION = EnvSetting('AI_SQL_ROW_BUDGET_ACTION', 'limit')  # 'limit' or 'reject'
+
+    # Separate pool for ad-hoc analytics queries (see app/services/analytics_engine.py)
+    ANALYTICS_DATABASE_URI = EnvSetting('ANALYTICS_DATABASE_URI')  # Should use a read-only role
+    ANALYTICS_POOL_SIZE = EnvSetting('ANALYTICS_POOL_SIZE', 2, int)
+    ANALYTICS_MAX_OVERFLOW = EnvSetting('ANALYTICS_MAX_OVERFLOW', 0, int)
+    ANALYTICS_POOL_TIMEOUT = EnvSetting('ANALYTICS_POOL_TIMEOUT', 5, int)  # Seconds to wait for a connection
+    ANALYTICS_MAX_CONCURRENCY = EnvSetting('ANALYTICS_MAX_CONCURRENCY', 2, int)
+    ANALYTICS_QUEUE_TIMEOUT = EnvSetting('ANALYTICS_QUEUE_TIMEOUT', 5, int)  # Seconds to wait for a query slot
+
+    # Cache of executed /ai-insight queries: rows, plan estimate and summary
+    AI_RESULT_CACHE_SIZE = EnvSetting('AI_RESULT_CACHE_SIZE', 256, int)  # Entries
+    AI_RESULT_CACHE_MAX_ROWS = EnvSetting('AI_RESULT_CACHE_MAX_ROWS', 50000, int)  # Rows across all entries
 
 class DevelopmentConfig(Config):
     """
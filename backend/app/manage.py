@@ -0,0 +1,89 @@
+"""
+Management Commands
+
+Database maintenance commands that run outside the web application.
+Run from the backend directory:
+
+    python -m app.manage migrate              Apply pending SQL migrations
+    python -m app.manage migration-status     List applied and pending migrations
+    python -m app.manage explain USERNAME     Print EXPLAIN plans of the landing/executives queries
+    python -m app.manage refresh-rollups      Refresh the landing page rollup views
+"""
+import time
+import click
+from flask import Flask
+from flask.cli import FlaskGroup
+from .config import config
+from .models.models import db
+from .services.migrations import apply_migrations, get_applied_versions, get_migration_files
+from .services.query_plans import explain_hot_paths
+from .services.rollups import refresh_rollups
+
+
+def create_cli_app():
+    """Create a minimal app with the database configured, for running commands"""
+    app = Flask(__name__)
+    app.config.from_object(config['default'])
+    db.init_app(app)
+    return app
+
+
+cli = FlaskGroup(create_app=create_cli_app, add_default_commands=False)
+
+
+@cli.command('migrate')
+def migrate_command():
+    """Apply pending SQL migrations."""
+    applied = apply_migrations()
+    if not applied:
+        click.echo("No pending migrations.")
+    for version in applied:
+        click.echo(f"Applied {version}")
+
+
+@cli.command('migration-status')
+def migration_status_command():
+    """List applied and pending migrations."""
+    applied = get_applied_versions()
+    for version, _ in get_migration_files():
+        status = 'applied' if version in applied else 'pending'
+        click.echo(f"{version}: {status}")
+
+
+@cli.command('explain')
+@click.argument('username')
+@click.option('--year', type=int, default=2024, help='Fiscal year to run the queries for.')
+@click.option('--analyze', is_flag=True, help='Run EXPLAIN ANALYZE (executes the queries).')
+def explain_command(username, year, analyze):
+    """Print the EXPLAIN plan of every landing/executives query for USERNAME."""
+    try:
+        results = explain_hot_paths(username, year, analyze)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for name, plans in results:
+        click.echo(f"=== {name} ({len(plans)} statements)")
+        for statement, plan in plans:
+            click.echo(statement)
+            click.echo(plan)
+            click.echo()
+
+
+@cli.command('refresh-rollups')
+@click.option('--interval', type=int, default=0,
+              help='Keep running and refresh every INTERVAL seconds (0 refreshes once).')
+@click.option('--blocking', is_flag=True,
+              help='Use a plain REFRESH that locks out readers instead of CONCURRENTLY.')
+def refresh_rollups_command(interval, blocking):
+    """Refresh the landing page rollup views, e.g. from cron or as a scheduler process."""
+    while True:
+        timings = refresh_rollups(concurrently=not blocking)
+        for name, seconds in timings.items():
+            click.echo(f"{name}: {seconds}s")
+        if interval <= 0:
+            break
+        time.sleep(interval)
+
+
+if __name__ == '__main__':
+    cli()
@@ -64,6 +64,12 @@ class DirectorAccountExecutive(db.Model):
     account_executive_id = db.Column(db.Integer, db.ForeignKey('user.user_id'), primary_key=True)
     director_id = db.Column(db.Integer, db.ForeignKey('user.user_id'), nullable=False)
     
+    # Table constraints
+    __table_args__ = (
+        # Serves scope resolution (all AEs of a director)
+        db.Index('ix_directoraccountexecutive_director', 'director_id', 'account_executive_id'),
+    )
+    
     def to_dict(self):
         """Convert relationship to dictionary for API responses"""
         return {
@@ -89,6 +95,24 @@ class Client(db.Model):
     province = db.Column(db.String(2))  # Canadian province code (2 letters)
     industry = db.Column(db.String(50))
     created_date = db.Column(db.Date, nullable=False, default=datetime.utcnow)
+    
+    # Lower-cased industry maintained by PostgreSQL, for indexed case-insensitive filtering
+    industry_normalized = db.Column(db.String(50), db.Computed("lower(industry)", persisted=True))
+
+    # Table constraints
+    __table_args__ = (
+        # Serves scope resolution (all clients of an AE)
+        db.Index('ix_client_account_executive', 'account_executive_id', 'client_id'),
+        # Serves keyset pagination of /api/clients/clients
+        db.Index('ix_client_name_id', 'client_name', 'client_id'),
+        # Serves the industry filter of /api/clients/clients
+        db.Index('ix_client_industry_normalized', 'industry_normalized'),
+        # Serves substring/prefix name search (requires the pg_trgm extension)
+        db.Index(
+            'ix_client_name_trgm', 'client_name',
+            postgresql_using='gin', postgresql_ops={'client_name': 'gin_trgm_ops'}
+        ),
+    )
 
     # Relationships
     # Currently commented out to simplify the initial implementation
@@ -167,6 +191,13 @@ class Opportunity(db.Model):
     created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     last_modified_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Table constraints
+    __table_args__ = (
+        # Covers the pipeline KPI and chart (filtered by client and creation date)
+        db.Index('ix_opportunity_client_created', 'client_id', 'created_date',
+                 postgresql_include=['forecast_category', 'amount', 'probability']),
+    )
+
     # Relationships
     # Currently commented out to simplify the initial implementation
     # signings = db.relationship('Signing', backref='opportunity', lazy='dynamic')
@@ -211,6 +242,14 @@ class Signing(db.Model):
     total_contract_value = db.Column(db.Numeric(15, 2), nullable=False)  # Total value over contract term
     incremental_acv = db.Column(db.Numeric(15, 2))  # Annual Contract Value increment
     
+    # Total contract value divided by the contract length in calendar years (at least 1).
+    # Stored generated column, see migrations/0001_signing_annualized_value.sql
+    annualized_value = db.Column(db.Numeric, db.Computed(
+        "total_contract_value / "
+        "GREATEST(EXTRACT(year FROM end_date) - EXTRACT(year FROM start_date) + 1, 1)",
+        persisted=True
+    ))
+    
     # Date fields
     start_date = db.Column(db.Date, nullable=False)  # Contract start date
     end_date = db.Column(db.Date, nullable=False)  # Contract end date
@@ -220,6 +259,13 @@ class Signing(db.Model):
     fiscal_year = db.Column(db.Integer, nullable=False)
     fiscal_quarter = db.Column(db.Integer, nullable=False)  # Values: 1-4
 
+    # Table constraints
+    __table_args__ = (
+        # Covers the signings KPI and chart (filtered by client and fiscal year)
+        db.Index('ix_signing_client_year', 'client_id', 'fiscal_year',
+                 postgresql_include=['fiscal_quarter', 'product_id', 'annualized_value']),
+    )
+
     # Relationships
     # Currently commented out to simplify the initial implementation
     # revenue = db.relationship('Revenue', backref='signing', lazy='dynamic')
@@ -233,6 +279,7 @@ class Signing(db.Model):
             'product_id': self.product_id,
             'total_contract_value': float(self.total_contract_value) if self.total_contract_value else None,
             'incremental_acv': float(self.incremental_acv) if self.incremental_acv else None,
+            'annualized_value': float(self.annualized_value) if self.annualized_value else None,
             'start_date': self.start_date.strftime('%Y-%m-%d') if self.start_date else None,
             'end_date': self.end_date.strftime('%Y-%m-%d') if self.end_date else None,
             'signing_date': self.signing_date.strftime('%Y-%m-%d') if self.signing_date else None,
@@ -266,6 +313,13 @@ class Revenue(db.Model):
     # Financial data
     amount = db.Column(db.Numeric(15, 2), nullable=False)  # Dollar amount of revenue
     
+    # Table constraints
+    __table_args__ = (
+        # Covers the revenue KPI and chart (filtered by client and fiscal year)
+        db.Index('ix_revenue_client_year', 'client_id', 'fiscal_year',
+                 postgresql_include=['month', 'amount']),
+    )
+    
     def to_dict(self):
         """Convert revenue object to dictionary for API responses"""
         return {
@@ -310,6 +364,9 @@ class Win(db.Model):
     __table_args__ = (
         # Ensures only one win per category/level/year for each client
         db.UniqueConstraint('client_id', 'win_category', 'win_level', 'fiscal_year', name='unique_win_per_category_level_year'),
+        # Covers the wins KPI and chart (filtered by client and fiscal year)
+        db.Index('ix_win_client_year', 'client_id', 'fiscal_year',
+                 postgresql_include=['fiscal_quarter', 'win_multiplier']),
     )
     
     def to_dict(self):
@@ -1,17 +1,43 @@
-from flask import Blueprint, jsonify, request
-from sqlalchemy import text
-from openai import OpenAI
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+import json
 import os
-from app.models.models import db  
+import threading
+from app.services.translation_cache import TranslationCache, get_translation_cache
+from app.services.ai_query import (
+    execute_generated_sql, build_result_digest, guard_generated_sql, QueryBudgetExceeded,
+    is_read_only_select
+)
+from app.services.question_templates import match_question
+from app.services.ai_result_cache import make_result_key, get_result_version, get_result_cache, lookup_result
 
 ai_bp = Blueprint('ai_bp', __name__)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-@ai_bp.route('/ai-insight', methods=['POST'])
-def ai_insight():
-    user_query = request.json['query']
+# OpenAI client, created on first use so importing this module stays cheap
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """
+    Return the shared OpenAI client, importing and creating it on first use
 
-    SCHEMA_CONTEXT = """
+    OPENAI_BASE_URL points the client at another OpenAI-compatible server,
+    e.g. scripts/fake_completion_server.py for local testing.
+    """
+    global _openai_client
+    with _openai_client_lock:
+        if _openai_client is None:
+            from openai import OpenAI
+            from app.config import load_environment
+            load_environment()
+            _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=os.getenv("OPENAI_BASE_URL") or None)
+        return _openai_client
+
+
+# Model used to translate questions into SQL
+SQL_MODEL = "gpt-3.5-turbo"
+
+SCHEMA_CONTEXT = """
 You are an expert data analyst. Use the following schema to generate SQL queries in PostgreSQL that answer user questions. The goal is to provide sales insights from the database.
 
 Schema:
@@ -65,6 +91,7 @@ Schema:
 - product_id: Foreign key to product table
 - total_contract_value: Total monetary value of the contract
 - incremental_acv: Annual Contract Value increment
+- annualized_value: total_contract_value divided by the contract length in years (use for annual signing value)
 - start_date: Contract start date
 - end_date: Contract end date
 - signing_date: Date when the contract was signed
@@ -187,55 +214,315 @@ WHERE fiscal_quarter = 1 AND fiscal_year = 2024
 GROUP BY client.client_name  
 ORDER BY total_revenue DESC;
 """
+
+SUMMARY_MODEL = "gpt-3.5-turbo"
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that summarizes query results for business insights."
+
+MISSING_CLIENT_NAME_INSIGHT = "The query returned client_id without client_name, which might indicate missing joins or deleted records."
+
+
+class Translation:
+    """SQL for a question and which translator produced it."""
+
+    def __init__(self, sql, source, params=None, cache_key=None):
+        self.sql = sql
+        self.source = source  # 'template', 'cache' or 'llm'
+        self.params = params or {}
+        self.cache_key = cache_key
+
+
+def translate_with_templates(user_query):
+    """Pre-vetted SQL for recognized questions, without calling the LLM"""
+    match = match_question(user_query)
+    if match is None:
+        return None
+    return Translation(match.sql, 'template', params=match.params)
+
+
+def translate_from_cache(user_query):
+    """SQL generated earlier for the same question"""
+    cache_key = TranslationCache.make_key(user_query, SQL_MODEL + SCHEMA_CONTEXT)
+    sql_query = get_translation_cache().get(cache_key)
+    if sql_query is None:
+        return None
+    return Translation(sql_query, 'cache', cache_key=cache_key)
+
+
+def translate_with_llm(user_query):
+    """Ask the LLM to write the SQL"""
+    completion = get_openai_client().chat.completions.create(
+        model=SQL_MODEL,
+        messages=[
+            {"role": "system", "content": SCHEMA_CONTEXT},
+            {"role": "user", "content": f"Convert this into a PostgreSQL SQL query: {user_query}"}
+        ],
+        temperature=0,
+        max_tokens=300
+    )
+
+    sql_query = completion.choices[0].message.content.strip()
+    sql_query = sql_query.replace("```sql", "").replace("```", "").strip()
+    cache_key = TranslationCache.make_key(user_query, SQL_MODEL + SCHEMA_CONTEXT)
+    return Translation(sql_query, 'llm', cache_key=cache_key)
+
+
+# Translators tried in order, the first one returning a Translation wins
+TRANSLATORS = [translate_with_templates, translate_from_cache, translate_with_llm]
+
+# Number of questions answered by each translator source
+_translation_counts = {'template': 0, 'cache': 0, 'llm': 0}
+_translation_counts_lock = threading.Lock()
+
+
+def translate_question(user_query):
+    """Translate a question into SQL with the first translator that recognizes it"""
+    for translator in TRANSLATORS:
+        translation = translator(user_query)
+        if translation is not None:
+            with _translation_counts_lock:
+                _translation_counts[translation.source] = _translation_counts.get(translation.source, 0) + 1
+            return translation
+    raise ValueError("No translator could handle the question")
+
+
+def remember_translation(user_query, translation):
+    """Cache LLM generated SQL once it has run successfully"""
+    if translation.source == 'llm':
+        get_translation_cache().set(translation.cache_key, user_query, translation.sql)
+
+
+def is_unsafe_sql(sql_query):
+    return not is_read_only_select(sql_query)
+
+
+def is_missing_client_name(result_data):
+    return bool(result_data) and 'client_id' in result_data[0] and 'client_name' not in result_data[0]
+
+
+def summary_messages(user_query, digest):
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"User question: {user_query}\nQuery result digest: {json.dumps(digest, default=str)}\n\nSummarize this insight in plain language using names, not IDs."}
+    ]
+
+
+def lookup_cached_outcome(translation):
+    """
+    Find the cached outcome of a translation's SQL
+
+    Returns:
+        Tuple of (cache key, cached outcome or None)
+    """
+    result_key = make_result_key(translation.sql, translation.params)
+    return result_key, lookup_result(result_key)
+
+
+def store_outcome(result_key, result_version, outcome):
+    """
+    Cache the rows, plan estimate and summary of an executed query
+
+    result_version comes from get_result_version() before the query ran,
+    so changes made while it ran are not hidden. None means not cacheable.
+    """
+    if result_version is not None:
+        tables, version = result_version
+        get_result_cache().set(result_key, tables, version, outcome, len(outcome['result'].rows))
+
+
+def insight_response(outcome, translation, result_cache_hit):
+    result = outcome['result']
+    return {
+        'insight': outcome['insight'],
+        'sql_used': outcome['sql_used'],
+        'data_preview': result.as_dicts(5),
+        'row_count': len(result.rows),
+        'truncated': result.truncated,
+        'plan_estimate': outcome['plan_estimate'],
+        'cache_hit': translation.source == 'cache',
+        'translation_source': translation.source,
+        'result_cache_hit': result_cache_hit
+    }
+
+
+@ai_bp.route('/ai-insight', methods=['POST'])
+def ai_insight():
+    user_query = request.json['query']
+
     try:
-        completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": SCHEMA_CONTEXT},
-                {"role": "user", "content": f"Convert this into a PostgreSQL SQL query: {user_query}"}
-            ],
-            temperature=0,
-            max_tokens=300
-        )
-
-        sql_query = completion.choices[0].message.content.strip()
-        sql_query = sql_query.replace("```sql", "").replace("```", "").strip()
+        # Templates first, then cached translations, then the LLM
+        translation = translate_question(user_query)
+        sql_query = translation.sql
+        cache_hit = translation.source == 'cache'
+
+        if is_unsafe_sql(sql_query):
+            return jsonify({'error': 'Unsafe query detected.', 'sql_used': sql_query, 'cache_hit': cache_hit})
+
+        # Identical SQL over unchanged tables needs no database or LLM work
+        result_key, outcome = lookup_cached_outcome(translation)
+        if outcome is not None:
+            remember_translation(user_query, translation)
+            return jsonify(insight_response(outcome, translation, result_cache_hit=True))
 
         print("Running SQL:\n", sql_query)
 
-        if any(word in sql_query.lower() for word in ["drop", "delete", "insert", "update"]):
-            return jsonify({'error': 'Unsafe query detected.', 'sql_used': sql_query})
+        # Reject (or LIMIT) queries the planner estimates to be over budget
+        try:
+            sql_query, plan_estimate = guard_generated_sql(sql_query, translation.params)
+        except QueryBudgetExceeded as e:
+            return jsonify({'error': str(e), 'sql_used': sql_query, 'plan_estimate': e.estimate, 'cache_hit': cache_hit})
 
-        result = db.session.execute(text(sql_query))
-        rows = result.fetchall()
-        colnames = result.keys()
-        result_data = [dict(zip(colnames, row)) for row in rows]
+        # Version of the tables the plan scans, read before the query runs
+        result_version = get_result_version(plan_estimate)
 
-        if result_data and all(k in result_data[0] for k in ['client_id']) and 'client_name' not in result_data[0]:
-            return jsonify({
-                'insight': "The query returned client_id without client_name, which might indicate missing joins or deleted records.",
-                'sql_used': sql_query,
-                'data_preview': result_data[:5]
-            })
+        # Read-only, time-limited and row-capped execution
+        result = execute_generated_sql(sql_query, translation.params)
+
+        # Only cache SQL that ran successfully
+        remember_translation(user_query, translation)
+
+        if is_missing_client_name(result.as_dicts(1)):
+            insight = MISSING_CLIENT_NAME_INSIGHT
+        else:
+            # The summarizer gets a compact digest instead of every row
+            digest = build_result_digest(result)
+
+            summary_completion = get_openai_client().chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=summary_messages(user_query, digest),
+                temperature=0.7,
+                max_tokens=150
+            )
 
-        summary_completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that summarizes query results for business insights."},
-                {"role": "user", "content": f"User question: {user_query}\nQuery result: {result_data}\n\nSummarize this insight in plain language using names, not IDs."}
-            ],
-            temperature=0.7,
-            max_tokens=150
-        )
+            insight = summary_completion.choices[0].message.content.strip()
 
-        insight = summary_completion.choices[0].message.content.strip()
+        outcome = {'sql_used': sql_query, 'result': result, 'plan_estimate': plan_estimate, 'insight': insight}
+        store_outcome(result_key, result_version, outcome)
 
-        return jsonify({
-            'insight': insight,
-            'sql_used': sql_query,
-            'data_preview': result_data[:5]
-        })
+        return jsonify(insight_response(outcome, translation, result_cache_hit=False))
 
     except Exception as e:
         print("Error:", e)
-        return jsonify({'error': str(e)})
\ No newline at end of file
+        return jsonify({'error': str(e)})
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@ai_bp.route('/ai-insight/stream', methods=['POST'])
+def ai_insight_stream():
+    """
+    Streaming variant of /ai-insight using Server-Sent Events
+
+    Events, in order:
+    - sql: {"sql_used", "cache_hit", "translation_source"} once the SQL is generated
+    - rows: {"row_count", "truncated", "plan_estimate", "result_cache_hit"} once the query has run
+    - preview: {"data_preview"} with the first rows
+    - token: {"text"} for each summary token as it arrives
+    - done: {"insight"} with the full summary
+    - error: {"error", ...} if any step fails, ending the stream
+    """
+    user_query = request.json['query']
+
+    def generate():
+        try:
+            translation = translate_question(user_query)
+            sql_query = translation.sql
+            yield sse_event('sql', {
+                'sql_used': sql_query,
+                'cache_hit': translation.source == 'cache',
+                'translation_source': translation.source
+            })
+
+            if is_unsafe_sql(sql_query):
+                yield sse_event('error', {'error': 'Unsafe query detected.', 'sql_used': sql_query})
+                return
+
+            result_key, outcome = lookup_cached_outcome(translation)
+            if outcome is not None:
+                remember_translation(user_query, translation)
+                response = insight_response(outcome, translation, result_cache_hit=True)
+                yield sse_event('rows', {
+                    'row_count': response['row_count'],
+                    'truncated': response['truncated'],
+                    'plan_estimate': response['plan_estimate'],
+                    'result_cache_hit': True
+                })
+                yield sse_event('preview', {'data_preview': response['data_preview']})
+                yield sse_event('done', {'insight': response['insight']})
+                return
+
+            try:
+                sql_query, plan_estimate = guard_generated_sql(sql_query, translation.params)
+            except QueryBudgetExceeded as e:
+                yield sse_event('error', {'error': str(e), 'sql_used': sql_query, 'plan_estimate': e.estimate})
+                return
+
+            result_version = get_result_version(plan_estimate)
+            result = execute_generated_sql(sql_query, translation.params)
+            result_data = result.as_dicts(5)
+            remember_translation(user_query, translation)
+
+            yield sse_event('rows', {
+                'row_count': len(result.rows),
+                'truncated': result.truncated,
+                'plan_estimate': plan_estimate,
+                'result_cache_hit': False
+            })
+            yield sse_event('preview', {'data_preview': result_data})
+
+            if is_missing_client_name(result_data):
+                insight = MISSING_CLIENT_NAME_INSIGHT
+                store_outcome(result_key, result_version, {
+                    'sql_used': sql_query, 'result': result, 'plan_estimate': plan_estimate, 'insight': insight
+                })
+                yield sse_event('done', {'insight': insight})
+                return
+
+            stream = get_openai_client().chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=summary_messages(user_query, build_result_digest(result)),
+                temperature=0.7,
+                max_tokens=150,
+                stream=True
+            )
+
+            parts = []
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    parts.append(token)
+                    yield sse_event('token', {'text': token})
+
+            insight = ''.join(parts).strip()
+            store_outcome(result_key, result_version, {
+                'sql_used': sql_query, 'result': result, 'plan_estimate': plan_estimate, 'insight': insight
+            })
+            yield sse_event('done', {'insight': insight})
+
+        except Exception as e:
+            print("Error:", e)
+            yield sse_event('error', {'error': str(e)})
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    # Keep proxies from buffering the stream
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@ai_bp.route('/ai-insight/metrics', methods=['GET'])
+def ai_insight_metrics():
+    """Counts of questions per translator source and the template hit ratio"""
+    with _translation_counts_lock:
+        counts = dict(_translation_counts)
+    total = sum(counts.values())
+    return jsonify({
+        'translations': counts,
+        'total': total,
+        'template_hit_ratio': round(counts['template'] / total, 4) if total else 0.0,
+        'llm_skip_ratio': round((total - counts['llm']) / total, 4) if total else 0.0
+    })
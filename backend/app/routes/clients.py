@@ -4,30 +4,96 @@ Clients Routes
 This module defines API endpoints for the clients functionality,
 particularly client management and data visualization.
 """
-from flask import Blueprint, jsonify, request
-from sqlalchemy import extract, func, and_, or_
+from flask import Blueprint, jsonify, request, g, current_app, Response, stream_with_context
+from sqlalchemy import extract, func, and_, or_, select, tuple_, text
 from ..models.models import (
     db, Client, User, Revenue, 
     DirectorAccountExecutive
 )
 from datetime import datetime
+import base64
+import binascii
+import json
+import logging
 from ..auth_utils import token_required  # Adjust path if needed
+from ..cache_utils import conditional_get
+from ..services.scope import get_director_scope, get_ae_scope, get_scope_version
+from ..services.data_version import get_data_version, VersionedCache
 
 
 # Create a Blueprint for clients routes
 clients_bp = Blueprint('clients', __name__, url_prefix='/api/clients')
 
+# Province code to full name mapping
+PROVINCE_NAMES = {
+    'AB': 'Alberta',
+    'BC': 'British Columbia',
+    'MB': 'Manitoba',
+    'NB': 'New Brunswick',
+    'NL': 'Newfoundland and Labrador',
+    'NS': 'Nova Scotia',
+    'NT': 'Northwest Territories',
+    'NU': 'Nunavut',
+    'ON': 'Ontario',
+    'PE': 'Prince Edward Island',
+    'QC': 'Quebec',
+    'SK': 'Saskatchewan',
+    'YT': 'Yukon'
+}
+
+# How /clients reports total_count
+CLIENT_TOTAL_MODES = ('exact', 'cached', 'none')
+
+# Client counts per (user, filters)
+_client_count_cache = VersionedCache()
+
+
+def get_client_distribution_scope(user):
+    """
+    Get the scope used by the client distribution charts
+    
+    Args:
+        user: The authenticated Principal (or any object with user_id and role)
+    
+    Returns:
+        UserScope for directors and account executives, None for other roles
+        (which see all clients)
+    """
+    if user.role == 'director':
+        return get_director_scope(user.user_id)
+    if user.role == 'account-executive':
+        return get_ae_scope(user.user_id)
+    return None
+
+
+def client_revenue_subquery(scope):
+    """
+    Build a subquery with the total revenue of each client
+    
+    Args:
+        scope: UserScope limiting the clients summed, or None for all clients
+    
+    Returns:
+        Subquery with client_id and revenue_amount columns, one row per client
+    """
+    query = select(
+        Revenue.client_id,
+        func.sum(Revenue.amount).label('revenue_amount')
+    ).group_by(Revenue.client_id)
+    
+    if scope is not None:
+        query = query.where(scope.client_filter(Revenue.client_id))
+    
+    return query.subquery('client_revenue')
+
+
 @clients_bp.route('/industry-treemap-chart', methods=['GET'])
 @token_required
+@conditional_get('revenue')
 def get_industry_treemap_chart():
     try:
-        username = request.args.get('username', type=str)
-        if not username:
-            return jsonify({"error": "Missing required parameter: username"}), 400
-
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        # The authenticated user comes from the verified token
+        user = g.principal
 
         treemap_data = get_industry_distribution_data(user)
 
@@ -49,44 +115,42 @@ def get_industry_distribution_data(user):
     For account executives, includes only their clients.
     
     Args:
-        user: The User object
+        user: The authenticated Principal (or any object with user_id and role)
     
     Returns:
         List of dictionaries with industry, y-value, revenue, and client_count
         for the top 10 industries by revenue
     """
     try:
+        # Resolve the clients in scope before aggregating
+        scope = get_client_distribution_scope(user)
+        if scope is not None and not scope.ae_ids:
+            # If no AEs found, return empty list
+            return []
+        
+        # Revenue is summed per client first, so each client joins a single row
+        client_revenue = client_revenue_subquery(scope)
+        revenue_amount = func.coalesce(func.sum(client_revenue.c.revenue_amount), 0.0)
+        
         # Start building the base query to get client counts and revenue by industry
         query = db.session.query(
             Client.industry,
             func.count(Client.client_id).label('client_count'),
-            func.coalesce(func.sum(Revenue.amount), 0.0).label('revenue_amount')
+            revenue_amount.label('revenue_amount')
         ).outerjoin(  # Use outer join to include clients with no revenue
-            Revenue, Client.client_id == Revenue.client_id
+            client_revenue, Client.client_id == client_revenue.c.client_id
         ).filter(
             Client.industry != None,  # Ensure industry is not null
             Client.industry != ''     # Ensure industry is not empty
         )
         
         # Apply role-based filtering
-        if user.role == 'director':
-            # Get all account executives managed by this director
-            ae_relations = DirectorAccountExecutive.query.filter_by(director_id=user.user_id).all()
-            ae_ids = [relation.account_executive_id for relation in ae_relations]
-            
-            # Filter by clients managed by these account executives
-            if ae_ids:
-                query = query.filter(Client.account_executive_id.in_(ae_ids))
-            else:
-                # If no AEs found, return empty list
-                return []
-        elif user.role == 'account-executive':
-            # Filter by this account executive's clients
-            query = query.filter(Client.account_executive_id == user.user_id)
+        if scope is not None:
+            query = query.filter(scope.ae_filter(Client.account_executive_id))
         
         # Group by industry, order by revenue (descending), and limit to top 10
         query = query.group_by(Client.industry)
-        query = query.order_by(func.coalesce(func.sum(Revenue.amount), 0.0).desc())
+        query = query.order_by(revenue_amount.desc())
         query = query.limit(10)
         
         results = query.all()
@@ -113,15 +177,11 @@ def get_industry_distribution_data(user):
     
 @clients_bp.route('/province-pie-chart', methods=['GET'])
 @token_required
+@conditional_get('revenue')
 def get_province_pie_chart():
     try:
-        username = request.args.get('username', type=str)
-        if not username:
-            return jsonify({"error": "Missing required parameter: username"}), 400
-
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        # The authenticated user comes from the verified token
+        user = g.principal
 
         province_data = get_province_distribution_data(user)
         labels = [item["province_name"] for item in province_data]
@@ -146,61 +206,42 @@ def get_province_distribution_data(user):
     For account executives, includes only their clients.
     
     Args:
-        user: The User object
+        user: The authenticated Principal (or any object with user_id and role)
     
     Returns:
         List of dictionaries with province code, name, client count, and revenue
     """
     try:
+        # Resolve the clients in scope before aggregating
+        scope = get_client_distribution_scope(user)
+        if scope is not None and not scope.ae_ids:
+            # If no AEs found, return empty list
+            return []
+        
+        # Revenue is summed per client first, so each client joins a single row
+        client_revenue = client_revenue_subquery(scope)
+        revenue_amount = func.coalesce(func.sum(client_revenue.c.revenue_amount), 0.0)
+        
         # Start building the base query to get client counts and revenue by province
         query = db.session.query(
             Client.province,
             func.count(Client.client_id).label('client_count'),
-            func.coalesce(func.sum(Revenue.amount), 0.0).label('revenue_amount')
+            revenue_amount.label('revenue_amount')
         ).outerjoin(  # Use outer join to include clients with no revenue
-            Revenue, Client.client_id == Revenue.client_id
+            client_revenue, Client.client_id == client_revenue.c.client_id
         ).filter(
             Client.province != None,  # Ensure province is not null
             Client.province != ''     # Ensure province is not empty
         )
         
         # Apply role-based filtering
-        if user.role == 'director':
-            # Get all account executives managed by this director
-            ae_relations = DirectorAccountExecutive.query.filter_by(director_id=user.user_id).all()
-            ae_ids = [relation.account_executive_id for relation in ae_relations]
-            
-            # Filter by clients managed by these account executives
-            if ae_ids:
-                query = query.filter(Client.account_executive_id.in_(ae_ids))
-            else:
-                # If no AEs found, return empty list
-                return []
-        elif user.role == 'account-executive':
-            # Filter by this account executive's clients
-            query = query.filter(Client.account_executive_id == user.user_id)
+        if scope is not None:
+            query = query.filter(scope.ae_filter(Client.account_executive_id))
         
         # Group by province and execute query
         query = query.group_by(Client.province)
         results = query.all()
         
-        # Province code to full name mapping
-        province_names = {
-            'AB': 'Alberta',
-            'BC': 'British Columbia',
-            'MB': 'Manitoba',
-            'NB': 'New Brunswick',
-            'NL': 'Newfoundland and Labrador',
-            'NS': 'Nova Scotia',
-            'NT': 'Northwest Territories',
-            'NU': 'Nunavut',
-            'ON': 'Ontario',
-            'PE': 'Prince Edward Island',
-            'QC': 'Quebec',
-            'SK': 'Saskatchewan',
-            'YT': 'Yukon'
-        }
-        
         # Process results into list of dictionaries
         province_data = []
         for province, client_count, revenue_amount in results:
@@ -209,7 +250,7 @@ def get_province_distribution_data(user):
             revenue_amount = float(revenue_amount) if revenue_amount is not None else 0.0
             
             # Get full province name
-            province_name = province_names.get(province, province)
+            province_name = PROVINCE_NAMES.get(province, province)
             
             # Only include provinces with clients
             if client_count > 0:
@@ -229,38 +270,212 @@ def get_province_distribution_data(user):
         print(f"Error in get_province_distribution_data: {str(e)}")
         return []
 
+@clients_bp.route('/facets', methods=['GET'])
+@token_required
+@conditional_get()
+def get_client_facets():
+    """
+    Get the facet counts for the clients page filters
+    
+    Counts clients per province, per industry and per province and industry
+    pair, within the user's scope and under the same filters as /clients,
+    using a single GROUPING SETS aggregate.
+    
+    Query parameters:
+    - provinces, industries, q: Same as /clients (optional)
+    
+    Response format:
+    {
+        "provinces": [{"province": "ON", "province_name": "Ontario", "client_count": 42}, ...],
+        "industries": [{"industry": "Retail", "client_count": 17}, ...],
+        "province_industries": [{"province": "ON", "industry": "Retail", "client_count": 8}, ...],
+        "total_count": 120,
+        "applied_filters": {...}
+    }
+    """
+    try:
+        provinces_param = request.args.get('provinces', type=str)
+        industries_param = request.args.get('industries', type=str)
+
+        provinces = [p.strip().upper() for p in provinces_param.split(',')] if provinces_param else []
+        industries = [i.strip() for i in industries_param.split(',')] if industries_param else []
+        search = request.args.get('q', '').strip() or None
+
+        # The authenticated user comes from the verified token
+        user = g.principal
+
+        facets, applied_filters = get_client_facet_counts(user, provinces, industries, search)
+
+        return jsonify({
+            **facets,
+            "applied_filters": applied_filters
+        }), 200
+
+    except Exception as e:
+        print(f"Error in get_client_facets: {str(e)}")
+        return jsonify({"error": f"Failed to calculate client facets: {str(e)}"}), 500
+
+
+def get_client_facet_counts(user, provinces=None, industries=None, search=None):
+    """
+    Count clients per province, industry and province/industry pair in one query
+    
+    Args:
+        user: The authenticated Principal (or any object with user_id and role)
+        provinces: List of province codes to filter by (optional)
+        industries: List of industries to filter by (optional)
+        search: Text the client name must contain (optional)
+    
+    Returns:
+        Tuple of (facets dictionary, applied_filters). Clients without a
+        province or industry are left out of the corresponding facets.
+    """
+    query, applied_filters = build_client_facet_query(user, provinces, industries, search)
+    
+    facets = {
+        "provinces": [],
+        "industries": [],
+        "province_industries": [],
+        "total_count": 0
+    }
+    for province, industry, province_rolled_up, industry_rolled_up, client_count in query.all():
+        if province_rolled_up and industry_rolled_up:
+            facets["total_count"] = client_count
+        elif industry_rolled_up:
+            if province:
+                facets["provinces"].append({
+                    "province": province,
+                    "province_name": PROVINCE_NAMES.get(province, province),
+                    "client_count": client_count
+                })
+        elif province_rolled_up:
+            if industry:
+                facets["industries"].append({"industry": industry, "client_count": client_count})
+        elif province and industry:
+            facets["province_industries"].append({
+                "province": province,
+                "industry": industry,
+                "client_count": client_count
+            })
+    
+    # Largest facets first
+    for key in ("provinces", "industries", "province_industries"):
+        facets[key].sort(key=lambda item: item["client_count"], reverse=True)
+    
+    return facets, applied_filters
+
+
+def build_client_facet_query(user, provinces=None, industries=None, search=None):
+    """
+    Build the GROUPING SETS query behind get_client_facet_counts
+    
+    Returns:
+        Tuple of (query, applied_filters). Each row holds province, industry,
+        province_grouping, industry_grouping and client_count, where a
+        grouping value of 1 means the column is rolled up in that row.
+    """
+    query = db.session.query(
+        Client.province,
+        Client.industry,
+        func.grouping(Client.province).label('province_grouping'),
+        func.grouping(Client.industry).label('industry_grouping'),
+        func.count(Client.client_id).label('client_count')
+    )
+    query, applied_filters = apply_client_filters(query, user, provinces, industries, search)
+    
+    # The empty grouping set () gives the grand total; tuple_() with no
+    # elements doesn't reliably render as ()
+    query = query.group_by(
+        func.grouping_sets(
+            tuple_(Client.province),
+            tuple_(Client.industry),
+            tuple_(Client.province, Client.industry),
+            text('()')
+        )
+    )
+    
+    return query, applied_filters
+
+
 @clients_bp.route('/clients', methods=['GET'])
 @token_required
 def get_clients():
     """
     Query clients data with flexible filtering
 
-    This endpoint is now protected by JWT.
+    Clients are ordered by (client_name, client_id) and returned one page at
+    a time. Pass the next_cursor of a response as cursor to get the next page.
+
+    Query parameters:
+    - provinces: Comma-separated province codes (optional)
+    - industries: Comma-separated industries (optional)
+    - q: Case-insensitive search on the client name (optional)
+    - limit: Page size (optional, default: CLIENTS_PAGE_SIZE, max: CLIENTS_MAX_PAGE_SIZE)
+    - cursor: next_cursor of the previous page (optional)
+    - total: exact, cached or none (optional, default: cached). cached reuses
+      the count of an earlier request until clients or AE assignments change
+    - stream: true to send every matching client as newline-delimited JSON
+      instead of a page (optional)
+
+    Returns:
+    - 200 OK with a page of clients, or an application/x-ndjson stream
+    - 400 Bad Request if a parameter is invalid
+    - 500 Internal Server Error if query execution fails
     """
     try:
-        username = request.args.get('username', type=str)
         provinces_param = request.args.get('provinces', type=str)
         industries_param = request.args.get('industries', type=str)
 
         provinces = [p.strip().upper() for p in provinces_param.split(',')] if provinces_param else []
         industries = [i.strip() for i in industries_param.split(',')] if industries_param else []
+        search = request.args.get('q', '').strip() or None
+
+        max_page_size = current_app.config.get('CLIENTS_MAX_PAGE_SIZE', 1000)
+        limit = request.args.get('limit', current_app.config.get('CLIENTS_PAGE_SIZE', 1000), type=int)
+        if limit < 1 or limit > max_page_size:
+            return jsonify({"error": f"limit must be between 1 and {max_page_size}"}), 400
+
+        total_mode = request.args.get('total', 'cached')
+        if total_mode not in CLIENT_TOTAL_MODES:
+            return jsonify({"error": f"Invalid total. Must be one of: {', '.join(CLIENT_TOTAL_MODES)}"}), 400
+
+        cursor = None
+        if request.args.get('cursor'):
+            cursor = decode_clients_cursor(request.args['cursor'])
+            if cursor is None:
+                return jsonify({"error": "Invalid cursor"}), 400
+
+        # The authenticated user comes from the verified token
+        user = g.principal
+
+        query, applied_filters = build_clients_query(user, provinces, industries, search)
 
-        if not username:
-            return jsonify({"error": "Missing required parameter: username"}), 400
+        if request.args.get('stream', 'false').lower() == 'true':
+            return stream_clients(query)
 
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        total_count = None
+        if total_mode != 'none':
+            total_count = count_clients(query, user, applied_filters, use_cache=(total_mode == 'cached'))
 
-        query, applied_filters = build_clients_query(user, provinces, industries)
+        page_query = query.order_by(Client.client_name, Client.client_id)
+        if cursor is not None:
+            page_query = page_query.filter(tuple_(Client.client_name, Client.client_id) > cursor)
 
-        total_count = query.count()
-        results = query.order_by(Client.client_name).limit(1000).all()
+        # Fetch one extra row to know whether there is a next page
+        results = page_query.limit(limit + 1).all()
+        has_more = len(results) > limit
+        results = results[:limit]
         clients_data = format_clients_results(results)
 
+        next_cursor = None
+        if has_more:
+            last_client = results[-1][0]
+            next_cursor = encode_clients_cursor(last_client.client_name, last_client.client_id)
+
         return jsonify({
             "clients": clients_data,
             "total_count": total_count,
+            "next_cursor": next_cursor,
             "applied_filters": applied_filters
         }), 200
 
@@ -269,15 +484,80 @@ def get_clients():
         return jsonify({"error": f"Failed to query clients: {str(e)}"}), 500
 
 
+def encode_clients_cursor(client_name, client_id):
+    """Encode the keyset position after a client as an opaque cursor"""
+    payload = json.dumps([client_name, client_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_clients_cursor(cursor):
+    """Decode a cursor into (client_name, client_id), returning None if malformed"""
+    try:
+        client_name, client_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, binascii.Error):
+        return None
+    if not isinstance(client_name, str) or not isinstance(client_id, int):
+        return None
+    return client_name, client_id
+
+
+def count_clients(query, user, applied_filters, use_cache=True):
+    """
+    Count the clients matched by a clients query
+    
+    Args:
+        query: Query from build_clients_query
+        user: The authenticated Principal
+        applied_filters: Filters the query was built with, part of the cache key
+        use_cache: Reuse a count cached for the same user and filters
+    
+    Returns:
+        Number of matching clients
+    """
+    key = (user.user_id, user.role, repr(sorted(applied_filters.items())))
+    version = (get_scope_version(), get_data_version('client', 'directoraccountexecutive', 'user'))
+    ttl = current_app.config.get('CLIENTS_COUNT_CACHE_TTL', 300)
+    
+    if use_cache:
+        total_count = _client_count_cache.get(key, version, ttl)
+        if total_count is not None:
+            return total_count
+    
+    total_count = query.order_by(None).count()
+    _client_count_cache.set(key, version, total_count)
+    return total_count
+
+
+def stream_clients(query):
+    """
+    Stream every client matched by a query as newline-delimited JSON
+    
+    Rows are fetched in batches of CLIENTS_STREAM_BATCH_SIZE through a
+    server-side cursor, so memory use does not grow with the result size.
+    """
+    batch_size = current_app.config.get('CLIENTS_STREAM_BATCH_SIZE', 500)
+    rows = query.order_by(Client.client_name, Client.client_id).yield_per(batch_size)
+    
+    def generate():
+        try:
+            for client_data in format_clients_results(rows, as_list=False):
+                yield json.dumps(client_data) + '\n'
+        except Exception as e:
+            # Headers are already sent, so the error can only be logged
+            logging.error(f"Error streaming clients: {str(e)}")
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
-def build_clients_query(user, provinces=None, industries=None):
+
+def build_clients_query(user, provinces=None, industries=None, search=None):
     """
     Build the query for clients based on user role and filters
     
     Args:
-        user: The User object
+        user: The authenticated Principal (or any object with user_id and role)
         provinces: List of province codes to filter by (optional)
         industries: List of industries to filter by (optional)
+        search: Text the client name must contain (optional)
     
     Returns:
         Tuple of (query, applied_filters)
@@ -292,18 +572,34 @@ def build_clients_query(user, provinces=None, industries=None):
         User, Client.account_executive_id == User.user_id
     )
     
+    return apply_client_filters(query, user, provinces, industries, search)
+
+
+def apply_client_filters(query, user, provinces=None, industries=None, search=None):
+    """
+    Restrict a query on Client to the user's scope and the requested filters
+    
+    Args:
+        query: Query selecting from Client
+        user: The authenticated Principal (or any object with user_id and role)
+        provinces: List of province codes to filter by (optional)
+        industries: List of industries to filter by (optional)
+        search: Text the client name must contain (optional)
+    
+    Returns:
+        Tuple of (query, applied_filters)
+    """
     # Initialize applied filters dictionary
     applied_filters = {}
     
     # Apply role-based filtering
     if user.role == 'director':
         # Get all account executives managed by this director
-        ae_relations = DirectorAccountExecutive.query.filter_by(director_id=user.user_id).all()
-        ae_ids = [relation.account_executive_id for relation in ae_relations]
+        scope = get_director_scope(user.user_id)
         
         # Filter by clients managed by these account executives
-        if ae_ids:
-            query = query.filter(Client.account_executive_id.in_(ae_ids))
+        if scope.ae_ids:
+            query = query.filter(scope.ae_filter(Client.account_executive_id))
         else:
             # If no AEs found, return no results
             query = query.filter(False)
@@ -318,46 +614,51 @@ def build_clients_query(user, provinces=None, industries=None):
     
     # Apply industry filter if provided (case-insensitive)
     if industries:
-        # Create a list of case-insensitive conditions for each industry
-        industry_conditions = []
-        for industry in industries:
-            industry_conditions.append(func.lower(Client.industry) == func.lower(industry))
-        
-        # Combine conditions with OR
-        if industry_conditions:
-            query = query.filter(or_(*industry_conditions))
-        
+        # Compare against the indexed lower-cased industry column
+        query = query.filter(Client.industry_normalized.in_([industry.lower() for industry in industries]))
         applied_filters["industries"] = industries
     
+    # Apply client name search if provided (case-insensitive substring match)
+    if search:
+        query = query.filter(Client.client_name.ilike(f"%{escape_like(search)}%", escape='\\'))
+        applied_filters["q"] = search
+    
     return query, applied_filters
 
 
-def format_clients_results(results):
+def escape_like(value):
+    """Escape the LIKE wildcards in a user supplied search term"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def format_clients_results(results, as_list=True):
     """
     Format the query results into the desired output structure
     
     Args:
-        results: List of tuples from the query
+        results: Iterable of tuples from the query
+        as_list: Return a list, or False to return a generator of the rows
     
     Returns:
-        List of dictionaries with client data
+        List (or generator) of dictionaries with client data
     """
-    clients_data = []
+    clients_data = (format_client_row(*row) for row in results)
+    return list(clients_data) if as_list else clients_data
+
+
+def format_client_row(client, ae_first_name, ae_last_name, ae_id):
+    """Format one client row of a clients query"""
+    # Format the account executive name
+    account_executive = f"{ae_first_name} {ae_last_name}" if ae_first_name and ae_last_name else ""
+    account_executive = account_executive.strip()
     
-    for client, ae_first_name, ae_last_name, ae_id in results:
-        # Format the account executive name
-        account_executive = f"{ae_first_name} {ae_last_name}" if ae_first_name and ae_last_name else ""
-        account_executive = account_executive.strip()
-            
-        clients_data.append({
-            "client_id": client.client_id,
-            "client_name": client.client_name,
-            "industry": client.industry,
-            "city": client.city,
-            "province": client.province,
-            "account_executive": account_executive,
-            "account_executive_id": ae_id,
-            "created_date": client.created_date.strftime('%Y-%m-%d') if client.created_date else None
-        })
-    
-    return clients_data
\ No newline at end of file
+    return {
+        "client_id": client.client_id,
+        "client_name": client.client_name,
+        "industry": client.industry,
+        "city": client.city,
+        "province": client.province,
+        "account_executive": account_executive,
+        "account_executive_id": ae_id,
+        "created_date": client.created_date.strftime('%Y-%m-%d') if client.created_date else None
+    }
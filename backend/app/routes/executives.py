@@ -4,19 +4,34 @@ Executives Routes
 This module defines API endpoints for executive oversight functionality,
 particularly for directors to monitor account executive performance.
 """
-from flask import Blueprint, jsonify, request
-from sqlalchemy import extract, func, and_, or_, distinct
+from flask import Blueprint, jsonify, request, g, current_app
+from sqlalchemy import extract, func, and_, or_, distinct, select
 from ..models.models import (
     db, User, Client, Revenue, Win, Signing,
-    DirectorAccountExecutive, YearlyTarget
+    DirectorAccountExecutive
 )
 from datetime import datetime
 from ..auth_utils import token_required
+from ..cache_utils import conditional_get
+from ..services.scope import get_director_scope, get_scope_version, resolve_user_scope
+from ..services.data_version import get_data_version, VersionedCache
+from ..services.targets import TARGET_METRICS, calculate_target_attainment
 # Create a Blueprint for executives routes
 executives_bp = Blueprint('executives', __name__, url_prefix='/api/executives')
 
+# Metrics the AE leaderboard can be sorted by
+LEADERBOARD_METRICS = ('wins_revenue', 'win_count', 'signing_revenue')
+MAX_LEADERBOARD_LIMIT = 100
+
+# Tables the leaderboard rankings are derived from
+LEADERBOARD_TABLES = ('revenue', 'win', 'signing', 'client', 'directoraccountexecutive', 'user')
+
+# Ranked leaderboards per (director, year)
+_leaderboard_cache = VersionedCache()
+
 @executives_bp.route('/account-executives', methods=['GET'])
 @token_required
+@conditional_get('user')
 def get_account_executives():
     """
     Get all account executives
@@ -62,6 +77,7 @@ def get_account_executives():
 
 @executives_bp.route('/ae-performance', methods=['GET'])
 @token_required
+@conditional_get('user', 'revenue', 'win', 'signing')
 def get_ae_performance():
     """
     Get performance indicators for all account executives
@@ -71,7 +87,6 @@ def get_ae_performance():
     Only directors can access this endpoint and see data for all AEs they manage.
     
     Query parameters:
-    - username: Username of the current user (required, default: 'shogg')
     - year: Fiscal year (optional, default: 2024)
     
     Response format:
@@ -92,13 +107,10 @@ def get_ae_performance():
     """
     try:
         # Get and validate parameters
-        username = request.args.get('username', 'shogg', type=str)
         year = request.args.get('year', 2024, type=int)
         
-        # Get user by username and validate
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        # The authenticated user comes from the verified token
+        user = g.principal
         
         # Check if user is a director
         if user.role != 'director':
@@ -122,10 +134,183 @@ def get_ae_performance():
         return jsonify({"error": f"Failed to retrieve AE performance data: {str(e)}"}), 500
 
 
+@executives_bp.route('/quarterly-targets', methods=['GET'])
+@token_required
+@conditional_get('revenue', 'signing', 'win', 'opportunity', 'yearlytarget', 'quarterlytarget')
+def get_quarterly_targets():
+    """
+    Get quarterly target attainment for a metric
+    
+    Directors get the attainment of all AEs they manage combined, plus a
+    breakdown per AE. Account executives get their own attainment.
+    
+    Query parameters:
+    - metric: revenue, signings, wins or pipeline (optional, default: revenue)
+    - year: Fiscal year (optional, default: 2024)
+    
+    Response format:
+    {
+        "quarterly_targets": [
+            {
+                "quarter": 1,
+                "accumulated_value": 250000.00,
+                "actual_value": 230000.00,
+                "achievement_percentage": 92.0
+            },
+            ...
+        ],
+        "account_executives": [
+            {"account_executive_id": 2, "quarterly_targets": [...]},
+            ...
+        ],
+        "metric": "revenue",
+        "year": 2024
+    }
+    
+    accumulated_value is the year-to-date target at the end of the quarter and
+    actual_value the year-to-date actuals.
+    
+    Returns:
+    - 200 OK with quarterly target attainment
+    - 400 Bad Request if the metric is invalid
+    - 500 Internal Server Error if query execution fails
+    """
+    try:
+        # Get and validate parameters
+        metric = request.args.get('metric', 'revenue')
+        year = request.args.get('year', 2024, type=int)
+        
+        if metric not in TARGET_METRICS:
+            return jsonify({"error": f"Invalid metric. Must be one of: {', '.join(TARGET_METRICS)}"}), 400
+        
+        user = g.principal
+        scope = resolve_user_scope(user)
+        
+        attainment = calculate_target_attainment(scope, metric, year)
+        
+        return jsonify({
+            **attainment,
+            "metric": metric,
+            "year": year
+        }), 200
+        
+    except Exception as e:
+        print(f"Error in get_quarterly_targets: {str(e)}")
+        return jsonify({"error": f"Failed to retrieve quarterly targets: {str(e)}"}), 500
+
+
+@executives_bp.route('/leaderboard', methods=['GET'])
+@token_required
+@conditional_get(*LEADERBOARD_TABLES)
+def get_ae_leaderboard():
+    """
+    Get a ranked page of the account executives managed by a director
+    
+    Rankings are computed in SQL with RANK() and cached per director and year
+    until revenue, wins, signings or AE assignments change.
+    
+    Query parameters:
+    - year: Fiscal year (optional, default: 2024)
+    - sort: wins_revenue, win_count or signing_revenue (optional, default: wins_revenue)
+    - limit: Number of rows to return, 1-100 (optional, default: 10)
+    - after: next_after cursor of the previous page (optional)
+    
+    Response format:
+    {
+        "leaderboard": [
+            {
+                "rank": 1,
+                "account_executive_id": 2,
+                "account_executive_name": "John Smith",
+                "wins_revenue": 850000.00,
+                "win_count": 5.5,
+                "signing_revenue": 750000.00
+            },
+            ...
+        ],
+        "sort": "wins_revenue",
+        "year": 2024,
+        "total_count": 12,
+        "next_after": "1:2"
+    }
+    
+    Returns:
+    - 200 OK with the leaderboard page
+    - 400 Bad Request if a parameter is invalid
+    - 403 Forbidden if the user is not a director
+    - 500 Internal Server Error if query execution fails
+    """
+    try:
+        # Get and validate parameters
+        year = request.args.get('year', 2024, type=int)
+        sort = request.args.get('sort', 'wins_revenue')
+        limit = request.args.get('limit', 10, type=int)
+        after = request.args.get('after')
+        
+        if sort not in LEADERBOARD_METRICS:
+            return jsonify({"error": f"Invalid sort. Must be one of: {', '.join(LEADERBOARD_METRICS)}"}), 400
+        if limit < 1 or limit > MAX_LEADERBOARD_LIMIT:
+            return jsonify({"error": f"limit must be between 1 and {MAX_LEADERBOARD_LIMIT}"}), 400
+        
+        after_key = None
+        if after:
+            after_key = parse_leaderboard_cursor(after)
+            if after_key is None:
+                return jsonify({"error": "Invalid after cursor"}), 400
+        
+        user = g.principal
+        
+        # Check if user is a director
+        if user.role != 'director':
+            return jsonify({"error": "Access denied. Only directors can view the AE leaderboard"}), 403
+        
+        ranked = get_ranked_ae_performance(user.user_id, year)
+        
+        # Keyset pagination on (rank, account_executive_id) for the chosen metric
+        rank_key = f"{sort}_rank"
+        ordered = sorted(ranked, key=lambda row: (row[rank_key], row["account_executive_id"]))
+        if after_key is not None:
+            ordered = [
+                row for row in ordered
+                if (row[rank_key], row["account_executive_id"]) > after_key
+            ]
+        page = ordered[:limit]
+        
+        next_after = None
+        if len(ordered) > limit:
+            last = page[-1]
+            next_after = f"{last[rank_key]}:{last['account_executive_id']}"
+        
+        return jsonify({
+            "leaderboard": [
+                {
+                    "rank": row[rank_key],
+                    "account_executive_id": row["account_executive_id"],
+                    "account_executive_name": row["account_executive_name"],
+                    "wins_revenue": row["wins_revenue"],
+                    "win_count": row["win_count"],
+                    "signing_revenue": row["signing_revenue"]
+                }
+                for row in page
+            ],
+            "sort": sort,
+            "year": year,
+            "total_count": len(ranked),
+            "next_after": next_after
+        }), 200
+        
+    except Exception as e:
+        print(f"Error in get_ae_leaderboard: {str(e)}")
+        return jsonify({"error": f"Failed to retrieve AE leaderboard: {str(e)}"}), 500
+
+
 def get_ae_performance_data(director_id, year):
     """
     Get performance data for all account executives under a director
     
+    Each metric is a single query grouped by the client's account executive,
+    so the number of queries does not grow with the size of the team.
+    
     Args:
         director_id: The ID of the director
         year: The fiscal year to calculate for
@@ -134,8 +319,8 @@ def get_ae_performance_data(director_id, year):
         List of dictionaries with account executive performance data
     """
     # Get all account executives managed by this director
-    ae_relations = DirectorAccountExecutive.query.filter_by(director_id=director_id).all()
-    ae_ids = [relation.account_executive_id for relation in ae_relations]
+    scope = get_director_scope(director_id)
+    ae_ids = list(scope.ae_ids)
     
     # If no AEs found, return empty list
     if not ae_ids:
@@ -145,10 +330,14 @@ def get_ae_performance_data(director_id, year):
     ae_users = User.query.filter(User.user_id.in_(ae_ids)).all()
     ae_details = {ae.user_id: ae for ae in ae_users}
     
+    # Per-AE totals for the year, one grouped query per metric
+    wins_revenue_by_ae = get_revenue_by_ae(scope, year)
+    win_count_by_ae = get_win_count_by_ae(scope, year)
+    signing_revenue_by_ae = get_signing_revenue_by_ae(scope, year)
+    
     # Initialize the result list
     ae_performance = []
     
-    # For each AE, calculate revenue metrics
     for ae_id in ae_ids:
         # Skip if AE user not found (should not happen)
         if ae_id not in ae_details:
@@ -156,25 +345,16 @@ def get_ae_performance_data(director_id, year):
             
         ae_user = ae_details[ae_id]
         
-        # Get total revenue generated by this AE
-        wins_revenue = get_ae_revenue_generated(ae_id, year)
-        
-        # Get win count for this AE
-        win_count = get_ae_win_count(ae_id, year)
-        
-        # Get total revenue from signings for this AE
-        signing_revenue = get_ae_signing_revenue(ae_id, year)
-        
         # Format AE name
         ae_name = f"{ae_user.first_name} {ae_user.last_name}".strip()
         
-        # Add to results
+        # Add to results, AEs without data for the year get zeros
         ae_performance.append({
             "account_executive_id": ae_id,
             "account_executive_name": ae_name,
-            "wins_revenue": round(wins_revenue, 2),
-            "win_count": win_count,
-            "signing_revenue": round(signing_revenue, 2)
+            "wins_revenue": round(wins_revenue_by_ae.get(ae_id, 0.0), 2),
+            "win_count": win_count_by_ae.get(ae_id, 0.0),
+            "signing_revenue": round(signing_revenue_by_ae.get(ae_id, 0.0), 2)
         })
     
     # Sort by revenue generated (descending)
@@ -183,81 +363,155 @@ def get_ae_performance_data(director_id, year):
     return ae_performance
 
 
-def get_ae_revenue_generated(ae_id, year):
-    """Get the total revenue generated by an account executive's clients"""
-    # Get all clients managed by this AE
-    clients = Client.query.filter_by(account_executive_id=ae_id).all()
-    client_ids = [client.client_id for client in clients]
-    
-    # If no clients, return 0
-    if not client_ids:
-        return 0.0
-    
-    # Query the sum of revenue for these clients for the specified year
-    revenue_query = db.session.query(
-        func.sum(Revenue.amount)
-    ).filter(
-        Revenue.client_id.in_(client_ids),
-        Revenue.fiscal_year == year
+def build_sum_by_ae_query(scope, value_column, client_column, year_column, year):
+    """
+    Build a query summing a fact column per account executive for the AEs in a director's scope
+    
+    Args:
+        scope: The director's UserScope
+        value_column: The column to sum
+        client_column: The fact table's client_id column
+        year_column: The fact table's fiscal_year column
+        year: The fiscal year to calculate for
+    
+    Returns:
+        Select with (account_executive_id, total) rows
+    """
+    return select(
+        Client.account_executive_id.label('account_executive_id'),
+        func.sum(value_column).label('total')
+    ).join_from(
+        client_column.class_, Client, Client.client_id == client_column
+    ).where(
+        scope.ae_filter(Client.account_executive_id),
+        year_column == year
+    ).group_by(
+        Client.account_executive_id
     )
+
+
+def sum_by_account_executive(scope, value_column, client_column, year_column, year):
+    """
+    Sum a fact column per account executive for the AEs in a director's scope
     
-    # Execute query and get result
-    total_revenue = revenue_query.scalar() or 0.0
+    Returns:
+        Dictionary mapping account executive ID to the summed value
+    """
+    rows = db.session.execute(
+        build_sum_by_ae_query(scope, value_column, client_column, year_column, year)
+    ).all()
     
-    return float(total_revenue)
+    return {ae_id: float(total or 0.0) for ae_id, total in rows}
 
 
-def get_ae_win_count(ae_id, year):
-    """Get the total win count (sum of win multipliers) for an account executive"""
-    # Get all clients managed by this AE
-    clients = Client.query.filter_by(account_executive_id=ae_id).all()
-    client_ids = [client.client_id for client in clients]
-    
-    # If no clients, return 0
-    if not client_ids:
-        return 0.0
-    
-    # Query the sum of win multipliers for these clients for the specified year
-    win_query = db.session.query(
-        func.sum(Win.win_multiplier)
-    ).filter(
-        Win.client_id.in_(client_ids),
-        Win.fiscal_year == year
-    )
+def get_revenue_by_ae(scope, year):
+    """Get the total revenue generated by each account executive's clients"""
+    return sum_by_account_executive(scope, Revenue.amount, Revenue.client_id, Revenue.fiscal_year, year)
+
+
+def get_win_count_by_ae(scope, year):
+    """Get the total win count (sum of win multipliers) for each account executive"""
+    return sum_by_account_executive(scope, Win.win_multiplier, Win.client_id, Win.fiscal_year, year)
+
+
+def get_signing_revenue_by_ae(scope, year):
+    """Get the total revenue from signings for each account executive"""
+    # The annual contract value is stored on each signing as annualized_value
+    return sum_by_account_executive(scope, Signing.annualized_value, Signing.client_id, Signing.fiscal_year, year)
+
+
+def parse_leaderboard_cursor(after):
+    """Parse a "rank:account_executive_id" cursor, returning None if malformed"""
+    try:
+        rank, ae_id = after.split(':')
+        return int(rank), int(ae_id)
+    except ValueError:
+        return None
+
+
+def get_ranked_ae_performance(director_id, year):
+    """
+    Get every AE of a director with their metrics and rank per metric, using the cache
+    
+    Args:
+        director_id: The ID of the director
+        year: The fiscal year to calculate for
     
-    # Execute query and get result
-    total_wins = win_query.scalar() or 0.0
+    Returns:
+        List of dictionaries with the metrics and a <metric>_rank entry per metric
+    """
+    key = (director_id, year)
+    version = (get_scope_version(), get_data_version(*LEADERBOARD_TABLES))
+    ttl = current_app.config.get('LEADERBOARD_CACHE_TTL', 300)
     
-    return float(total_wins)
+    ranked = _leaderboard_cache.get(key, version, ttl)
+    if ranked is None:
+        ranked = query_ranked_ae_performance(director_id, year)
+        _leaderboard_cache.set(key, version, ranked)
+    return ranked
 
 
-def get_ae_signing_revenue(ae_id, year):
-    """Get the total revenue from signings for an account executive"""
-    # Get all clients managed by this AE
-    clients = Client.query.filter_by(account_executive_id=ae_id).all()
-    client_ids = [client.client_id for client in clients]
-    
-    # If no clients, return 0
-    if not client_ids:
-        return 0.0
-    
-    # Query the annual contract value from signings for these clients in the specified year
-    # The annual contract value is calculated by dividing total_contract_value by contract duration
-    signing_query = db.session.query(
-        func.sum(
-            Signing.total_contract_value / 
-            func.greatest(
-                # Calculate the duration in years (end_date - start_date)
-                (extract('year', Signing.end_date) - extract('year', Signing.start_date) + 1),
-                1.0  # Ensure we don't divide by zero
-            )
-        )
-    ).filter(
-        Signing.client_id.in_(client_ids),
-        Signing.fiscal_year == year
-    )
+def query_ranked_ae_performance(director_id, year):
+    """
+    Rank a director's AEs on every leaderboard metric in a single query
+    
+    Each metric is a grouped subquery outer-joined onto the director's AEs,
+    so AEs without data for the year rank with zeros.
+    
+    Args:
+        director_id: The ID of the director
+        year: The fiscal year to calculate for
+    
+    Returns:
+        List of dictionaries with the metrics and a <metric>_rank entry per metric
+    """
+    scope = get_director_scope(director_id)
+    if not scope.ae_ids:
+        return []
+    
+    revenue = build_sum_by_ae_query(
+        scope, Revenue.amount, Revenue.client_id, Revenue.fiscal_year, year
+    ).subquery('revenue_by_ae')
+    wins = build_sum_by_ae_query(
+        scope, Win.win_multiplier, Win.client_id, Win.fiscal_year, year
+    ).subquery('wins_by_ae')
+    signings = build_sum_by_ae_query(
+        scope, Signing.annualized_value, Signing.client_id, Signing.fiscal_year, year
+    ).subquery('signings_by_ae')
     
-    # Execute query and get result
-    signing_revenue = signing_query.scalar() or 0.0
+    metrics = {
+        'wins_revenue': func.coalesce(revenue.c.total, 0.0),
+        'win_count': func.coalesce(wins.c.total, 0.0),
+        'signing_revenue': func.coalesce(signings.c.total, 0.0)
+    }
+    
+    query = select(
+        User.user_id,
+        User.first_name,
+        User.last_name,
+        *[value.label(name) for name, value in metrics.items()],
+        *[
+            func.rank().over(order_by=value.desc()).label(f"{name}_rank")
+            for name, value in metrics.items()
+        ]
+    ).outerjoin(
+        revenue, revenue.c.account_executive_id == User.user_id
+    ).outerjoin(
+        wins, wins.c.account_executive_id == User.user_id
+    ).outerjoin(
+        signings, signings.c.account_executive_id == User.user_id
+    ).where(
+        scope.ae_filter(User.user_id)
+    )
     
-    return float(signing_revenue)
\ No newline at end of file
+    ranked = []
+    for row in db.session.execute(query).mappings():
+        ranked.append({
+            "account_executive_id": row["user_id"],
+            "account_executive_name": f"{row['first_name']} {row['last_name']}".strip(),
+            "wins_revenue": round(float(row["wins_revenue"]), 2),
+            "win_count": float(row["win_count"]),
+            "signing_revenue": round(float(row["signing_revenue"]), 2),
+            **{f"{name}_rank": row[f"{name}_rank"] for name in metrics}
+        })
+    return ranked
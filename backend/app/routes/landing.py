@@ -4,23 +4,98 @@ Landing Page Routes
 This module defines API endpoints specific to the landing page functionality,
 particularly the Key Performance Indicators (KPIs) dashboard.
 """
-from flask import Blueprint, jsonify, request
-from sqlalchemy import extract, func, case, and_, or_, text
-from ..models.models import (
-    db, Opportunity, Revenue, Signing, Win, Client, User, Product,
-    DirectorAccountExecutive
-)
+from flask import Blueprint, jsonify, request, g, current_app
+from sqlalchemy import extract, func, case, and_, true, cast, literal, Integer
+from ..models.models import db, Opportunity, Revenue, Signing, Win, Product
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import threading
 from ..auth_utils import token_required
+from ..cache_utils import conditional_get
+from ..services.scope import get_director_scope, get_ae_scope, resolve_user_scope
+from ..services.rollups import (
+    rollups_are_fresh, rollup_source, revenue_monthly_rollup, win_quarterly_rollup,
+    signing_category_rollup, pipeline_category_rollup
+)
 
 
 
 # Create a Blueprint for landing page routes
 landing_bp = Blueprint('landing', __name__, url_prefix='/api/landing')
 
+# Largest span accepted by the year_from/year_to parameters
+MAX_YEAR_RANGE = 20
+
+
+def get_year_range():
+    """
+    Read the optional year_from/year_to query parameters
+    
+    A missing bound defaults to the year parameter (default: 2024).
+    
+    Returns:
+        Tuple of ((year_from, year_to) or None, error message or None).
+        The range is None when neither parameter was given.
+    """
+    year_from = request.args.get('year_from', type=int)
+    year_to = request.args.get('year_to', type=int)
+    if year_from is None and year_to is None:
+        return None, None
+    
+    year = request.args.get('year', 2024, type=int)
+    year_from = year_from if year_from is not None else year
+    year_to = year_to if year_to is not None else year
+    
+    if year_from > year_to:
+        return None, "year_from must not be after year_to"
+    if year_to - year_from + 1 > MAX_YEAR_RANGE:
+        return None, f"Year range cannot span more than {MAX_YEAR_RANGE} years"
+    
+    return (year_from, year_to), None
+
+
+def calculate_yoy_deltas(values_by_year):
+    """
+    Calculate year-over-year changes for a series of yearly values
+    
+    Args:
+        values_by_year: Dictionary mapping each year to a number
+    
+    Returns:
+        List of dictionaries with year, change and change_percentage for every
+        year after the first. change_percentage is None when the previous
+        year's value is zero.
+    """
+    years = sorted(values_by_year)
+    deltas = []
+    for previous, current in zip(years, years[1:]):
+        change = values_by_year[current] - values_by_year[previous]
+        percentage = (change / values_by_year[previous]) * 100.0 if values_by_year[previous] else None
+        deltas.append({
+            "year": current,
+            "change": round(change, 2),
+            "change_percentage": round(percentage, 1) if percentage is not None else None
+        })
+    return deltas
+
+
+def build_multi_year_chart_response(key, data_by_year, totals_by_year, year_from, year_to):
+    """Build the response for a chart endpoint called with a year range"""
+    return {
+        f"{key}_by_year": [
+            {"year": year, key: data_by_year[year], "total": totals_by_year[year]}
+            for year in sorted(data_by_year)
+        ],
+        "yoy": calculate_yoy_deltas(totals_by_year),
+        "year_from": year_from,
+        "year_to": year_to
+    }
+
+
 @landing_bp.route('/revenue-chart-data', methods=['GET'])
 @token_required
+@conditional_get('revenue', 'rollup_refresh_state')
 def get_revenue_chart_data():
     """
         Get Revenue Chart Data for histogram visualization
@@ -29,8 +104,10 @@ def get_revenue_chart_data():
         for the specified fiscal year, to be displayed as a histogram chart.
 
         Query parameters:
-        - username: Username of the current user (required)
         - year: Fiscal year (default: 2024)
+        - year_from, year_to: Fiscal year range (optional). When given, the response
+          holds one entry per year under "revenue_chart_data_by_year", each with a "total",
+          plus year-over-year deltas of the totals under "yoy"
 
         Returns:
         - 200 OK with monthly revenue distribution data in format:
@@ -43,21 +120,22 @@ def get_revenue_chart_data():
             ],
             "year": 2024
         }
-        - 400 Bad Request if missing required parameters
-        - 404 Not Found if user doesn't exist
    """
     # Get query parameters
-    username = request.args.get('username', type=str)
     year = request.args.get('year', 2024, type=int)
     
-    # Validate required parameters
-    if not username:
-        return jsonify({"error": "Missing required parameter: username"}), 400
+    # The authenticated user comes from the verified token
+    user = g.principal
     
-    # Get user by username and validate
-    user = User.query.filter_by(username=username).first()
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    # A year_from/year_to range returns one series per fiscal year plus YoY deltas
+    year_range, error = get_year_range()
+    if error:
+        return jsonify({"error": error}), 400
+    if year_range:
+        scope = resolve_user_scope(user)
+        data_by_year = calculate_revenue_chart_data_by_year(scope, *year_range)
+        totals = {year: round(sum(item["revenue"] for item in data), 2) for year, data in data_by_year.items()}
+        return jsonify(build_multi_year_chart_response("revenue_chart_data", data_by_year, totals, *year_range)), 200
     
     # Calculate revenue chart data based on user role
     if user.role == 'director':
@@ -92,82 +170,105 @@ def get_revenue_chart_data():
 def calculate_director_revenue_chart_data(director_id, year):
     """Calculate monthly revenue chart data for a director based on all AEs under them"""
     
-    # Get all account executives managed by this director
-    ae_relations = DirectorAccountExecutive.query.filter_by(director_id=director_id).all()
-    ae_ids = [relation.account_executive_id for relation in ae_relations]
-    
-    # Get all clients managed by these account executives
-    client_ids = []
-    if ae_ids:
-        clients = Client.query.filter(Client.account_executive_id.in_(ae_ids)).all()
-        client_ids = [client.client_id for client in clients]
+    # Get all clients managed by the account executives under this director
+    scope = get_director_scope(director_id)
     
     # Calculate revenue chart data using these client IDs
-    return calculate_revenue_chart_data_for_clients(client_ids, year)
+    return calculate_revenue_chart_data_for_clients(scope, year)
 
 
 def calculate_ae_revenue_chart_data(ae_id, year):
     """Calculate monthly revenue chart data for an account executive based on their clients"""
     
     # Get all clients managed by this account executive
-    clients = Client.query.filter_by(account_executive_id=ae_id).all()
-    client_ids = [client.client_id for client in clients]
+    scope = get_ae_scope(ae_id)
     
     # Calculate revenue chart data using these client IDs
-    return calculate_revenue_chart_data_for_clients(client_ids, year)
+    return calculate_revenue_chart_data_for_clients(scope, year)
 
 
-def calculate_revenue_chart_data_for_clients(client_ids, year):
+def calculate_revenue_chart_data_for_clients(scope, year):
     """
     Calculate monthly revenue chart data for the specified clients
     
     Args:
-        client_ids: List of client IDs to filter by, or None for all clients
+        scope: UserScope of the clients to filter by, or None for all clients
         year: The fiscal year to calculate for
     
     Returns:
         List of dictionaries with month and revenue values
     """
-    # If client_ids is an empty list, return zeros for all months
-    if client_ids is not None and not client_ids:
-        return [
-            {"month": month, "revenue": 0.0}
-            for month in range(1, 13)
-        ]
+    return calculate_revenue_chart_data_by_year(scope, year, year)[year]
+
+
+def calculate_revenue_chart_data_by_year(scope, year_from, year_to):
+    """
+    Calculate monthly revenue chart data for a range of fiscal years in one query
     
-    # Query to calculate sum of revenue grouped by month
+    Args:
+        scope: UserScope of the clients to filter by, or None for all clients
+        year_from: First fiscal year to calculate for
+        year_to: Last fiscal year to calculate for (inclusive)
+    
+    Returns:
+        Dictionary mapping each fiscal year to a list of month and revenue values
+    """
+    years = range(year_from, year_to + 1)
+    
+    # If no clients are in scope, return zeros for all months
+    if scope is not None and not scope.has_clients:
+        return {
+            year: [{"month": month, "revenue": 0.0} for month in range(1, 13)]
+            for year in years
+        }
+    
+    # Read from the monthly rollup when it is fresh, otherwise from raw revenue rows
+    if rollups_are_fresh():
+        rollup = revenue_monthly_rollup
+        month_column, amount_column = rollup.c.period, rollup.c.amount
+        client_column, year_column = rollup.c.client_id, rollup.c.fiscal_year
+    else:
+        month_column, amount_column = Revenue.month, Revenue.amount
+        client_column, year_column = Revenue.client_id, Revenue.fiscal_year
+    
+    # Query to calculate sum of revenue grouped by year and month
     revenue_query = db.session.query(
-        Revenue.month,
-        func.sum(Revenue.amount).label('revenue')
+        year_column,
+        month_column,
+        func.sum(amount_column).label('revenue')
     ).filter(
-        Revenue.fiscal_year == year
+        year_column.between(year_from, year_to)
     )
     
     # Add client filter if needed
-    if client_ids is not None:
-        revenue_query = revenue_query.filter(Revenue.client_id.in_(client_ids))
+    if scope is not None:
+        revenue_query = revenue_query.filter(scope.client_filter(client_column))
     
-    # Group by month and order by month
-    revenue_query = revenue_query.group_by(Revenue.month).order_by(Revenue.month)
+    # Group by year and month
+    revenue_query = revenue_query.group_by(year_column, month_column)
     
     # Execute query
     monthly_results = revenue_query.all()
     
     # Initialize results with zeros for all months
-    monthly_data = {month: 0.0 for month in range(1, 13)}
+    monthly_data = {year: {month: 0.0 for month in range(1, 13)} for year in years}
     
     # Update with actual values from query
-    for month, revenue in monthly_results:
-        monthly_data[month] = float(revenue)
+    for fiscal_year, month, revenue in monthly_results:
+        monthly_data[fiscal_year][month] = float(revenue)
     
-    # Format into list of dictionaries for the response
-    return [
-        {"month": month, "revenue": revenue}
-        for month, revenue in monthly_data.items()
-    ]
+    # Format into lists of dictionaries for the response
+    return {
+        year: [
+            {"month": month, "revenue": revenue}
+            for month, revenue in monthly_data[year].items()
+        ]
+        for year in years
+    }
 
 @landing_bp.route('/win-chart-data', methods=['GET'])
 @token_required
+@conditional_get('win', 'rollup_refresh_state')
 def get_win_chart_data():
     """
         Get Win Chart Data for histogram visualization
@@ -176,8 +277,10 @@ def get_win_chart_data():
         for the specified fiscal year, to be displayed as a histogram chart.
 
         Query parameters:
-        - username: Username of the current user (required)
         - year: Fiscal year (default: 2024)
+        - year_from, year_to: Fiscal year range (optional). When given, the response
+          holds one entry per year under "win_chart_data_by_year", each with a "total",
+          plus year-over-year deltas of the totals under "yoy"
 
         Returns:
         - 200 OK with quarterly win distribution data in format:
@@ -190,21 +293,22 @@ def get_win_chart_data():
             ],
             "year": 2024
         }
-        - 400 Bad Request if missing required parameters
-        - 404 Not Found if user doesn't exist
     """
     # Get query parameters
-    username = request.args.get('username', type=str)
     year = request.args.get('year', 2024, type=int)
     
-    # Validate required parameters
-    if not username:
-        return jsonify({"error": "Missing required parameter: username"}), 400
+    # The authenticated user comes from the verified token
+    user = g.principal
     
-    # Get user by username and validate
-    user = User.query.filter_by(username=username).first()
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    # A year_from/year_to range returns one series per fiscal year plus YoY deltas
+    year_range, error = get_year_range()
+    if error:
+        return jsonify({"error": error}), 400
+    if year_range:
+        scope = resolve_user_scope(user)
+        data_by_year = calculate_win_chart_data_by_year(scope, *year_range)
+        totals = {year: sum(item["win_count"] for item in data) for year, data in data_by_year.items()}
+        return jsonify(build_multi_year_chart_response("win_chart_data", data_by_year, totals, *year_range)), 200
     
     # Calculate win chart data based on user role
     if user.role == 'director':
@@ -230,90 +334,106 @@ def get_win_chart_data():
 def calculate_director_win_chart_data(director_id, year):
     """Calculate quarterly win chart data for a director based on all AEs under them"""
     
-    # Get all account executives managed by this director
-    ae_relations = DirectorAccountExecutive.query.filter_by(director_id=director_id).all()
-    ae_ids = [relation.account_executive_id for relation in ae_relations]
-    
-    # Get all clients managed by these account executives
-    client_ids = []
-    if ae_ids:
-        clients = Client.query.filter(Client.account_executive_id.in_(ae_ids)).all()
-        client_ids = [client.client_id for client in clients]
+    # Get all clients managed by the account executives under this director
+    scope = get_director_scope(director_id)
     
     # Calculate win chart data using these client IDs
-    return calculate_win_chart_data_for_clients(client_ids, year)
+    return calculate_win_chart_data_for_clients(scope, year)
 
 
 def calculate_ae_win_chart_data(ae_id, year):
     """Calculate quarterly win chart data for an account executive based on their clients"""
     
     # Get all clients managed by this account executive
-    clients = Client.query.filter_by(account_executive_id=ae_id).all()
-    client_ids = [client.client_id for client in clients]
+    scope = get_ae_scope(ae_id)
     
     # Calculate win chart data using these client IDs
-    return calculate_win_chart_data_for_clients(client_ids, year)
+    return calculate_win_chart_data_for_clients(scope, year)
 
 
-def calculate_win_chart_data_for_clients(client_ids, year):
+def calculate_win_chart_data_for_clients(scope, year):
     """
     Calculate quarterly win chart data (sum of win multipliers by quarter) for the specified clients
     
     Args:
-        client_ids: List of client IDs to filter by, or None for all clients
+        scope: UserScope of the clients to filter by, or None for all clients
         year: The fiscal year to calculate for
     
     Returns:
         List of dictionaries with quarter and win_count values
     """
-    # If client_ids is an empty list, return zeros for all quarters
-    if client_ids is not None and not client_ids:
-        return [
-            {"quarter": 1, "win_count": 0.0},
-            {"quarter": 2, "win_count": 0.0},
-            {"quarter": 3, "win_count": 0.0},
-            {"quarter": 4, "win_count": 0.0}
-        ]
+    return calculate_win_chart_data_by_year(scope, year, year)[year]
+
+
+def calculate_win_chart_data_by_year(scope, year_from, year_to):
+    """
+    Calculate quarterly win chart data for a range of fiscal years in one query
+    
+    Args:
+        scope: UserScope of the clients to filter by, or None for all clients
+        year_from: First fiscal year to calculate for
+        year_to: Last fiscal year to calculate for (inclusive)
     
-    # Query to calculate sum of win multipliers grouped by quarter
+    Returns:
+        Dictionary mapping each fiscal year to a list of quarter and win_count values
+    """
+    years = range(year_from, year_to + 1)
+    
+    # If no clients are in scope, return zeros for all quarters
+    if scope is not None and not scope.has_clients:
+        return {
+            year: [{"quarter": quarter, "win_count": 0.0} for quarter in range(1, 5)]
+            for year in years
+        }
+    
+    # Read from the quarterly rollup when it is fresh, otherwise from raw win rows
+    if rollups_are_fresh():
+        rollup = win_quarterly_rollup
+        quarter_column, multiplier_column = rollup.c.period, rollup.c.amount
+        client_column, year_column = rollup.c.client_id, rollup.c.fiscal_year
+    else:
+        quarter_column, multiplier_column = Win.fiscal_quarter, Win.win_multiplier
+        client_column, year_column = Win.client_id, Win.fiscal_year
+    
+    # Query to calculate sum of win multipliers grouped by year and quarter
     wins_query = db.session.query(
-        Win.fiscal_quarter,
-        func.sum(Win.win_multiplier).label('win_count')
+        year_column,
+        quarter_column,
+        func.sum(multiplier_column).label('win_count')
     ).filter(
-        Win.fiscal_year == year
+        year_column.between(year_from, year_to)
     )
     
     # Add client filter if needed
-    if client_ids is not None:
-        wins_query = wins_query.filter(Win.client_id.in_(client_ids))
+    if scope is not None:
+        wins_query = wins_query.filter(scope.client_filter(client_column))
     
-    # Group by quarter and order by quarter
-    wins_query = wins_query.group_by(Win.fiscal_quarter).order_by(Win.fiscal_quarter)
+    # Group by year and quarter
+    wins_query = wins_query.group_by(year_column, quarter_column)
     
     # Execute query
     quarterly_results = wins_query.all()
     
     # Initialize results with zeros for all quarters
-    quarterly_data = {
-        1: 0.0,
-        2: 0.0,
-        3: 0.0,
-        4: 0.0
-    }
+    quarterly_data = {year: {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0} for year in years}
     
     # Update with actual values from query
-    for quarter, win_count in quarterly_results:
-        quarterly_data[quarter] = float(win_count)
+    for fiscal_year, quarter, win_count in quarterly_results:
+        quarterly_data[fiscal_year][quarter] = float(win_count)
     
-    # Format into list of dictionaries for the response
-    return [
-        {"quarter": quarter, "win_count": count}
-        for quarter, count in quarterly_data.items()
-    ]
+    # Format into lists of dictionaries for the response
+    return {
+        year: [
+            {"quarter": quarter, "win_count": count}
+            for quarter, count in quarterly_data[year].items()
+        ]
+        for year in years
+    }
 
 
 @landing_bp.route('/kpi-cards', methods=['GET'])
 @token_required
+@conditional_get('opportunity', 'revenue', 'signing', 'win')
 def get_kpi_cards():
     """
         Get Key Performance Indicators for the landing page cards
@@ -322,8 +442,10 @@ def get_kpi_cards():
         Based on user role (director or account executive) and year
 
         Query parameters:
-        - username: Username of the current user (required)
         - year: Fiscal year (default: 2024)
+        - year_from, year_to: Fiscal year range (optional). When given, the response
+          holds one entry per year under "kpis_by_year" plus per-metric
+          year-over-year deltas under "yoy"
 
         Returns:
         - 200 OK with calculated KPI values in format:
@@ -333,23 +455,31 @@ def get_kpi_cards():
             "signings": 50000.0,
             "wins": 3.5
         }
-        - 400 Bad Request if missing required parameters
-        - 404 Not Found if user doesn't exist
         - 500 Internal Server Error with error details if calculation fails
     """
     try:
         # Get query parameters with defaults
-        username = request.args.get('username', type=str)
         year = request.args.get('year', 2024, type=int)
         
-        # Validate required parameters
-        if not username:
-            return jsonify({"error": "Missing required parameter: username"}), 400
-        
-        # Get user by username and validate
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        # The authenticated user comes from the verified token
+        user = g.principal
+        
+        # A year_from/year_to range returns one series per fiscal year plus YoY deltas per KPI
+        year_range, error = get_year_range()
+        if error:
+            return jsonify({"error": error}), 400
+        if year_range:
+            scope = resolve_user_scope(user)
+            kpis_by_year = calculate_kpis_by_year(scope, *year_range)
+            return jsonify({
+                "kpis_by_year": [dict(year=year, **kpis) for year, kpis in sorted(kpis_by_year.items())],
+                "yoy": {
+                    metric: calculate_yoy_deltas({year: kpis[metric] for year, kpis in kpis_by_year.items()})
+                    for metric in ('pipeline', 'revenue', 'signings', 'wins')
+                },
+                "year_from": year_range[0],
+                "year_to": year_range[1]
+            }), 200
         
         # Initialize default KPIs
         kpis = {
@@ -386,27 +516,15 @@ def calculate_director_kpis(director_id, year):
             'wins': 0.0
         }
         
-        # Get all account executives managed by this director
-        ae_relations = DirectorAccountExecutive.query.filter_by(director_id=director_id).all()
-        
-        # If no AEs are found, return zeros
-        if not ae_relations:
-            return kpis
-            
-        ae_ids = [relation.account_executive_id for relation in ae_relations]
-        
-        # Get all clients managed by these account executives
-        client_ids = []
-        clients = Client.query.filter(Client.account_executive_id.in_(ae_ids)).all()
+        # Get all clients managed by the account executives under this director
+        scope = get_director_scope(director_id)
         
         # If no clients are found, return zeros
-        if not clients:
+        if not scope.has_clients:
             return kpis
-            
-        client_ids = [client.client_id for client in clients]
         
         # Calculate KPIs using these client IDs
-        return calculate_kpis_for_clients(client_ids, year)
+        return calculate_kpis_for_clients(scope, year)
         
     except Exception as e:
         logging.error(f"Error calculating director KPIs: {str(e)}")
@@ -431,16 +549,14 @@ def calculate_ae_kpis(ae_id, year):
         }
         
         # Get all clients managed by this account executive
-        clients = Client.query.filter_by(account_executive_id=ae_id).all()
+        scope = get_ae_scope(ae_id)
         
         # If no clients are found, return zeros
-        if not clients:
+        if not scope.has_clients:
             return kpis
-            
-        client_ids = [client.client_id for client in clients]
         
         # Calculate KPIs using these client IDs
-        return calculate_kpis_for_clients(client_ids, year)
+        return calculate_kpis_for_clients(scope, year)
         
     except Exception as e:
         logging.error(f"Error calculating AE KPIs: {str(e)}")
@@ -453,12 +569,12 @@ def calculate_ae_kpis(ae_id, year):
         }
 
 
-def calculate_kpis_for_clients(client_ids, year):
+def calculate_kpis_for_clients(scope, year):
     """
     Calculate all four KPIs for the specified clients for the entire year
     
     Args:
-        client_ids: List of client IDs to filter by
+        scope: UserScope of the clients to filter by
         year: The fiscal year to calculate for
     
     Returns:
@@ -473,31 +589,38 @@ def calculate_kpis_for_clients(client_ids, year):
             'wins': 0.0
         }
         
-        # If client_ids is an empty list, return zeros
-        if not client_ids:
+        # If no clients are in scope, return zeros
+        if not scope.has_clients:
             return kpis
+        
+        # Calculate all four KPIs in a single statement
+        try:
+            return calculate_kpis_single_query(scope, year)
+        except Exception as e:
+            logging.error(f"Error in single-query KPI calculation, falling back to per-metric queries: {str(e)}")
+            db.session.rollback()
             
         # Calculate each KPI individually and catch exceptions for each
         try:
-            kpis['pipeline'] = calculate_pipeline_kpi(client_ids, year)
+            kpis['pipeline'] = calculate_pipeline_kpi(scope, year)
         except Exception as e:
             logging.error(f"Error calculating pipeline KPI: {str(e)}")
             kpis['pipeline'] = 0.0
             
         try:
-            kpis['revenue'] = calculate_revenue_kpi(client_ids, year)
+            kpis['revenue'] = calculate_revenue_kpi(scope, year)
         except Exception as e:
             logging.error(f"Error calculating revenue KPI: {str(e)}")
             kpis['revenue'] = 0.0
             
         try:
-            kpis['signings'] = calculate_signings_kpi(client_ids, year)
+            kpis['signings'] = calculate_signings_kpi(scope, year)
         except Exception as e:
             logging.error(f"Error calculating signings KPI: {str(e)}")
             kpis['signings'] = 0.0
             
         try:
-            kpis['wins'] = calculate_wins_kpi(client_ids, year)
+            kpis['wins'] = calculate_wins_kpi(scope, year)
         except Exception as e:
             logging.error(f"Error calculating wins KPI: {str(e)}")
             kpis['wins'] = 0.0
@@ -514,30 +637,100 @@ def calculate_kpis_for_clients(client_ids, year):
         }
 
 
-def calculate_pipeline_kpi(client_ids, year):
+def pipeline_kpi_expression():
+    """Aggregate for the pipeline KPI (weighted amount of non-omitted opportunities)"""
+    # Use the positional form of case for the weighted pipeline value
+    return func.sum(
+        case(
+            (Opportunity.forecast_category != 'omit', 
+             Opportunity.amount * Opportunity.probability / 100.0),
+            else_=0.0
+        )
+    )
+
+
+def revenue_kpi_expression():
+    """Aggregate for the revenue KPI"""
+    return func.coalesce(
+        func.sum(Revenue.amount),
+        0.0  # Default to 0.0 if no rows match
+    )
+
+
+def signings_kpi_expression():
+    """Aggregate for the signings KPI (annualized contract values)"""
+    # The annualized value is a stored column on signing, so this is a plain SUM
+    return func.coalesce(
+        func.sum(Signing.annualized_value),
+        0.0  # Default to 0.0 if no rows match
+    )
+
+
+def wins_kpi_expression():
+    """Aggregate for the wins KPI (sum of win multipliers)"""
+    return func.coalesce(
+        func.sum(Win.win_multiplier),
+        0.0  # Default to 0.0 if no rows match
+    )
+
+
+def opportunity_created_in_years(year_from, year_to):
+    """
+    Filter opportunities to those created in a range of years
+    
+    A half-open timestamp range, so it still uses the created_date indexes
+    but places every row (including the last second of a year) in the same
+    year as EXTRACT(year FROM created_date) in rollup_pipeline_category.
+    """
+    return and_(
+        Opportunity.created_date >= datetime(year_from, 1, 1),
+        Opportunity.created_date < datetime(year_to + 1, 1, 1)
+    )
+
+
+def kpi_rollups():
+    """
+    Rollup holding each KPI's total by client and year
+    
+    Each KPI is the sum of its rollup's amount column over the year: the
+    pipeline rollup already weights amounts and zeroes omitted opportunities,
+    and is keyed by creation year like opportunity_created_in_years().
+    """
+    return {
+        'pipeline': pipeline_category_rollup,
+        'revenue': revenue_monthly_rollup,
+        'signings': signing_category_rollup,
+        'wins': win_quarterly_rollup
+    }
+
+
+def build_rollup_kpi_query(metric, scope, year):
+    """Build the query for a KPI value from its rollup"""
+    rollup = kpi_rollups()[metric]
+    return db.session.query(
+        func.coalesce(func.sum(rollup.c.amount), 0.0).label('value')
+    ).filter(
+        scope.client_filter(rollup.c.client_id),
+        rollup.c.fiscal_year == year
+    )
+
+
+def build_pipeline_kpi_query(scope, year):
+    """Build the query for the pipeline KPI value (weighted opportunity amount)"""
+    if rollups_are_fresh():
+        return build_rollup_kpi_query('pipeline', scope, year)
+    return db.session.query(
+        pipeline_kpi_expression().label('value')
+    ).filter(
+        scope.client_filter(Opportunity.client_id),
+        opportunity_created_in_years(year, year)
+    )
+
+
+def calculate_pipeline_kpi(scope, year):
     """Calculate the pipeline KPI value"""
     try:
-        # Use date range filtering instead of extract function to handle timestamps properly
-        start_date = f"{year}-01-01 00:00:00"
-        end_date = f"{year}-12-31 23:59:59"
-        
-        # Create a query to calculate weighted pipeline value using the correct case syntax
-        # The error shows we need to use positional elements for case statements
-        pipeline_query = db.session.query(
-            func.sum(
-                case(
-                    (Opportunity.forecast_category != 'omit', 
-                     Opportunity.amount * Opportunity.probability / 100.0),
-                    else_=0.0
-                )
-            )
-        ).filter(
-            Opportunity.client_id.in_(client_ids),
-            Opportunity.created_date >= start_date,
-            Opportunity.created_date <= end_date
-        )
-        
-        pipeline_result = pipeline_query.scalar()
+        pipeline_result = build_pipeline_kpi_query(scope, year).scalar()
         
         # Return the result, default to 0.0 if None
         return float(pipeline_result) if pipeline_result is not None else 0.0
@@ -547,22 +740,24 @@ def calculate_pipeline_kpi(client_ids, year):
         print(f"Error in pipeline calculation: {str(e)}")
         return 0.0
 
-def calculate_revenue_kpi(client_ids, year):
+
+def build_revenue_kpi_query(scope, year):
+    """Build the query for the revenue KPI value for the entire year"""
+    if rollups_are_fresh():
+        return build_rollup_kpi_query('revenue', scope, year)
+    return db.session.query(
+        revenue_kpi_expression().label('value')
+    ).filter(
+        scope.client_filter(Revenue.client_id),
+        Revenue.fiscal_year == year
+    )
+
+
+def calculate_revenue_kpi(scope, year):
     """Calculate the revenue KPI value for the entire year"""
     try:
-        # Simplify the query and use coalesce to handle nulls
-        revenue_query = db.session.query(
-            func.coalesce(
-                func.sum(Revenue.amount),
-                0.0  # Default to 0.0 if no rows match
-            )
-        ).filter(
-            Revenue.client_id.in_(client_ids),
-            Revenue.fiscal_year == year
-        )
-        
         # Execute query
-        revenue_result = revenue_query.scalar()
+        revenue_result = build_revenue_kpi_query(scope, year).scalar()
         
         # Return the result, default to 0.0 if None
         return float(revenue_result) if revenue_result is not None else 0.0
@@ -572,31 +767,23 @@ def calculate_revenue_kpi(client_ids, year):
         return 0.0
 
 
-def calculate_signings_kpi(client_ids, year):
+def build_signings_kpi_query(scope, year):
+    """Build the query for the signings KPI value (annualized contract values)"""
+    if rollups_are_fresh():
+        return build_rollup_kpi_query('signings', scope, year)
+    return db.session.query(
+        signings_kpi_expression().label('value')
+    ).filter(
+        scope.client_filter(Signing.client_id),
+        Signing.fiscal_year == year
+    )
+
+
+def calculate_signings_kpi(scope, year):
     """Calculate the signings KPI value (annualized contract values) for the entire year"""
     try:
-        # Simplify the date calculation to reduce errors
-        # Instead of complex date math, use a simpler approach
-        signings_query = db.session.query(
-            func.coalesce(
-                func.sum(
-                    Signing.total_contract_value / 
-                    func.greatest(
-                        # Calculate the duration in years using a simpler approach
-                        # Subtract the years directly and add 1 for partial years
-                        (extract('year', Signing.end_date) - extract('year', Signing.start_date) + 1),
-                        1.0  # Ensure we don't divide by zero
-                    )
-                ),
-                0.0  # Default to 0.0 if no rows match
-            )
-        ).filter(
-            Signing.client_id.in_(client_ids),
-            Signing.fiscal_year == year
-        )
-        
         # Execute query
-        signings_result = signings_query.scalar()
+        signings_result = build_signings_kpi_query(scope, year).scalar()
         
         # Return the result, default to 0.0 if None
         return float(signings_result) if signings_result is not None else 0.0
@@ -606,22 +793,23 @@ def calculate_signings_kpi(client_ids, year):
         return 0.0
 
 
-def calculate_wins_kpi(client_ids, year):
+def build_wins_kpi_query(scope, year):
+    """Build the query for the wins KPI value (sum of win multipliers)"""
+    if rollups_are_fresh():
+        return build_rollup_kpi_query('wins', scope, year)
+    return db.session.query(
+        wins_kpi_expression().label('value')
+    ).filter(
+        scope.client_filter(Win.client_id),
+        Win.fiscal_year == year
+    )
+
+
+def calculate_wins_kpi(scope, year):
     """Calculate the wins KPI value (sum of win multipliers) for the entire year"""
     try:
-        # Use coalesce to handle nulls
-        wins_query = db.session.query(
-            func.coalesce(
-                func.sum(Win.win_multiplier),
-                0.0  # Default to 0.0 if no rows match
-            )
-        ).filter(
-            Win.client_id.in_(client_ids),
-            Win.fiscal_year == year
-        )
-        
         # Execute query
-        wins_result = wins_query.scalar()
+        wins_result = build_wins_kpi_query(scope, year).scalar()
         
         # Return the result, default to 0.0 if None
         return float(wins_result) if wins_result is not None else 0.0
@@ -629,10 +817,144 @@ def calculate_wins_kpi(client_ids, year):
     except Exception as e:
         logging.error(f"Error in wins calculation: {str(e)}")
         return 0.0
+
+
+def calculate_kpis_single_query(scope, year):
+    """
+    Calculate all four KPIs in one statement
+    
+    Each KPI query from the per-metric builders becomes a single-row CTE,
+    and the CTEs are cross joined so the four values come back in one row,
+    using a single round trip and connection checkout. All four read the
+    rollups when they are fresh, or all four read the raw tables.
+    
+    Args:
+        scope: UserScope of the clients to filter by
+        year: The fiscal year to calculate for
+    
+    Returns:
+        Dictionary with calculated KPI values
+    """
+    with rollup_source(rollups_are_fresh()):
+        pipeline_cte = build_pipeline_kpi_query(scope, year).cte('pipeline_kpi')
+        revenue_cte = build_revenue_kpi_query(scope, year).cte('revenue_kpi')
+        signings_cte = build_signings_kpi_query(scope, year).cte('signings_kpi')
+        wins_cte = build_wins_kpi_query(scope, year).cte('wins_kpi')
+    
+    kpi_query = db.session.query(
+        pipeline_cte.c.value.label('pipeline'),
+        revenue_cte.c.value.label('revenue'),
+        signings_cte.c.value.label('signings'),
+        wins_cte.c.value.label('wins')
+    ).select_from(
+        pipeline_cte
+    ).join(
+        revenue_cte, true()
+    ).join(
+        signings_cte, true()
+    ).join(
+        wins_cte, true()
+    )
+    
+    row = kpi_query.one()
+    
+    return {
+        'pipeline': float(row.pipeline) if row.pipeline is not None else 0.0,
+        'revenue': float(row.revenue) if row.revenue is not None else 0.0,
+        'signings': float(row.signings) if row.signings is not None else 0.0,
+        'wins': float(row.wins) if row.wins is not None else 0.0
+    }
+    
+
+def calculate_kpis_by_year(scope, year_from, year_to):
+    """
+    Calculate all four KPIs for a range of years in one statement
+    
+    Each metric is grouped by year (the opportunity creation year for
+    pipeline, the fiscal year for the others) and the four grouped
+    queries are combined with UNION ALL. The rollups are read instead of
+    the raw tables when they are fresh.
+    
+    Args:
+        scope: UserScope of the clients to filter by
+        year_from: First year to calculate for
+        year_to: Last year to calculate for (inclusive)
+    
+    Returns:
+        Dictionary mapping each year to its dictionary of KPI values
+    """
+    kpis_by_year = {
+        year: {'pipeline': 0.0, 'revenue': 0.0, 'signings': 0.0, 'wins': 0.0}
+        for year in range(year_from, year_to + 1)
+    }
+    
+    # If no clients are in scope, return zeros
+    if not scope.has_clients:
+        return kpis_by_year
+    
+    if rollups_are_fresh():
+        queries = [
+            db.session.query(
+                literal(metric).label('metric'),
+                rollup.c.fiscal_year.label('fiscal_year'),
+                func.sum(rollup.c.amount).label('value')
+            ).filter(
+                scope.client_filter(rollup.c.client_id),
+                rollup.c.fiscal_year.between(year_from, year_to)
+            ).group_by(rollup.c.fiscal_year)
+            for metric, rollup in kpi_rollups().items()
+        ]
+        results = queries[0].union_all(*queries[1:]).all()
+        
+        for metric, fiscal_year, value in results:
+            if value is not None:
+                kpis_by_year[int(fiscal_year)][metric] = float(value)
+        
+        return kpis_by_year
+    
+    created_year = cast(extract('year', Opportunity.created_date), Integer)
+    pipeline_query = db.session.query(
+        literal('pipeline').label('metric'),
+        created_year.label('fiscal_year'),
+        pipeline_kpi_expression().label('value')
+    ).filter(
+        scope.client_filter(Opportunity.client_id),
+        opportunity_created_in_years(year_from, year_to)
+    ).group_by(created_year)
+    
+    revenue_query = db.session.query(
+        literal('revenue'), Revenue.fiscal_year, revenue_kpi_expression()
+    ).filter(
+        scope.client_filter(Revenue.client_id),
+        Revenue.fiscal_year.between(year_from, year_to)
+    ).group_by(Revenue.fiscal_year)
+    
+    signings_query = db.session.query(
+        literal('signings'), Signing.fiscal_year, signings_kpi_expression()
+    ).filter(
+        scope.client_filter(Signing.client_id),
+        Signing.fiscal_year.between(year_from, year_to)
+    ).group_by(Signing.fiscal_year)
+    
+    wins_query = db.session.query(
+        literal('wins'), Win.fiscal_year, wins_kpi_expression()
+    ).filter(
+        scope.client_filter(Win.client_id),
+        Win.fiscal_year.between(year_from, year_to)
+    ).group_by(Win.fiscal_year)
+    
+    results = pipeline_query.union_all(revenue_query, signings_query, wins_query).all()
+    
+    for metric, fiscal_year, value in results:
+        if value is not None:
+            kpis_by_year[int(fiscal_year)][metric] = float(value)
+    
+    return kpis_by_year
     
 
 @landing_bp.route('/pipeline-chart-data', methods=['GET'])
 @token_required
+@conditional_get('opportunity', 'rollup_refresh_state')
 def get_pipeline_chart_data():
     """
     Get Pipeline Chart Data for pie chart visualization
@@ -641,8 +963,10 @@ def get_pipeline_chart_data():
     for the specified fiscal year, to be displayed as a pie chart.
 
     Query parameters:
-    - username: Username of the current user (required)
     - year: Fiscal year (default: 2024)
+    - year_from, year_to: Fiscal year range (optional). When given, the response
+      holds one entry per year under "pipeline_chart_data_by_year", each with a "total",
+      plus year-over-year deltas of the totals under "yoy"
 
     Returns:
     - 200 OK with forecast category distribution data in format:
@@ -656,22 +980,23 @@ def get_pipeline_chart_data():
         ],
         "year": 2024
     }
-    - 400 Bad Request if missing required parameters
-    - 404 Not Found if user doesn't exist
     """
     try:
         # Get query parameters
-        username = request.args.get('username', type=str)
         year = request.args.get('year', 2024, type=int)
         
-        # Validate required parameters
-        if not username:
-            return jsonify({"error": "Missing required parameter: username"}), 400
+        # The authenticated user comes from the verified token
+        user = g.principal
         
-        # Get user by username and validate
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        # A year_from/year_to range returns one series per fiscal year plus YoY deltas
+        year_range, error = get_year_range()
+        if error:
+            return jsonify({"error": error}), 400
+        if year_range:
+            scope = resolve_user_scope(user)
+            data_by_year = calculate_pipeline_chart_data_by_year(scope, *year_range)
+            totals = {year: sum(item["count"] for item in data) for year, data in data_by_year.items()}
+            return jsonify(build_multi_year_chart_response("pipeline_chart_data", data_by_year, totals, *year_range)), 200
         
         # Calculate pipeline chart data based on user role
         if user.role == 'director':
@@ -698,27 +1023,15 @@ def get_pipeline_chart_data():
 def calculate_director_pipeline_chart_data(director_id, year):
     """Calculate pipeline chart data for a director based on all AEs under them"""
     try:
-        # Get all account executives managed by this director
-        ae_relations = DirectorAccountExecutive.query.filter_by(director_id=director_id).all()
-        
-        # If no AEs are found, return empty list
-        if not ae_relations:
-            return []
-            
-        ae_ids = [relation.account_executive_id for relation in ae_relations]
-        
-        # Get all clients managed by these account executives
-        client_ids = []
-        clients = Client.query.filter(Client.account_executive_id.in_(ae_ids)).all()
+        # Get all clients managed by the account executives under this director
+        scope = get_director_scope(director_id)
         
         # If no clients are found, return empty list
-        if not clients:
+        if not scope.has_clients:
             return []
-            
-        client_ids = [client.client_id for client in clients]
         
         # Calculate pipeline chart data using these client IDs
-        return calculate_pipeline_chart_data_for_clients(client_ids, year)
+        return calculate_pipeline_chart_data_for_clients(scope, year)
         
     except Exception as e:
         print(f"Error calculating director pipeline chart data: {str(e)}")
@@ -729,99 +1042,137 @@ def calculate_ae_pipeline_chart_data(ae_id, year):
     """Calculate pipeline chart data for an account executive based on their clients"""
     try:
         # Get all clients managed by this account executive
-        clients = Client.query.filter_by(account_executive_id=ae_id).all()
+        scope = get_ae_scope(ae_id)
         
         # If no clients are found, return empty list
-        if not clients:
+        if not scope.has_clients:
             return []
-            
-        client_ids = [client.client_id for client in clients]
         
         # Calculate pipeline chart data using these client IDs
-        return calculate_pipeline_chart_data_for_clients(client_ids, year)
+        return calculate_pipeline_chart_data_for_clients(scope, year)
         
     except Exception as e:
         print(f"Error calculating AE pipeline chart data: {str(e)}")
         return []
 
 
-def calculate_pipeline_chart_data_for_clients(client_ids, year):
+def calculate_pipeline_chart_data_for_clients(scope, year):
     """
     Calculate pipeline chart data (count of opportunities by forecast category) for the specified clients
     
     Args:
-        client_ids: List of client IDs to filter by
+        scope: UserScope of the clients to filter by
         year: The fiscal year to calculate for
     
     Returns:
         List of dictionaries with forecast_category, count, and percentage values
     """
+    return calculate_pipeline_chart_data_by_year(scope, year, year)[year]
+
+
+def calculate_pipeline_chart_data_by_year(scope, year_from, year_to):
+    """
+    Calculate pipeline chart data for a range of years in one query
+    
+    Opportunities are assigned to the year of their created_date.
+    
+    Args:
+        scope: UserScope of the clients to filter by
+        year_from: First year to calculate for
+        year_to: Last year to calculate for (inclusive)
+    
+    Returns:
+        Dictionary mapping each year to a list of forecast_category, count,
+        and percentage values
+    """
+    years = range(year_from, year_to + 1)
+    
     try:
-        # If client_ids is an empty list, return empty list
-        if not client_ids:
-            return []
+        # If no clients are in scope, return empty lists
+        if not scope.has_clients:
+            return {year: [] for year in years}
             
-        # Use date range filtering for the year
-        start_date = f"{year}-01-01 00:00:00"
-        end_date = f"{year}-12-31 23:59:59"
-        
         # All possible forecast categories
         all_categories = ['pipeline', 'upside', 'commit', 'closed-won', 'omit']
         
-        # Query to count opportunities grouped by forecast_category
-        pipeline_query = db.session.query(
-            Opportunity.forecast_category,
-            func.count(Opportunity.opportunity_id).label('count')
-        ).filter(
-            Opportunity.client_id.in_(client_ids),
-            Opportunity.created_date >= start_date,
-            Opportunity.created_date <= end_date
-        ).group_by(
-            Opportunity.forecast_category
-        )
+        # Query to count opportunities grouped by year and forecast_category
+        if rollups_are_fresh():
+            # The rollup already groups opportunities by creation year
+            rollup = pipeline_category_rollup
+            pipeline_query = db.session.query(
+                rollup.c.fiscal_year,
+                rollup.c.category,
+                func.sum(rollup.c.row_count).label('count')
+            ).filter(
+                scope.client_filter(rollup.c.client_id),
+                rollup.c.fiscal_year.between(year_from, year_to)
+            ).group_by(
+                rollup.c.fiscal_year,
+                rollup.c.category
+            )
+        else:
+            created_year = extract('year', Opportunity.created_date)
+            pipeline_query = db.session.query(
+                created_year,
+                Opportunity.forecast_category,
+                func.count(Opportunity.opportunity_id).label('count')
+            ).filter(
+                scope.client_filter(Opportunity.client_id),
+                opportunity_created_in_years(year_from, year_to)
+            ).group_by(
+                created_year,
+                Opportunity.forecast_category
+            )
         
         # Execute query
-        print(f"Pipeline chart query: {str(pipeline_query)}")
         results = pipeline_query.all()
-        print(f"Pipeline chart raw results: {results}")
-        
-        # Convert results to dict for easier manipulation
-        category_counts = {category: 0 for category in all_categories}
-        for category, count in results:
-            if category in category_counts:
-                category_counts[category] = count
-        
-        # Calculate total count
-        total_count = sum(category_counts.values())
-        
-        # Calculate percentages (avoid division by zero)
-        if total_count > 0:
-            category_percentages = {
-                category: (count / total_count) * 100.0
-                for category, count in category_counts.items()
-            }
-        else:
-            category_percentages = {category: 0.0 for category in all_categories}
-        
-        # Format into list of dictionaries for the response
-        formatted_data = [
-            {
-                "forecast_category": category,
-                "count": count,
-                "percentage": round(category_percentages[category], 1)
-            }
-            for category, count in category_counts.items()
-        ]
         
-        # Sort by forecast category for consistent output
-        return sorted(formatted_data, key=lambda x: x["forecast_category"])
+        # Convert results to dicts for easier manipulation
+        category_counts = {year: {category: 0 for category in all_categories} for year in years}
+        for created, category, count in results:
+            if category in category_counts[int(created)]:
+                category_counts[int(created)][category] = int(count)
+        
+        return {
+            year: format_pipeline_chart_data(category_counts[year])
+            for year in years
+        }
         
     except Exception as e:
-        print(f"Error in calculate_pipeline_chart_data_for_clients: {str(e)}")
-        return []
+        print(f"Error in calculate_pipeline_chart_data_by_year: {str(e)}")
+        return {year: [] for year in years}
+
+
+def format_pipeline_chart_data(category_counts):
+    """Format forecast category counts into chart data with percentages"""
+    # Calculate total count
+    total_count = sum(category_counts.values())
+    
+    # Calculate percentages (avoid division by zero)
+    if total_count > 0:
+        category_percentages = {
+            category: (count / total_count) * 100.0
+            for category, count in category_counts.items()
+        }
+    else:
+        category_percentages = {category: 0.0 for category in category_counts}
+    
+    # Format into list of dictionaries for the response
+    formatted_data = [
+        {
+            "forecast_category": category,
+            "count": count,
+            "percentage": round(category_percentages[category], 1)
+        }
+        for category, count in category_counts.items()
+    ]
+    
+    # Sort by forecast category for consistent output
+    return sorted(formatted_data, key=lambda x: x["forecast_category"])
 
 @landing_bp.route('/signings-chart-data', methods=['GET'])
 @token_required
+@conditional_get('signing', 'product', 'rollup_refresh_state')
 def get_signings_chart_data():
     """
     Get Signings Chart Data for pie chart visualization
@@ -830,8 +1181,10 @@ def get_signings_chart_data():
     for the specified fiscal year, to be displayed as a pie chart.
 
     Query parameters:
-    - username: Username of the current user (required)
     - year: Fiscal year (default: 2024)
+    - year_from, year_to: Fiscal year range (optional). When given, the response
+      holds one entry per year under "signings_chart_data_by_year", each with a "total",
+      plus year-over-year deltas of the totals under "yoy"
 
     Returns:
     - 200 OK with product category distribution data in format:
@@ -844,22 +1197,26 @@ def get_signings_chart_data():
         ],
         "year": 2024
     }
-    - 400 Bad Request if missing required parameters
-    - 404 Not Found if user doesn't exist
     """
     try:
         # Get query parameters
-        username = request.args.get('username', type=str)
         year = request.args.get('year', 2024, type=int)
         
-        # Validate required parameters
-        if not username:
-            return jsonify({"error": "Missing required parameter: username"}), 400
-        
-        # Get user by username and validate
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        # The authenticated user comes from the verified token
+        user = g.principal
+        
+        # A year_from/year_to range returns one series per fiscal year plus YoY deltas
+        year_range, error = get_year_range()
+        if error:
+            return jsonify({"error": error}), 400
+        if year_range:
+            scope = resolve_user_scope(user)
+            if scope.has_clients:
+                data_by_year = calculate_signings_chart_data_by_year(scope, *year_range)
+            else:
+                data_by_year = {year: [] for year in range(year_range[0], year_range[1] + 1)}
+            totals = {year: sum(item["count"] for item in data) for year, data in data_by_year.items()}
+            return jsonify(build_multi_year_chart_response("signings_chart_data", data_by_year, totals, *year_range)), 200
         
         # Calculate signings chart data based on user role
         if user.role == 'director':
@@ -886,27 +1243,15 @@ def get_signings_chart_data():
 def calculate_director_signings_chart_data(director_id, year):
     """Calculate signings chart data for a director based on all AEs under them"""
     try:
-        # Get all account executives managed by this director
-        ae_relations = DirectorAccountExecutive.query.filter_by(director_id=director_id).all()
-        
-        # If no AEs are found, return empty list
-        if not ae_relations:
-            return []
-            
-        ae_ids = [relation.account_executive_id for relation in ae_relations]
-        
-        # Get all clients managed by these account executives
-        client_ids = []
-        clients = Client.query.filter(Client.account_executive_id.in_(ae_ids)).all()
+        # Get all clients managed by the account executives under this director
+        scope = get_director_scope(director_id)
         
         # If no clients are found, return empty list
-        if not clients:
+        if not scope.has_clients:
             return []
-            
-        client_ids = [client.client_id for client in clients]
         
         # Calculate signings chart data using these client IDs
-        return calculate_signings_chart_data_for_clients(client_ids, year)
+        return calculate_signings_chart_data_for_clients(scope, year)
         
     except Exception as e:
         print(f"Error calculating director signings chart data: {str(e)}")
@@ -917,23 +1262,21 @@ def calculate_ae_signings_chart_data(ae_id, year):
     """Calculate signings chart data for an account executive based on their clients"""
     try:
         # Get all clients managed by this account executive
-        clients = Client.query.filter_by(account_executive_id=ae_id).all()
+        scope = get_ae_scope(ae_id)
         
         # If no clients are found, return empty list
-        if not clients:
+        if not scope.has_clients:
             return []
-            
-        client_ids = [client.client_id for client in clients]
         
         # Calculate signings chart data using these client IDs
-        return calculate_signings_chart_data_for_clients(client_ids, year)
+        return calculate_signings_chart_data_for_clients(scope, year)
         
     except Exception as e:
         print(f"Error calculating AE signings chart data: {str(e)}")
         return []
 
 
-def calculate_signings_chart_data_for_clients(client_ids, year):
+def calculate_signings_chart_data_for_clients(scope, year):
     """
     Calculate signings chart data (count of signings by product category) for the specified clients.
     
@@ -944,12 +1287,30 @@ def calculate_signings_chart_data_for_clients(client_ids, year):
     - app-modernization (aggregate of: mandiant, looker, apigee, maps, marketplace, and vertex-ai-platform)
     
     Args:
-        client_ids: List of client IDs to filter by
+        scope: UserScope of the clients to filter by
         year: The fiscal year to calculate for
     
     Returns:
         List of dictionaries with product_category, count, and percentage values
     """
+    return calculate_signings_chart_data_by_year(scope, year, year)[year]
+
+
+def calculate_signings_chart_data_by_year(scope, year_from, year_to):
+    """
+    Calculate signings chart data for a range of fiscal years in one query
+    
+    Args:
+        scope: UserScope of the clients to filter by
+        year_from: First fiscal year to calculate for
+        year_to: Last fiscal year to calculate for (inclusive)
+    
+    Returns:
+        Dictionary mapping each fiscal year to a list of product_category,
+        count, and percentage values
+    """
+    years = range(year_from, year_to + 1)
+    
     try:
         # Define standard product categories we want to include
         standard_categories = ["gcp-core", "data-analytics", "cloud-security"]
@@ -960,61 +1321,226 @@ def calculate_signings_chart_data_for_clients(client_ids, year):
         # All categories we care about (for returning empty results)
         all_display_categories = standard_categories + ["app-modernization"]
         
-        # If client_ids is an empty list, return empty list with standard categories
-        if not client_ids:
-            return [{"product_category": category, "count": 0, "percentage": 0.0} for category in all_display_categories]
-        
-        # Query to count signings and get product categories
-        # We need to join with the Product table to get the product categories
-        signings_query = db.session.query(
-            Product.product_category,
-            func.count(Signing.signing_id).label('count')
-        ).join(
-            Product, Signing.product_id == Product.product_id
-        ).filter(
-            Signing.client_id.in_(client_ids),
-            Signing.fiscal_year == year
-        ).group_by(
-            Product.product_category
-        )
+        # If no clients are in scope, return empty lists with standard categories
+        if not scope.has_clients:
+            return {
+                year: [{"product_category": category, "count": 0, "percentage": 0.0} for category in all_display_categories]
+                for year in years
+            }
+        
+        # Query to count signings grouped by year and product category
+        if rollups_are_fresh():
+            # The rollup is already keyed by product category
+            rollup = signing_category_rollup
+            signings_query = db.session.query(
+                rollup.c.fiscal_year,
+                rollup.c.category,
+                func.sum(rollup.c.row_count).label('count')
+            ).filter(
+                scope.client_filter(rollup.c.client_id),
+                rollup.c.fiscal_year.between(year_from, year_to)
+            ).group_by(
+                rollup.c.fiscal_year,
+                rollup.c.category
+            )
+        else:
+            # We need to join with the Product table to get the product categories
+            signings_query = db.session.query(
+                Signing.fiscal_year,
+                Product.product_category,
+                func.count(Signing.signing_id).label('count')
+            ).join(
+                Product, Signing.product_id == Product.product_id
+            ).filter(
+                scope.client_filter(Signing.client_id),
+                Signing.fiscal_year.between(year_from, year_to)
+            ).group_by(
+                Signing.fiscal_year,
+                Product.product_category
+            )
         
         # Execute query
         results = signings_query.all()
         
         # Initialize counting dictionaries
         category_counts = {
-            "gcp-core": 0,
-            "data-analytics": 0, 
-            "cloud-security": 0,
-            "app-modernization": 0  # This will hold the aggregated count
+            year: {
+                "gcp-core": 0,
+                "data-analytics": 0, 
+                "cloud-security": 0,
+                "app-modernization": 0  # This will hold the aggregated count
+            }
+            for year in years
         }
         
         # Process results and aggregate categories
-        for category, count in results:
+        for fiscal_year, category, count in results:
+            count = int(count)
             if category in standard_categories:
                 # Standard category - add directly
-                category_counts[category] += count
+                category_counts[fiscal_year][category] += count
             elif category in app_modernization_categories:
                 # App modernization category - add to that aggregate
-                category_counts["app-modernization"] += count
+                category_counts[fiscal_year]["app-modernization"] += count
             # Ignore any categories not in our defined lists
         
-        # Calculate total signings (only counting categories we care about)
-        total_signings = sum(category_counts.values())
+        return {
+            year: format_signings_chart_data(category_counts[year])
+            for year in years
+        }
         
-        # Create the final data structure with counts and percentages
-        category_data = []
-        for category, count in category_counts.items():
-            percentage = round((count / total_signings) * 100.0, 1) if total_signings > 0 else 0.0
-            category_data.append({
-                "product_category": category,
-                "count": count,
-                "percentage": percentage
-            })
+    except Exception as e:
+        print(f"Error in calculate_signings_chart_data_by_year: {str(e)}")
+        return {year: [] for year in years}
+
+
+def format_signings_chart_data(category_counts):
+    """Format product category counts into chart data with percentages"""
+    # Calculate total signings (only counting categories we care about)
+    total_signings = sum(category_counts.values())
+    
+    # Create the final data structure with counts and percentages
+    category_data = []
+    for category, count in category_counts.items():
+        percentage = round((count / total_signings) * 100.0, 1) if total_signings > 0 else 0.0
+        category_data.append({
+            "product_category": category,
+            "count": count,
+            "percentage": percentage
+        })
+    
+    # Sort by product category for consistent output
+    return sorted(category_data, key=lambda x: x["product_category"])
+
+
+# Dashboard sections: part name -> (response key, function taking (scope, year))
+DASHBOARD_PARTS = {
+    'kpis': ('kpis', lambda scope, year: calculate_kpis_for_clients(scope, year)),
+    'revenue': ('revenue_chart_data', lambda scope, year: calculate_revenue_chart_data_for_clients(scope, year)),
+    'wins': ('win_chart_data', lambda scope, year: calculate_win_chart_data_for_clients(scope, year)),
+    'pipeline': ('pipeline_chart_data', lambda scope, year: calculate_pipeline_chart_data_for_clients(scope, year)),
+    'signings': (
+        'signings_chart_data',
+        lambda scope, year: calculate_signings_chart_data_for_clients(scope, year) if scope.has_clients else []
+    )
+}
+
+# Tables read by the dashboard sections
+DASHBOARD_TABLES = ('opportunity', 'revenue', 'signing', 'win', 'product', 'rollup_refresh_state')
+
+# Worker pool shared by all dashboard requests, created on first use
+_dashboard_executor = None
+_dashboard_executor_lock = threading.Lock()
+
+
+def get_dashboard_executor():
+    """Return the shared worker pool for dashboard aggregates"""
+    global _dashboard_executor
+    with _dashboard_executor_lock:
+        if _dashboard_executor is None:
+            _dashboard_executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('LANDING_DASHBOARD_WORKERS', 5),
+                thread_name_prefix='landing-dashboard'
+            )
+        return _dashboard_executor
+
+
+@landing_bp.route('/dashboard', methods=['GET'])
+@token_required
+@conditional_get(*DASHBOARD_TABLES)
+def get_dashboard():
+    """
+    Get all landing page data in one response
+
+    Resolves the user's scope once and computes the requested sections
+    concurrently, each on its own database connection.
+
+    Query parameters:
+    - year: Fiscal year (default: 2024)
+    - parts: Comma-separated sections to include (default: all).
+      Values: kpis, revenue, wins, pipeline, signings
+
+    Returns:
+    - 200 OK with the requested sections in the same format as the
+      individual endpoints:
+    {
+        "kpis": {"pipeline": 125000.0, "revenue": 75000.0, "signings": 50000.0, "wins": 3.5},
+        "revenue_chart_data": [...],
+        "win_chart_data": [...],
+        "pipeline_chart_data": [...],
+        "signings_chart_data": [...],
+        "year": 2024
+    }
+    - 400 Bad Request if an unknown part is requested
+    - 500 Internal Server Error with error details if calculation fails
+    """
+    try:
+        # Get query parameters
+        year = request.args.get('year', 2024, type=int)
+        parts_param = request.args.get('parts', type=str)
+        
+        parts = [p.strip() for p in parts_param.split(',') if p.strip()] if parts_param else list(DASHBOARD_PARTS)
+        unknown_parts = [p for p in parts if p not in DASHBOARD_PARTS]
+        if unknown_parts:
+            return jsonify({"error": f"Unknown dashboard parts: {', '.join(unknown_parts)}"}), 400
         
-        # Sort by product category for consistent output
-        return sorted(category_data, key=lambda x: x["product_category"])
+        # Resolve the user's scope once for every section
+        scope = resolve_user_scope(g.principal)
+        
+        response = compute_dashboard_parts(scope, year, parts)
+        response["year"] = year
+        
+        return jsonify(response), 200
         
     except Exception as e:
-        print(f"Error in calculate_signings_chart_data_for_clients: {str(e)}")
-        return []
\ No newline at end of file
+        logging.error(f"Error in dashboard calculation: {str(e)}")
+        return jsonify({"error": f"Failed to calculate dashboard data: {str(e)}"}), 500
+
+
+def compute_dashboard_parts(scope, year, parts):
+    """
+    Compute the requested dashboard sections for a scope
+    
+    Sections run concurrently on the shared worker pool, each inside its own
+    application context so it gets its own database session. With
+    LANDING_DASHBOARD_WORKERS set to 1 they run one after another in the
+    calling thread.
+    
+    Rollup freshness is checked once for the whole request, so the KPI
+    cards and the charts either all read the rollups or all read the raw
+    tables, and always agree with each other.
+    
+    Args:
+        scope: UserScope of the clients to filter by
+        year: The fiscal year to calculate for
+        parts: List of part names from DASHBOARD_PARTS
+    
+    Returns:
+        Dictionary mapping each section's response key to its data
+    """
+    use_rollups = rollups_are_fresh()
+    
+    def compute_part(part):
+        with rollup_source(use_rollups):
+            return DASHBOARD_PARTS[part][1](scope, year)
+    
+    if current_app.config.get('LANDING_DASHBOARD_WORKERS', 5) <= 1 or len(parts) <= 1:
+        return {
+            DASHBOARD_PARTS[part][0]: compute_part(part)
+            for part in parts
+        }
+    
+    app = current_app._get_current_object()
+    
+    def run_part(part):
+        with app.app_context():
+            return compute_part(part)
+    
+    executor = get_dashboard_executor()
+    futures = {part: executor.submit(run_part, part) for part in parts}
+    
+    return {
+        DASHBOARD_PARTS[part][0]: future.result()
+        for part, future in futures.items()
+    }
+
@@ -0,0 +1,390 @@
+"""
+AI Query Execution Service
+
+This module runs the SQL generated by /ai-insight with bounded cost and
+condenses its result for the summarization prompt.
+
+Generated SQL runs on the separate analytics engine (see analytics_engine),
+in a read-only transaction with a statement_timeout, through a server-side
+cursor. At most AI_SQL_MAX_ROWS rows are fetched; the rest of the result is
+never transferred.
+
+Before running, guard_generated_sql() checks the planner estimate from
+EXPLAIN (FORMAT JSON) against a budget: queries estimated to return more
+than AI_SQL_MAX_ESTIMATED_ROWS rows are wrapped with a LIMIT (or rejected,
+depending on AI_SQL_ROW_BUDGET_ACTION), and queries whose estimated cost
+exceeds AI_SQL_MAX_COST are rejected.
+
+Only a single SELECT (or WITH ... SELECT) statement is accepted, see
+check_read_only_select(); both EXPLAIN and execution refuse anything else.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+import json
+import re
+from flask import current_app
+from sqlalchemy import text
+from .analytics_engine import analytics_connection
+
+
+class QueryResult:
+    """Rows fetched from a generated query, capped at max_rows."""
+
+    def __init__(self, columns, rows, truncated):
+        self.columns = columns
+        self.rows = rows
+        self.truncated = truncated
+
+    def as_dicts(self, limit=None):
+        """Return the rows (or the first limit rows) as dictionaries"""
+        rows = self.rows if limit is None else self.rows[:limit]
+        return [dict(zip(self.columns, row)) for row in rows]
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when the planner estimate of a generated query is over budget."""
+
+    def __init__(self, message, estimate):
+        super().__init__(message)
+        self.estimate = estimate
+
+
+class UnsafeQuery(Exception):
+    """Raised when generated SQL is not a single read-only SELECT statement."""
+
+
+# Keywords that change data, schema, privileges, session or transaction state
+FORBIDDEN_KEYWORDS = frozenset([
+    'insert', 'update', 'delete', 'merge', 'truncate', 'drop', 'create', 'alter',
+    'grant', 'revoke', 'comment', 'copy', 'call', 'do', 'execute', 'prepare',
+    'set', 'reset', 'begin', 'start', 'commit', 'rollback', 'savepoint', 'release',
+    'abort', 'lock', 'vacuum', 'analyze', 'cluster', 'reindex', 'refresh',
+    'listen', 'notify', 'discard', 'into'
+])
+
+# Functions generated SQL may call: no side effects, and no output that
+# grows beyond the rows read (so no generate_series, repeat or lpad)
+ALLOWED_FUNCTIONS = frozenset([
+    # Aggregates and window functions
+    'count', 'sum', 'avg', 'min', 'max', 'string_agg', 'array_agg', 'bool_and', 'bool_or',
+    'every', 'stddev', 'stddev_pop', 'stddev_samp', 'variance', 'var_pop', 'var_samp',
+    'percentile_cont', 'percentile_disc', 'mode', 'corr', 'grouping',
+    'row_number', 'rank', 'dense_rank', 'percent_rank', 'cume_dist', 'ntile',
+    'lag', 'lead', 'first_value', 'last_value', 'nth_value',
+    # Conditionals and numbers
+    'coalesce', 'nullif', 'greatest', 'least', 'cast',
+    'abs', 'round', 'trunc', 'floor', 'ceil', 'ceiling', 'sign', 'mod', 'div',
+    'power', 'sqrt', 'exp', 'ln', 'log', 'width_bucket',
+    # Dates
+    'extract', 'date_part', 'date_trunc', 'age', 'make_date', 'now',
+    'to_char', 'to_date', 'to_timestamp', 'to_number',
+    # Strings and arrays
+    'lower', 'upper', 'initcap', 'length', 'char_length', 'substring', 'substr',
+    'position', 'strpos', 'trim', 'btrim', 'ltrim', 'rtrim', 'replace', 'concat',
+    'concat_ws', 'left', 'right', 'split_part', 'unnest', 'array_length', 'cardinality'
+])
+
+# Keywords and type names that can be followed by a parenthesis without
+# calling a function
+PARENTHESIZED_KEYWORDS = frozenset([
+    'select', 'from', 'join', 'lateral', 'where', 'having', 'on', 'using', 'and', 'or',
+    'not', 'in', 'exists', 'any', 'all', 'some', 'as', 'materialized', 'with', 'over',
+    'filter', 'within', 'group', 'by', 'partition', 'values', 'row', 'array', 'case',
+    'when', 'then', 'else', 'between', 'like', 'ilike', 'is', 'distinct', 'union',
+    'intersect', 'except', 'limit', 'offset', 'rollup', 'cube', 'sets',
+    'numeric', 'decimal', 'varchar', 'char', 'character', 'varying', 'timestamp', 'time', 'float'
+])
+
+# String literals, quoted identifiers, dollar-quoted strings and comments
+_LITERALS_AND_COMMENTS = re.compile(
+    r"'(?:[^']|'')*'"
+    r'|"(?:[^"]|"")*"'
+    r'|\$(?P<tag>[A-Za-z_][A-Za-z_0-9]*|)\$.*?\$(?P=tag)\$'
+    r'|--[^\n]*'
+    r'|/\*.*?\*/',
+    re.DOTALL
+)
+
+
+def _blank_out(match):
+    """Replace a literal or comment with a space, and a quoted identifier with a placeholder word"""
+    # A quoted identifier can name a function, so it must still be seen as a name
+    return ' quoted_identifier ' if match.group(0).startswith('"') else ' '
+
+
+def check_read_only_select(sql_query):
+    """
+    Check that SQL is a single SELECT or WITH statement
+
+    Semicolons, writes and session or transaction commands are looked for
+    outside string literals, quoted identifiers and comments, since the
+    simple query protocol runs every statement in the string. Every function
+    call must be to one of ALLOWED_FUNCTIONS, whatever its schema.
+
+    Args:
+        sql_query: The SQL to check
+
+    Returns:
+        The SQL without surrounding whitespace and a trailing semicolon
+
+    Raises:
+        UnsafeQuery: If the SQL is anything other than one read-only query
+    """
+    statement = sql_query.strip().rstrip(';').strip()
+    if not statement:
+        raise UnsafeQuery("Query is empty")
+    # Backslash escapes (E'' strings) would change where literals end
+    if '\\' in statement:
+        raise UnsafeQuery("Backslashes are not allowed in generated SQL")
+
+    code = _LITERALS_AND_COMMENTS.sub(_blank_out, statement)
+    if any(char in code for char in ';\'"$') or '/*' in code:
+        raise UnsafeQuery("Query must be a single statement")
+
+    words = re.findall(r'[a-z_][a-z_0-9]*', code.lower())
+    if not words or words[0] not in ('select', 'with'):
+        raise UnsafeQuery("Only SELECT queries are allowed")
+    forbidden = FORBIDDEN_KEYWORDS.intersection(words)
+    if forbidden:
+        raise UnsafeQuery(f"Query uses a disallowed keyword: {sorted(forbidden)[0].upper()}")
+
+    for name in re.findall(r'([a-z_][a-z_0-9]*)\s*\(', code.lower()):
+        if name not in ALLOWED_FUNCTIONS and name not in PARENTHESIZED_KEYWORDS:
+            raise UnsafeQuery(f"Query calls a function that is not allowed: {name.upper()}")
+
+    return statement
+
+
+def is_read_only_select(sql_query):
+    """Return True if check_read_only_select() accepts the SQL"""
+    try:
+        check_read_only_select(sql_query)
+    except UnsafeQuery:
+        return False
+    return True
+
+
+@contextmanager
+def _read_only_connection(timeout_ms):
+    """Analytics connection inside a read-only transaction with a local statement_timeout, rolled back on exit"""
+    with analytics_connection() as connection:
+        transaction = connection.begin()
+        try:
+            # Must be the first statement of the transaction
+            connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+            connection.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {'timeout': f"{int(timeout_ms)}ms"}
+            )
+            yield connection
+        finally:
+            # Nothing to keep, the transaction is read-only
+            transaction.rollback()
+
+
+def _prepare_statement(sql_query):
+    """Check the SQL is a single SELECT and strip a trailing semicolon so it can be wrapped"""
+    return check_read_only_select(sql_query)
+
+
+def estimate_query(sql_query, params=None, timeout_ms=None):
+    """
+    Get the planner estimate of a query from EXPLAIN (FORMAT JSON)
+
+    Args:
+        sql_query: The SQL to estimate
+        params: Bind parameters for the SQL (optional)
+        timeout_ms: statement_timeout in milliseconds (default: AI_SQL_STATEMENT_TIMEOUT_MS)
+
+    Returns:
+        Dictionary with total_cost and plan_rows of the top plan node,
+        relations (names of the tables and views the plan scans) and
+        functions (names of the set-returning functions it scans)
+
+    Raises:
+        UnsafeQuery: If the SQL is not a single SELECT statement
+    """
+    if timeout_ms is None:
+        timeout_ms = current_app.config.get('AI_SQL_STATEMENT_TIMEOUT_MS', 10000)
+
+    with _read_only_connection(timeout_ms) as connection:
+        plan = connection.execute(
+            text("EXPLAIN (FORMAT JSON) " + _prepare_statement(sql_query)),
+            params or {}
+        ).scalar()
+
+    # psycopg2 decodes the json column, other drivers may return text
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    top_node = plan[0]['Plan']
+    relations, functions = set(), set()
+    _collect_scanned(top_node, relations, functions)
+    return {
+        "total_cost": float(top_node['Total Cost']),
+        "plan_rows": int(top_node['Plan Rows']),
+        "relations": sorted(relations),
+        "functions": sorted(functions)
+    }
+
+
+def _collect_scanned(node, relations, functions):
+    """Add the relations and functions scanned by a plan node and its children"""
+    if 'Relation Name' in node:
+        relations.add(node['Relation Name'])
+    if 'Function Name' in node:
+        functions.add(node['Function Name'])
+    for child in node.get('Plans', []):
+        _collect_scanned(child, relations, functions)
+
+
+def guard_generated_sql(sql_query, params=None):
+    """
+    Check a generated query against the cost and row budgets
+
+    Args:
+        sql_query: The SQL to check
+        params: Bind parameters for the SQL (optional)
+
+    Returns:
+        Tuple of (sql_query to run, estimate). The query is wrapped with a
+        LIMIT when it is estimated to return too many rows, in which case the
+        estimate is of the wrapped query and has "limited": True.
+
+    Raises:
+        QueryBudgetExceeded: If the estimated cost is over AI_SQL_MAX_COST, or
+        the row estimate is over budget and AI_SQL_ROW_BUDGET_ACTION is 'reject'
+    """
+    max_cost = current_app.config.get('AI_SQL_MAX_COST', 1000000)
+    max_rows = current_app.config.get('AI_SQL_MAX_ESTIMATED_ROWS', 100000)
+    row_action = current_app.config.get('AI_SQL_ROW_BUDGET_ACTION', 'limit')
+
+    estimate = estimate_query(sql_query, params)
+    estimate["limited"] = False
+
+    if estimate["plan_rows"] > max_rows:
+        if row_action != 'limit':
+            raise QueryBudgetExceeded(
+                f"Query is estimated to return {estimate['plan_rows']} rows, over the budget of {max_rows}",
+                estimate
+            )
+        limit = current_app.config.get('AI_SQL_MAX_ROWS', 1000)
+        sql_query = f"SELECT * FROM (\n{_prepare_statement(sql_query)}\n) AS bounded_query LIMIT {int(limit)}"
+        estimate = estimate_query(sql_query, params)
+        estimate["limited"] = True
+
+    if estimate["total_cost"] > max_cost:
+        raise QueryBudgetExceeded(
+            f"Query is estimated to cost {estimate['total_cost']:.0f}, over the budget of {max_cost}",
+            estimate
+        )
+
+    return sql_query, estimate
+
+
+def execute_generated_sql(sql_query, params=None, max_rows=None, timeout_ms=None):
+    """
+    Execute generated SQL read-only, with a timeout and a row cap
+
+    Args:
+        sql_query: The SQL to run
+        params: Bind parameters for the SQL (optional)
+        max_rows: Maximum rows to fetch (default: AI_SQL_MAX_ROWS)
+        timeout_ms: statement_timeout in milliseconds (default: AI_SQL_STATEMENT_TIMEOUT_MS)
+
+    Returns:
+        QueryResult with at most max_rows rows
+
+    Raises:
+        UnsafeQuery: If the SQL is not a single SELECT statement
+    """
+    if max_rows is None:
+        max_rows = current_app.config.get('AI_SQL_MAX_ROWS', 1000)
+    if timeout_ms is None:
+        timeout_ms = current_app.config.get('AI_SQL_STATEMENT_TIMEOUT_MS', 10000)
+
+    with _read_only_connection(timeout_ms) as connection:
+        # Server-side cursor, so only the fetched rows leave the database.
+        # The statement is wrapped in DECLARE ... CURSOR, which rules out
+        # a trailing semicolon
+        result = connection.execute(
+            text(_prepare_statement(sql_query)).execution_options(stream_results=True, max_row_buffer=max_rows + 1),
+            params or {}
+        )
+        columns = list(result.keys())
+        rows = [tuple(row) for row in result.fetchmany(max_rows + 1)]
+        result.close()
+
+    truncated = len(rows) > max_rows
+    return QueryResult(columns, rows[:max_rows], truncated)
+
+
+def _to_number(value):
+    """Return value as a float if it is numeric, otherwise None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
+    return None
+
+
+def _to_text(value):
+    """Make a value JSON/prompt friendly"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def build_result_digest(result, top_n=None):
+    """
+    Summarize a query result for the summarization prompt
+
+    Args:
+        result: QueryResult from execute_generated_sql
+        top_n: Number of leading rows to include (default: AI_DIGEST_TOP_N)
+
+    Returns:
+        Dictionary with the row count, whether the result was truncated,
+        the first top_n rows and per column statistics: count, min, max,
+        sum and average for numeric columns, distinct count and most
+        frequent values for the others
+    """
+    if top_n is None:
+        top_n = current_app.config.get('AI_DIGEST_TOP_N', 10)
+
+    column_stats = {}
+    for index, column in enumerate(result.columns):
+        values = [row[index] for row in result.rows if row[index] is not None]
+        numbers = [_to_number(value) for value in values]
+
+        if values and all(number is not None for number in numbers):
+            column_stats[column] = {
+                "count": len(numbers),
+                "min": min(numbers),
+                "max": max(numbers),
+                "sum": round(sum(numbers), 2),
+                "avg": round(sum(numbers) / len(numbers), 2)
+            }
+        else:
+            frequencies = {}
+            for value in values:
+                value = _to_text(value)
+                frequencies[value] = frequencies.get(value, 0) + 1
+            most_common = sorted(frequencies.items(), key=lambda item: item[1], reverse=True)[:5]
+            column_stats[column] = {
+                "count": len(values),
+                "distinct": len(frequencies),
+                "top_values": [{"value": value, "count": count} for value, count in most_common]
+            }
+
+    return {
+        "row_count": len(result.rows),
+        "truncated": result.truncated,
+        "top_rows": [
+            {column: _to_text(value) for column, value in row.items()}
+            for row in result.as_dicts(top_n)
+        ],
+        "column_stats": column_stats
+    }
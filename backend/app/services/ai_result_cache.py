@@ -0,0 +1,178 @@
+"""
+AI Result Cache Service
+
+This module caches the outcome of running a generated /ai-insight query:
+the fetched rows, the plan estimate and the summary. Entries are keyed by a
+hash of the normalized SQL and its bind parameters, so the same SQL reached
+through different questions shares an entry.
+
+Each entry is stored with the tables the query's plan scans (the relations
+in its EXPLAIN output, see ai_query.estimate_query) and their data
+watermark (see watermark), and is only served while that watermark is
+unchanged. Queries that scan anything whose changes the watermark can't
+see (unknown relations or functions) are not cached.
+The cache is an LRU bounded both by entry count (AI_RESULT_CACHE_SIZE) and
+by the total number of cached rows (AI_RESULT_CACHE_MAX_ROWS).
+"""
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from flask import current_app
+from .data_version import TRACKED_MODELS
+from .rollups import ROLLUP_DEFINITIONS
+from .watermark import get_data_watermark
+
+# Tables whose changes invalidate cached results
+CACHEABLE_TABLES = tuple(model.__tablename__ for model in TRACKED_MODELS) + (
+    'updateevent', 'opportunityupdatelog'
+)
+
+# Views whose changes show up in the watermark of another table: every
+# rollup refresh updates rollup_refresh_state
+DERIVED_RELATIONS = {name: 'rollup_refresh_state' for name in ROLLUP_DEFINITIONS}
+
+# Set-returning functions that read no tables (and that the SQL checker allows)
+STATELESS_FUNCTIONS = ('unnest',)
+
+
+def normalize_sql(sql_query):
+    """Collapse whitespace and drop a trailing semicolon"""
+    return re.sub(r'\s+', ' ', sql_query.strip().rstrip(';')).strip()
+
+
+def make_result_key(sql_query, params=None):
+    """Hash normalized SQL and its bind parameters into a cache key"""
+    raw = normalize_sql(sql_query) + '\n' + json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_plan_tables(estimate):
+    """
+    Get the tables whose watermark covers the data a query plan reads
+
+    Args:
+        estimate: Plan estimate from ai_query.estimate_query
+
+    Returns:
+        Tuple of table names, or None if the plan reads something the
+        watermark can't track (the result must then not be cached)
+    """
+    if any(name not in STATELESS_FUNCTIONS for name in estimate.get('functions', ())):
+        return None
+    tables = set()
+    for name in estimate.get('relations', ()):
+        if name in CACHEABLE_TABLES:
+            tables.add(name)
+        elif name in DERIVED_RELATIONS:
+            tables.add(DERIVED_RELATIONS[name])
+        else:
+            return None
+    return tuple(sorted(tables)) if tables else None
+
+
+def get_tables_version(tables):
+    """Return the watermark of a set of tables, or None if it can't be read"""
+    watermark = get_data_watermark(tables)
+    if watermark is None:
+        return None
+    return watermark[0]
+
+
+def get_result_version(estimate):
+    """
+    Get the data version of a query from its plan, before running it
+
+    Args:
+        estimate: Plan estimate from ai_query.estimate_query
+
+    Returns:
+        Tuple of (tables, version), or None if the result must not be cached
+    """
+    tables = get_plan_tables(estimate)
+    if tables is None:
+        return None
+    version = get_tables_version(tables)
+    if version is None:
+        return None
+    return tables, version
+
+
+def lookup_result(key):
+    """
+    Return a cached value if the tables it was read from are unchanged
+
+    Args:
+        key: Key from make_result_key
+
+    Returns:
+        The cached value, or None
+    """
+    cache = get_result_cache()
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    tables, version, value = entry
+    if get_tables_version(tables) != version:
+        cache.discard(key)
+        return None
+    return value
+
+
+class ResultCache:
+    """LRU of query outcomes bounded by entry count and total cached rows."""
+
+    def __init__(self, max_entries=256, max_rows=50000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (tables, version, value, row_count)
+        self._row_total = 0
+
+    def get(self, key):
+        """Return (tables, version, value) for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[:3]
+
+    def set(self, key, tables, version, value, row_count):
+        """Store a value, evicting least recently used entries to stay in bounds"""
+        if row_count > self.max_rows:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (tables, version, value, row_count)
+            self._row_total += row_count
+            while len(self._entries) > self.max_entries or self._row_total > self.max_rows:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, key):
+        """Drop an entry if present"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        row_count = self._entries.pop(key)[3]
+        self._row_total -= row_count
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide result cache, created from config on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(
+                max_entries=current_app.config.get('AI_RESULT_CACHE_SIZE', 256),
+                max_rows=current_app.config.get('AI_RESULT_CACHE_MAX_ROWS', 50000)
+            )
+        return _cache
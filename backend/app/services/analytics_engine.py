@@ -0,0 +1,69 @@
+"""
+Analytics Engine Service
+
+This module provides a separate SQLAlchemy engine for ad-hoc analytics
+queries such as the SQL generated by /ai-insight, so slow exploratory
+queries cannot exhaust the pool used by the dashboard endpoints.
+
+The engine:
+- connects with ANALYTICS_DATABASE_URI, which should use a read-only
+  database role (falls back to SQLALCHEMY_DATABASE_URI)
+- has its own pool (ANALYTICS_POOL_SIZE, ANALYTICS_MAX_OVERFLOW,
+  ANALYTICS_POOL_TIMEOUT)
+- starts every session read-only with a default statement_timeout
+- admits at most ANALYTICS_MAX_CONCURRENCY queries at a time per process;
+  callers wait up to ANALYTICS_QUEUE_TIMEOUT seconds for a slot
+"""
+import threading
+from contextlib import contextmanager
+from flask import current_app
+from sqlalchemy import create_engine
+
+
+class AnalyticsBusy(Exception):
+    """Raised when no analytics query slot frees up in time."""
+
+
+_engine = None
+_semaphore = None
+_engine_lock = threading.Lock()
+
+
+def get_analytics_engine():
+    """Return the analytics engine, created from config on first use"""
+    global _engine, _semaphore
+    with _engine_lock:
+        if _engine is None:
+            config = current_app.config
+            timeout_ms = int(config.get('AI_SQL_STATEMENT_TIMEOUT_MS', 10000))
+            _engine = create_engine(
+                config.get('ANALYTICS_DATABASE_URI') or config['SQLALCHEMY_DATABASE_URI'],
+                pool_size=config.get('ANALYTICS_POOL_SIZE', 2),
+                max_overflow=config.get('ANALYTICS_MAX_OVERFLOW', 0),
+                pool_timeout=config.get('ANALYTICS_POOL_TIMEOUT', 5),
+                pool_pre_ping=True,
+                connect_args={
+                    'application_name': 'sales-analytics-adhoc',
+                    'options': f"-c default_transaction_read_only=on -c statement_timeout={timeout_ms}"
+                }
+            )
+            _semaphore = threading.BoundedSemaphore(config.get('ANALYTICS_MAX_CONCURRENCY', 2))
+        return _engine
+
+
+@contextmanager
+def analytics_connection():
+    """
+    Connection from the analytics pool, holding one of the concurrency slots
+
+    Raises:
+        AnalyticsBusy: If no slot frees up within ANALYTICS_QUEUE_TIMEOUT seconds
+    """
+    engine = get_analytics_engine()
+    if not _semaphore.acquire(timeout=current_app.config.get('ANALYTICS_QUEUE_TIMEOUT', 5)):
+        raise AnalyticsBusy("Too many analytics queries are running, please try again shortly")
+    try:
+        with engine.connect() as connection:
+            yield connection
+    finally:
+        _semaphore.release()
@@ -0,0 +1,112 @@
+"""
+Data Version Service
+
+This module keeps an in-process version counter per table. Each counter is
+bumped when a transaction that inserted, updated or deleted rows of that
+table through the ORM commits, so caches of derived results can be keyed
+by the versions of the tables they read and dropped as soon as any of them
+changes. Bumping at commit rather than at flush keeps a concurrent request
+from caching the pre-commit rows under the new version.
+
+Writes made outside of this process are not seen, so VersionedCache entries
+also expire after a TTL.
+"""
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from ..models.models import (
+    User, DirectorAccountExecutive, Client, Product, Opportunity,
+    Signing, Revenue, Win, YearlyTarget, QuarterlyTarget
+)
+
+# Models whose writes are tracked
+TRACKED_MODELS = (
+    User, DirectorAccountExecutive, Client, Product, Opportunity,
+    Signing, Revenue, Win, YearlyTarget, QuarterlyTarget
+)
+
+_version_lock = threading.Lock()
+_table_versions = {model.__tablename__: 0 for model in TRACKED_MODELS}
+
+
+def get_data_version(*table_names):
+    """
+    Get the current version of one or more tables
+
+    Args:
+        table_names: Names of the tables a cached result depends on
+
+    Returns:
+        Tuple of versions in the same order as table_names
+    """
+    with _version_lock:
+        return tuple(_table_versions.get(name, 0) for name in table_names)
+
+
+def bump_data_version(table_name):
+    """Mark a table as changed"""
+    with _version_lock:
+        _table_versions[table_name] = _table_versions.get(table_name, 0) + 1
+
+
+class VersionedCache:
+    """
+    Thread-safe in-process cache whose entries are tied to a data version.
+
+    An entry is returned only while the version passed to get() matches the
+    version it was stored with and it is younger than the TTL.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (version, stored_at, value)
+
+    def get(self, key, version, ttl):
+        """Return the cached value, or None if missing, outdated or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version and time.monotonic() - entry[1] < ttl:
+                return entry[2]
+            return None
+
+    def set(self, key, version, value):
+        """Store a value computed at the given version"""
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # Drop the oldest entry to bound memory use
+                oldest = min(self._entries, key=lambda k: self._entries[k][1])
+                del self._entries[oldest]
+            self._entries[key] = (version, time.monotonic(), value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Flush-time hooks only record the changed tables on the session; the
+# versions are bumped once the transaction commits
+
+def _on_row_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_tables', set()).add(mapper.local_table.name)
+
+
+for _model in TRACKED_MODELS:
+    event.listen(_model, 'after_insert', _on_row_change)
+    event.listen(_model, 'after_update', _on_row_change)
+    event.listen(_model, 'after_delete', _on_row_change)
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    for table_name in session.info.pop('changed_tables', ()):
+        bump_data_version(table_name)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    # Nothing was committed, so cached results are still valid
+    session.info.pop('changed_tables', None)
@@ -0,0 +1,145 @@
+"""
+Schema Migrations Service
+
+This module applies the plain SQL migrations in backend/migrations in
+filename order and records each applied version in the schema_migrations
+table, so every migration runs exactly once per database.
+
+A migration runs in a single transaction unless its first line is
+"-- migrate: no-transaction". Those migrations run statement by statement
+in autocommit mode, which is needed for CREATE INDEX CONCURRENTLY.
+
+A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind that
+IF NOT EXISTS would skip on the next run, so invalid leftovers are dropped
+before each index is built, and a no-transaction migration is only
+recorded once every index it builds is valid.
+"""
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from sqlalchemy import text
+from ..models.models import db
+
+# backend/migrations, next to the app package
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'migrations')
+
+NO_TRANSACTION_MARKER = '-- migrate: no-transaction'
+
+_CONCURRENT_INDEX_PATTERN = re.compile(
+    r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.]+)',
+    re.IGNORECASE
+)
+
+
+def get_migration_files():
+    """
+    List the available migrations
+
+    Returns:
+        List of (version, path) tuples sorted by version, where the version
+        is the filename without the .sql extension
+    """
+    files = sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith('.sql'))
+    return [(name[:-len('.sql')], os.path.join(MIGRATIONS_DIR, name)) for name in files]
+
+
+def ensure_migrations_table():
+    """Create the schema_migrations table if it doesn't exist yet"""
+    with db.engine.begin() as connection:
+        connection.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version varchar(255) PRIMARY KEY,
+                applied_at timestamptz NOT NULL
+            )
+        """))
+
+
+def get_applied_versions():
+    """Return the set of migration versions already applied"""
+    ensure_migrations_table()
+    with db.engine.connect() as connection:
+        rows = connection.execute(text("SELECT version FROM schema_migrations")).all()
+    return {version for (version,) in rows}
+
+
+def get_pending_migrations():
+    """Return the (version, path) tuples that have not been applied yet"""
+    applied = get_applied_versions()
+    return [(version, path) for version, path in get_migration_files() if version not in applied]
+
+
+def apply_migrations():
+    """
+    Apply every pending migration in order
+
+    Returns:
+        List of the versions that were applied
+    """
+    applied = []
+    for version, path in get_pending_migrations():
+        with open(path) as f:
+            sql = f.read()
+
+        logging.info(f"Applying migration {version}")
+        if sql.lstrip().startswith(NO_TRANSACTION_MARKER):
+            _apply_without_transaction(version, sql)
+        else:
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql(sql)
+                _record_version(connection, version)
+        applied.append(version)
+    return applied
+
+
+def _apply_without_transaction(version, sql):
+    """Run a migration one statement at a time in autocommit mode"""
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        index_names = []
+        for statement in _split_statements(sql):
+            match = _CONCURRENT_INDEX_PATTERN.match(statement)
+            if match:
+                index_names.append(match.group(1))
+                _drop_invalid_index(connection, match.group(1))
+            try:
+                connection.exec_driver_sql(statement)
+            except Exception:
+                if match:
+                    _drop_invalid_index(connection, match.group(1))
+                raise
+
+        not_valid = [name for name in index_names if _is_index_valid(connection, name) is not True]
+        if not_valid:
+            raise RuntimeError(
+                f"Migration {version} left missing or invalid indexes: {', '.join(not_valid)}"
+            )
+        _record_version(connection, version)
+
+
+def _is_index_valid(connection, index_name):
+    """Return pg_index.indisvalid for an index, or None if it doesn't exist"""
+    return connection.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {'name': index_name}
+    ).scalar()
+
+
+def _drop_invalid_index(connection, index_name):
+    """Drop an index left INVALID by a failed concurrent build"""
+    if _is_index_valid(connection, index_name) is False:
+        logging.warning(f"Dropping invalid index {index_name}")
+        connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+
+
+def _split_statements(sql):
+    """Split a migration into statements (migrations must not use ';' inside literals)"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def _record_version(connection, version):
+    """Mark a migration as applied"""
+    connection.execute(
+        text("INSERT INTO schema_migrations (version, applied_at) VALUES (:version, :applied_at)"),
+        {'version': version, 'applied_at': datetime.now(timezone.utc)}
+    )
@@ -0,0 +1,107 @@
+"""
+Query Plan Service
+
+This module runs the landing and executives queries for a user, captures
+the SQL statements they send to the database and returns the EXPLAIN plan
+of each one. It is used to confirm that the hot paths use the composite
+indexes shipped in backend/migrations.
+"""
+from sqlalchemy import event
+from ..models.models import db, User
+from .scope import resolve_user_scope, invalidate_scope_cache
+
+
+def capture_statements(run):
+    """
+    Run a callable and capture the read statements it executes
+
+    Args:
+        run: Callable with no arguments
+
+    Returns:
+        List of (statement, parameters) tuples in driver format
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            statements.append((statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        run()
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+def explain_statement(statement, parameters, analyze=False):
+    """Return the EXPLAIN output of a captured statement as text"""
+    prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze else 'EXPLAIN '
+    rows = db.session.connection().exec_driver_sql(prefix + statement, parameters).all()
+    return '\n'.join(row[0] for row in rows)
+
+
+def get_hot_path_queries(user, year):
+    """
+    List the landing and executives queries to explain for a user
+
+    Args:
+        user: The User to run the queries as
+        year: The fiscal year to run the queries for
+
+    Returns:
+        List of (name, callable) tuples
+    """
+    # Imported here because the route modules import the services package
+    from ..routes import landing, executives
+
+    def resolve_scope():
+        # Drop cached scopes so the resolution queries actually run
+        invalidate_scope_cache()
+        return resolve_user_scope(user)
+
+    scope = resolve_user_scope(user)
+    queries = [
+        ('scope resolution', resolve_scope),
+        ('landing kpi-cards', lambda: landing.calculate_kpis_for_clients(scope, year)),
+        ('landing revenue-chart-data', lambda: landing.calculate_revenue_chart_data_for_clients(scope, year)),
+        ('landing win-chart-data', lambda: landing.calculate_win_chart_data_for_clients(scope, year)),
+        ('landing pipeline-chart-data', lambda: landing.calculate_pipeline_chart_data_for_clients(scope, year)),
+        ('landing signings-chart-data', lambda: landing.calculate_signings_chart_data_for_clients(scope, year)),
+    ]
+    if user.role == 'director':
+        queries.append(
+            ('executives ae-performance', lambda: executives.get_ae_performance_data(user.user_id, year))
+        )
+    return queries
+
+
+def explain_hot_paths(username, year, analyze=False):
+    """
+    Explain every landing and executives query for a user
+
+    Args:
+        username: Username of the director or account executive to run as
+        year: The fiscal year to run the queries for
+        analyze: Run EXPLAIN ANALYZE instead of a plain EXPLAIN
+
+    Returns:
+        List of (name, [(statement, plan), ...]) tuples
+
+    Raises:
+        ValueError: If the user doesn't exist
+    """
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        raise ValueError(f"User not found: {username}")
+
+    results = []
+    for name, run in get_hot_path_queries(user, year):
+        plans = [
+            (statement, explain_statement(statement, parameters, analyze))
+            for statement, parameters in capture_statements(run)
+        ]
+        results.append((name, plans))
+    return results
@@ -0,0 +1,171 @@
+"""
+Question Templates Service
+
+This module recognizes common /ai-insight questions and turns them into
+pre-vetted, parameterized SQL without calling the LLM, e.g.:
+- "top 5 clients by revenue in 2023"
+- "wins by AE this quarter"
+- "top 3 reps by revenue last year"
+- "total revenue in 2024"
+
+Questions are matched after normalize_question(). "This year" means the
+fiscal year 2024, matching the convention given to the LLM, and "this
+quarter" means the latest fiscal quarter with data in that year.
+"""
+import re
+from .translation_cache import normalize_question
+
+# Fiscal years used for relative references, same as the LLM prompt
+CURRENT_FISCAL_YEAR = 2024
+
+MAX_TOP_N = 100
+
+# Reusable pattern fragments
+_YEAR = r'(?:(?:in|for|during) )?(?:(?:fiscal )?year )?(?P<year>\d{4}|this year|last year)'
+_CLIENTS = r'(?:clients|customers|accounts)'
+_AES = r'(?:aes|ae|account executives|account executive|reps|rep|sales reps)'
+
+
+class TemplateMatch:
+    """SQL and bind parameters for a recognized question."""
+
+    def __init__(self, name, sql, params):
+        self.name = name
+        self.sql = sql
+        self.params = params
+
+
+def _resolve_year(value):
+    if value in (None, 'this year'):
+        return CURRENT_FISCAL_YEAR
+    if value == 'last year':
+        return CURRENT_FISCAL_YEAR - 1
+    return int(value)
+
+
+def _resolve_limit(value):
+    return max(1, min(int(value or 10), MAX_TOP_N))
+
+
+def _top_clients_by_revenue(match):
+    return (
+        """
+        SELECT client.client_name, SUM(revenue.amount) AS total_revenue
+        FROM revenue
+        JOIN client ON revenue.client_id = client.client_id
+        WHERE revenue.fiscal_year = :year
+        GROUP BY client.client_name
+        ORDER BY total_revenue DESC
+        LIMIT :limit
+        """,
+        {'year': _resolve_year(match.group('year')), 'limit': _resolve_limit(match.group('limit'))}
+    )
+
+
+def _top_aes_by_revenue(match):
+    return (
+        """
+        SELECT u.first_name || ' ' || u.last_name AS account_executive, SUM(revenue.amount) AS total_revenue
+        FROM revenue
+        JOIN client ON revenue.client_id = client.client_id
+        JOIN "user" u ON u.user_id = client.account_executive_id
+        WHERE revenue.fiscal_year = :year
+        GROUP BY u.user_id, u.first_name, u.last_name
+        ORDER BY total_revenue DESC
+        LIMIT :limit
+        """,
+        {'year': _resolve_year(match.group('year')), 'limit': _resolve_limit(match.group('limit'))}
+    )
+
+
+def _wins_by_ae(match):
+    year = _resolve_year(match.group('year'))
+    quarter = match.group('quarter')
+    params = {'year': year}
+
+    if quarter == 'this quarter':
+        quarter_filter = "AND win.fiscal_quarter = (SELECT MAX(fiscal_quarter) FROM win WHERE fiscal_year = :year)"
+    elif quarter:
+        quarter_filter = "AND win.fiscal_quarter = :quarter"
+        params['quarter'] = int(quarter[-1])
+    else:
+        quarter_filter = ""
+
+    return (
+        f"""
+        SELECT u.first_name || ' ' || u.last_name AS account_executive, SUM(win.win_multiplier) AS win_count
+        FROM win
+        JOIN client ON win.client_id = client.client_id
+        JOIN "user" u ON u.user_id = client.account_executive_id
+        WHERE win.fiscal_year = :year {quarter_filter}
+        GROUP BY u.user_id, u.first_name, u.last_name
+        ORDER BY win_count DESC
+        """,
+        params
+    )
+
+
+def _total_revenue(match):
+    return (
+        """
+        SELECT SUM(revenue.amount) AS total_revenue
+        FROM revenue
+        WHERE revenue.fiscal_year = :year
+        """,
+        {'year': _resolve_year(match.group('year'))}
+    )
+
+
+# (name, pattern, builder) in match order
+TEMPLATES = [
+    (
+        'top_clients_by_revenue',
+        re.compile(
+            rf'^(?:(?:show|list|give|get)(?: me)? |(?:what|who) (?:are|were) )?(?:the |my |our )?'
+            rf'top (?P<limit>\d+)? ?{_CLIENTS} by revenue(?: {_YEAR})?$'
+        ),
+        _top_clients_by_revenue
+    ),
+    (
+        'top_aes_by_revenue',
+        re.compile(
+            rf'^(?:(?:show|list|give|get)(?: me)? |(?:what|who) (?:are|were) )?(?:the |my |our )?'
+            rf'top (?P<limit>\d+)? ?{_AES} by revenue(?: {_YEAR})?$'
+        ),
+        _top_aes_by_revenue
+    ),
+    (
+        'wins_by_ae',
+        re.compile(
+            rf'^(?:(?:show|list|give|get)(?: me)? )?(?:the )?(?:number of )?wins (?:by|per|for each) {_AES}'
+            rf'(?: (?:in )?(?P<quarter>this quarter|q[1-4]))?(?: {_YEAR})?$'
+        ),
+        _wins_by_ae
+    ),
+    (
+        'total_revenue',
+        re.compile(
+            rf'^(?:(?:what|how much) (?:is|was) )?(?:the |our )?total revenue(?: {_YEAR})?$'
+        ),
+        _total_revenue
+    ),
+]
+
+
+def match_question(question):
+    """
+    Match a question against the templates
+
+    Args:
+        question: The user's question
+
+    Returns:
+        TemplateMatch, or None if no template recognizes the question
+    """
+    normalized = normalize_question(question)
+    for name, pattern, builder in TEMPLATES:
+        match = pattern.match(normalized)
+        if match:
+            sql, params = builder(match)
+            return TemplateMatch(name, sql.strip(), params)
+    return None
@@ -0,0 +1,210 @@
+"""
+Rollup Service
+
+This module maintains pre-aggregated rollups of the fact tables used by the
+landing page charts. Each rollup is a PostgreSQL materialized view keyed by
+(client_id, fiscal_year, period, category), so chart queries aggregate one
+row per client and period instead of every revenue, win, signing or
+opportunity row.
+
+The views and the rollup_refresh_state table are created by
+migrations/0006_landing_rollups.sql. They are refreshed with
+REFRESH MATERIALIZED VIEW CONCURRENTLY, which keeps them readable while the
+refresh runs, by "python -m app.manage refresh-rollups" on a schedule. Refresh times are recorded in
+the rollup_refresh_state table, and readers only use the rollups while the
+oldest refresh is within ROLLUP_MAX_AGE seconds. Code that must not mix
+rollups with raw table reads can pin one decision with rollup_source().
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import text, table, column
+from ..models.models import db
+
+
+# Rollup definitions: view name -> SELECT producing
+# (client_id, fiscal_year, period, category, amount, row_count).
+# The views are created by migrations/0006_landing_rollups.sql; keep in sync
+ROLLUP_DEFINITIONS = {
+    # Monthly revenue per client
+    'rollup_revenue_monthly': """
+        SELECT client_id,
+               fiscal_year,
+               month AS period,
+               ''::varchar AS category,
+               SUM(amount) AS amount,
+               COUNT(*) AS row_count
+        FROM revenue
+        GROUP BY client_id, fiscal_year, month
+    """,
+    # Quarterly win multipliers per client and win category
+    'rollup_win_quarterly': """
+        SELECT client_id,
+               fiscal_year,
+               fiscal_quarter AS period,
+               win_category AS category,
+               SUM(win_multiplier) AS amount,
+               COUNT(*) AS row_count
+        FROM win
+        GROUP BY client_id, fiscal_year, fiscal_quarter, win_category
+    """,
+    # Quarterly annualized signing value per client and product category
+    'rollup_signing_category': """
+        SELECT s.client_id,
+               s.fiscal_year,
+               s.fiscal_quarter AS period,
+               p.product_category AS category,
+               SUM(s.annualized_value) AS amount,
+               COUNT(*) AS row_count
+        FROM signing s
+        JOIN product p ON p.product_id = s.product_id
+        GROUP BY s.client_id, s.fiscal_year, s.fiscal_quarter, p.product_category
+    """,
+    # Monthly weighted pipeline per client and forecast category, by creation date.
+    # The raw queries use the equivalent range in opportunity_created_in_years()
+    'rollup_pipeline_category': """
+        SELECT client_id,
+               EXTRACT(year FROM created_date)::integer AS fiscal_year,
+               EXTRACT(month FROM created_date)::integer AS period,
+               forecast_category AS category,
+               SUM(CASE WHEN forecast_category != 'omit'
+                        THEN amount * probability / 100.0 ELSE 0.0 END) AS amount,
+               COUNT(*) AS row_count
+        FROM opportunity
+        GROUP BY client_id, EXTRACT(year FROM created_date), EXTRACT(month FROM created_date), forecast_category
+    """
+}
+
+
+def _rollup_table(name):
+    """Lightweight table construct for querying a rollup view"""
+    return table(
+        name,
+        column('client_id'),
+        column('fiscal_year'),
+        column('period'),
+        column('category'),
+        column('amount'),
+        column('row_count')
+    )
+
+
+revenue_monthly_rollup = _rollup_table('rollup_revenue_monthly')
+win_quarterly_rollup = _rollup_table('rollup_win_quarterly')
+signing_category_rollup = _rollup_table('rollup_signing_category')
+pipeline_category_rollup = _rollup_table('rollup_pipeline_category')
+
+
+# Cached freshness check, so requests don't query the state table every time
+_state_lock = threading.Lock()
+_fresh_state = {'checked_at': None, 'fresh': False}
+
+# Set by rollup_source() for the current thread/context: None, True or False
+_source_override = ContextVar('rollup_source_override', default=None)
+
+
+def refresh_rollups(concurrently=True):
+    """
+    Refresh every rollup view
+
+    Args:
+        concurrently: Use REFRESH ... CONCURRENTLY so readers are not blocked
+
+    Returns:
+        Dictionary mapping each view name to its refresh time in seconds
+    """
+    timings = {}
+    keyword = 'CONCURRENTLY ' if concurrently else ''
+    for name in ROLLUP_DEFINITIONS:
+        started = time.perf_counter()
+        with db.engine.begin() as connection:
+            connection.execute(text(f"REFRESH MATERIALIZED VIEW {keyword}{name}"))
+            _record_refresh(connection, name)
+        timings[name] = round(time.perf_counter() - started, 3)
+        logging.info(f"Refreshed rollup {name} in {timings[name]}s")
+    invalidate_rollup_state()
+    return timings
+
+
+def _record_refresh(connection, name):
+    """Store the refresh time of a rollup"""
+    connection.execute(text("""
+        INSERT INTO rollup_refresh_state (rollup_name, refreshed_at)
+        VALUES (:name, :refreshed_at)
+        ON CONFLICT (rollup_name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+    """), {'name': name, 'refreshed_at': datetime.now(timezone.utc)})
+
+
+def invalidate_rollup_state():
+    """Force the next rollups_are_fresh() call to re-read the refresh state"""
+    with _state_lock:
+        _fresh_state['checked_at'] = None
+
+
+@contextmanager
+def rollup_source(use_rollups):
+    """
+    Pin the answer of rollups_are_fresh() inside the block
+
+    Args:
+        use_rollups: True to read the rollups, False to read the raw tables
+    """
+    token = _source_override.set(bool(use_rollups))
+    try:
+        yield
+    finally:
+        _source_override.reset(token)
+
+
+def rollups_are_fresh():
+    """
+    Check whether the rollups can be used for reads
+
+    Returns:
+        True if rollups are enabled and every rollup was refreshed within
+        ROLLUP_MAX_AGE seconds, or the value pinned by rollup_source().
+        Missing views count as stale.
+    """
+    if not current_app.config.get('ROLLUPS_ENABLED', True):
+        return False
+    override = _source_override.get()
+    if override is not None:
+        return override
+
+    check_interval = current_app.config.get('ROLLUP_STATE_CHECK_INTERVAL', 30)
+    now = time.monotonic()
+    with _state_lock:
+        checked_at = _fresh_state['checked_at']
+        if checked_at is not None and now - checked_at < check_interval:
+            return _fresh_state['fresh']
+
+    fresh = _read_rollup_freshness(current_app.config.get('ROLLUP_MAX_AGE', 900))
+
+    with _state_lock:
+        _fresh_state['checked_at'] = now
+        _fresh_state['fresh'] = fresh
+    return fresh
+
+
+def _read_rollup_freshness(max_age):
+    """Read the refresh state table on its own connection, outside the request session"""
+    try:
+        with db.engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT rollup_name, refreshed_at FROM rollup_refresh_state"
+            )).all()
+    except Exception as e:
+        logging.warning(f"Rollup state unavailable, using raw tables: {str(e)}")
+        return False
+
+    refreshed = {name: refreshed_at for name, refreshed_at in rows}
+    if any(name not in refreshed for name in ROLLUP_DEFINITIONS):
+        return False
+
+    oldest = min(refreshed[name] for name in ROLLUP_DEFINITIONS)
+    age = (datetime.now(timezone.utc) - oldest).total_seconds()
+    return age <= max_age
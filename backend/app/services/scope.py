@@ -0,0 +1,268 @@
+"""
+Scope Resolution Service
+
+This module resolves which account executives and clients a user is allowed
+to see. Directors see the clients of every account executive they manage,
+account executives see only their own clients.
+
+Scopes can be applied to queries with one of two strategies, selected by
+the SCOPE_STRATEGY config setting:
+- 'subquery': the client filter is a subquery on client.account_executive_id
+  and directoraccountexecutive, so no client ID list is loaded into Python
+- 'id-list': client IDs are loaded once and sent back as an IN list
+
+Resolved scopes are kept in a versioned in-process cache. The version is
+bumped when a transaction that changed a DirectorAccountExecutive row or
+moved a client to a different account executive commits, which
+invalidates every cached scope. Bumping at commit rather than at flush
+keeps a concurrent request from caching the pre-commit rows under the
+new version.
+A TTL guards against changes made outside of this process.
+"""
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event, inspect, select, false
+from sqlalchemy.orm import Session, object_session
+from ..models.models import db, Client, DirectorAccountExecutive
+
+SCOPE_STRATEGIES = ('subquery', 'id-list')
+
+
+class UserScope:
+    """
+    The set of account executives and clients visible to a user.
+
+    Attributes:
+        user_id: ID of the user the scope was resolved for
+        role: Role of the user ('director', 'account-executive', ...)
+        ae_ids: Tuple of account executive IDs in scope
+        client_ids: Tuple of client IDs in scope, or None with the
+            'subquery' strategy
+        has_clients: True if at least one client is in scope
+        strategy: How client_filter() and ae_filter() express the scope
+        version: Scope cache version the scope was resolved at
+    """
+
+    def __init__(self, user_id, role, ae_ids, client_ids, has_clients, strategy, version):
+        self.user_id = user_id
+        self.role = role
+        self.ae_ids = tuple(ae_ids)
+        self.client_ids = tuple(client_ids) if client_ids is not None else None
+        self.has_clients = has_clients
+        self.strategy = strategy
+        self.version = version
+
+    def client_filter(self, column):
+        """
+        Build a filter restricting a client_id column to this scope
+
+        Args:
+            column: A client_id column, e.g. Revenue.client_id
+
+        Returns:
+            SQLAlchemy boolean clause
+        """
+        if self.role not in ('director', 'account-executive'):
+            return false()
+        if self.strategy == 'id-list':
+            return column.in_(self.client_ids)
+        return column.in_(_scoped_client_ids(self.role, self.user_id))
+
+    def ae_filter(self, column):
+        """
+        Build a filter restricting an account executive column to this scope
+
+        Args:
+            column: An account executive ID column, e.g. Client.account_executive_id
+
+        Returns:
+            SQLAlchemy boolean clause
+        """
+        if self.role == 'account-executive':
+            return column == self.user_id
+        if self.role != 'director':
+            return false()
+        if self.strategy == 'id-list':
+            return column.in_(self.ae_ids)
+        return column.in_(_scoped_ae_ids(self.user_id))
+
+
+# Cache state shared by every request handled by this process
+_cache_lock = threading.Lock()
+_scope_cache = {}  # (strategy, role, user_id) -> (version, resolved_at, UserScope)
+_scope_version = 0
+
+
+def get_scope_version():
+    """Return the current scope cache version"""
+    return _scope_version
+
+
+def invalidate_scope_cache():
+    """Bump the scope version and drop every cached scope"""
+    global _scope_version
+    with _cache_lock:
+        _scope_version += 1
+        _scope_cache.clear()
+
+
+def get_scope_strategy():
+    """Return the configured scope strategy ('subquery' or 'id-list')"""
+    strategy = current_app.config.get('SCOPE_STRATEGY', 'subquery')
+    if strategy not in SCOPE_STRATEGIES:
+        raise ValueError(f"Unknown SCOPE_STRATEGY: {strategy}")
+    return strategy
+
+
+def resolve_user_scope(user, strategy=None):
+    """
+    Resolve the scope for a user based on their role
+
+    Args:
+        user: Any object with user_id and role attributes
+        strategy: Override for the configured scope strategy (optional)
+
+    Returns:
+        UserScope for the user. Roles other than director and
+        account-executive get an empty scope.
+    """
+    if user.role == 'director':
+        return get_director_scope(user.user_id, strategy)
+    if user.role == 'account-executive':
+        return get_ae_scope(user.user_id, strategy)
+    return UserScope(user.user_id, user.role, (), (), False,
+                     strategy or get_scope_strategy(), _scope_version)
+
+
+def get_director_scope(director_id, strategy=None):
+    """Get the account executives and clients managed by a director"""
+    return _get_cached_scope('director', director_id, strategy, _load_director_scope)
+
+
+def get_ae_scope(ae_id, strategy=None):
+    """Get the clients managed by an account executive"""
+    return _get_cached_scope('account-executive', ae_id, strategy, _load_ae_scope)
+
+
+def _get_cached_scope(role, user_id, strategy, loader):
+    """Return a cached scope if still valid, otherwise load and cache it"""
+    strategy = strategy or get_scope_strategy()
+    key = (strategy, role, user_id)
+    ttl = current_app.config.get('SCOPE_CACHE_TTL', 300)
+    now = time.monotonic()
+
+    with _cache_lock:
+        version = _scope_version
+        entry = _scope_cache.get(key)
+        if entry and entry[0] == version and now - entry[1] < ttl:
+            return entry[2]
+
+    scope = loader(user_id, strategy, version)
+
+    with _cache_lock:
+        # Only store the result if nothing changed while we were loading
+        if version == _scope_version:
+            _scope_cache[key] = (version, now, scope)
+
+    return scope
+
+
+def _scoped_ae_ids(director_id):
+    """Subquery selecting the account executive IDs managed by a director"""
+    return select(DirectorAccountExecutive.account_executive_id).where(
+        DirectorAccountExecutive.director_id == director_id
+    )
+
+
+def _scoped_client_ids(role, user_id):
+    """Subquery selecting the client IDs visible to a director or account executive"""
+    if role == 'director':
+        return select(Client.client_id).where(
+            Client.account_executive_id.in_(_scoped_ae_ids(user_id))
+        )
+    return select(Client.client_id).where(Client.account_executive_id == user_id)
+
+
+def _load_director_scope(director_id, strategy, version):
+    """Load a director's scope from the database"""
+    ae_relations = DirectorAccountExecutive.query.filter_by(director_id=director_id).all()
+    ae_ids = [relation.account_executive_id for relation in ae_relations]
+
+    if strategy == 'id-list':
+        client_ids = []
+        if ae_ids:
+            rows = Client.query.with_entities(Client.client_id).filter(
+                Client.account_executive_id.in_(ae_ids)
+            ).all()
+            client_ids = [client_id for (client_id,) in rows]
+        has_clients = bool(client_ids)
+    else:
+        client_ids = None
+        has_clients = bool(ae_ids) and _exists_client('director', director_id)
+
+    return UserScope(director_id, 'director', ae_ids, client_ids, has_clients, strategy, version)
+
+
+def _load_ae_scope(ae_id, strategy, version):
+    """Load an account executive's scope from the database"""
+    if strategy == 'id-list':
+        rows = Client.query.with_entities(Client.client_id).filter_by(
+            account_executive_id=ae_id
+        ).all()
+        client_ids = [client_id for (client_id,) in rows]
+        has_clients = bool(client_ids)
+    else:
+        client_ids = None
+        has_clients = _exists_client('account-executive', ae_id)
+
+    return UserScope(ae_id, 'account-executive', [ae_id], client_ids, has_clients, strategy, version)
+
+
+def _exists_client(role, user_id):
+    """Check whether any client is in scope without loading the client IDs"""
+    return bool(db.session.scalar(
+        select(_scoped_client_ids(role, user_id).exists())
+    ))
+
+
+# ORM event hooks that keep the cache coherent with writes made through this process.
+# Flush-time hooks only mark the session; the cache is invalidated once the
+# transaction commits.
+
+def _mark_scope_changed(target):
+    session = object_session(target)
+    if session is not None:
+        session.info['scope_changed'] = True
+
+
+@event.listens_for(DirectorAccountExecutive, 'after_insert')
+@event.listens_for(DirectorAccountExecutive, 'after_update')
+@event.listens_for(DirectorAccountExecutive, 'after_delete')
+def _on_director_ae_change(mapper, connection, target):
+    _mark_scope_changed(target)
+
+
+@event.listens_for(Client, 'after_insert')
+@event.listens_for(Client, 'after_delete')
+def _on_client_added_or_removed(mapper, connection, target):
+    _mark_scope_changed(target)
+
+
+@event.listens_for(Client, 'after_update')
+def _on_client_update(mapper, connection, target):
+    # Only a change of account executive moves a client between scopes
+    if inspect(target).attrs.account_executive_id.history.has_changes():
+        _mark_scope_changed(target)
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    if session.info.pop('scope_changed', False):
+        invalidate_scope_cache()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    # Nothing was committed, so cached scopes are still valid
+    session.info.pop('scope_changed', None)
@@ -0,0 +1,219 @@
+"""
+Target Attainment Service
+
+This module compares actuals against the yearly targets of account
+executives, broken down by quarter. A quarter's target is the yearly target
+amount multiplied by that quarter's percentage in QuarterlyTarget.
+
+Each metric is computed with a single statement: actuals grouped by account
+executive and quarter are full-joined with the quarterly target amounts of
+the same account executives. Results are cached per (metric, scope, year)
+and dropped when any of the tables they are derived from changes.
+"""
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, func, case, and_, extract
+from ..models.models import (
+    db, Client, Revenue, Signing, Win, Opportunity, YearlyTarget, QuarterlyTarget
+)
+from .data_version import get_data_version, VersionedCache
+
+# Target types stored in YearlyTarget.target_type
+TARGET_METRICS = ('revenue', 'signings', 'wins', 'pipeline')
+
+# Tables each metric's attainment is derived from
+METRIC_TABLES = {
+    'revenue': ('revenue',),
+    'signings': ('signing',),
+    'wins': ('win',),
+    'pipeline': ('opportunity',)
+}
+TARGET_TABLES = ('yearlytarget', 'quarterlytarget', 'client', 'directoraccountexecutive')
+
+_attainment_cache = VersionedCache()
+
+
+def build_actuals_query(scope, metric, year):
+    """
+    Build the query for a metric's actuals per account executive and quarter
+
+    Args:
+        scope: UserScope of a director or account executive
+        metric: One of TARGET_METRICS
+        year: The fiscal year to calculate for
+
+    Returns:
+        Select with (account_executive_id, quarter, value) rows
+    """
+    if metric == 'revenue':
+        value, client_column = Revenue.amount, Revenue.client_id
+        quarter = Revenue.fiscal_quarter
+        year_filter = Revenue.fiscal_year == year
+    elif metric == 'signings':
+        value, client_column = Signing.annualized_value, Signing.client_id
+        quarter = Signing.fiscal_quarter
+        year_filter = Signing.fiscal_year == year
+    elif metric == 'wins':
+        value, client_column = Win.win_multiplier, Win.client_id
+        quarter = Win.fiscal_quarter
+        year_filter = Win.fiscal_year == year
+    elif metric == 'pipeline':
+        # Weighted amount of non-omitted opportunities, by creation date
+        value = case(
+            (Opportunity.forecast_category != 'omit',
+             Opportunity.amount * Opportunity.probability / 100.0),
+            else_=0.0
+        )
+        client_column = Opportunity.client_id
+        quarter = extract('quarter', Opportunity.created_date)
+        year_filter = and_(
+            Opportunity.created_date >= datetime(year, 1, 1),
+            Opportunity.created_date < datetime(year + 1, 1, 1)
+        )
+    else:
+        raise ValueError(f"Unknown target metric: {metric}")
+
+    return select(
+        Client.account_executive_id.label('account_executive_id'),
+        quarter.label('quarter'),
+        func.sum(value).label('value')
+    ).join_from(
+        client_column.class_, Client, Client.client_id == client_column
+    ).where(
+        scope.ae_filter(Client.account_executive_id),
+        year_filter
+    ).group_by(
+        Client.account_executive_id, quarter
+    )
+
+
+def build_targets_query(scope, metric, year):
+    """
+    Build the query for the quarterly target amounts per account executive
+
+    Returns:
+        Select with (account_executive_id, quarter, target) rows
+    """
+    return select(
+        YearlyTarget.user_id.label('account_executive_id'),
+        QuarterlyTarget.fiscal_quarter.label('quarter'),
+        func.sum(YearlyTarget.amount * QuarterlyTarget.percentage / 100.0).label('target')
+    ).join(
+        QuarterlyTarget, QuarterlyTarget.target_id == YearlyTarget.target_id
+    ).where(
+        scope.ae_filter(YearlyTarget.user_id),
+        YearlyTarget.fiscal_year == year,
+        YearlyTarget.target_type == metric
+    ).group_by(
+        YearlyTarget.user_id, QuarterlyTarget.fiscal_quarter
+    )
+
+
+def query_quarterly_attainment(scope, metric, year):
+    """
+    Load actuals and targets per account executive and quarter in one statement
+
+    Returns:
+        Dictionary mapping account executive ID to {quarter: (actual, target)}
+    """
+    actuals = build_actuals_query(scope, metric, year).cte('actuals')
+    targets = build_targets_query(scope, metric, year).cte('targets')
+
+    query = select(
+        func.coalesce(actuals.c.account_executive_id, targets.c.account_executive_id),
+        func.coalesce(actuals.c.quarter, targets.c.quarter),
+        func.coalesce(actuals.c.value, 0.0),
+        func.coalesce(targets.c.target, 0.0)
+    ).select_from(
+        actuals.join(
+            targets,
+            and_(
+                actuals.c.account_executive_id == targets.c.account_executive_id,
+                actuals.c.quarter == targets.c.quarter
+            ),
+            full=True
+        )
+    )
+
+    by_ae = {}
+    for ae_id, quarter, actual, target in db.session.execute(query):
+        quarters = by_ae.setdefault(ae_id, {})
+        quarters[int(quarter)] = (float(actual), float(target))
+    return by_ae
+
+
+def accumulate_quarters(quarters):
+    """
+    Turn per-quarter (actual, target) pairs into year-to-date attainment
+
+    Args:
+        quarters: Dictionary mapping quarter (1-4) to (actual, target)
+
+    Returns:
+        List of dictionaries with quarter, accumulated_value (year-to-date
+        target), actual_value (year-to-date actuals) and achievement_percentage
+    """
+    results = []
+    actual_total = 0.0
+    target_total = 0.0
+    for quarter in range(1, 5):
+        actual, target = quarters.get(quarter, (0.0, 0.0))
+        actual_total += actual
+        target_total += target
+        achievement = (actual_total / target_total * 100) if target_total > 0 else 0.0
+        results.append({
+            "quarter": quarter,
+            "accumulated_value": round(target_total, 2),
+            "actual_value": round(actual_total, 2),
+            "achievement_percentage": round(achievement, 2)
+        })
+    return results
+
+
+def calculate_target_attainment(scope, metric, year):
+    """
+    Calculate quarterly target attainment for a scope, using the cache
+
+    Args:
+        scope: UserScope of a director or account executive
+        metric: One of TARGET_METRICS
+        year: The fiscal year to calculate for
+
+    Returns:
+        Dictionary with the scope's quarterly_targets and a per account
+        executive breakdown under account_executives
+    """
+    if metric not in TARGET_METRICS:
+        raise ValueError(f"Unknown target metric: {metric}")
+
+    key = (metric, scope.role, scope.user_id, scope.strategy, year)
+    version = (scope.version, get_data_version(*METRIC_TABLES[metric], *TARGET_TABLES))
+    ttl = current_app.config.get('TARGETS_CACHE_TTL', 300)
+
+    attainment = _attainment_cache.get(key, version, ttl)
+    if attainment is not None:
+        return attainment
+
+    by_ae = {}
+    if scope.ae_ids:
+        by_ae = query_quarterly_attainment(scope, metric, year)
+
+    # Scope totals per quarter across all account executives
+    totals = {}
+    for quarters in by_ae.values():
+        for quarter, (actual, target) in quarters.items():
+            actual_total, target_total = totals.get(quarter, (0.0, 0.0))
+            totals[quarter] = (actual_total + actual, target_total + target)
+
+    attainment = {
+        "quarterly_targets": accumulate_quarters(totals),
+        "account_executives": [
+            {
+                "account_executive_id": ae_id,
+                "quarterly_targets": accumulate_quarters(by_ae.get(ae_id, {}))
+            }
+            for ae_id in scope.ae_ids
+        ]
+    }
+    _attainment_cache.set(key, version, attainment)
+    return attainment
@@ -0,0 +1,143 @@
+"""
+Translation Cache Service
+
+This module caches the SQL generated for natural language questions by the
+/ai-insight endpoint, so asking the same question again skips the
+SQL-generation call.
+
+Questions are normalized (case, whitespace, trailing punctuation) before
+lookup. Entries live in an in-process LRU with a TTL and can optionally be
+persisted to a local SQLite file, set with AI_TRANSLATION_CACHE_PATH, so
+they survive restarts.
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+
+def normalize_question(question):
+    """Normalize a question so trivially different phrasings share a cache entry"""
+    question = re.sub(r'\s+', ' ', question.strip().lower())
+    return question.rstrip(' ?.!')
+
+
+class TranslationCache:
+    """
+    LRU cache of question -> SQL translations with a TTL.
+
+    Keys include a fingerprint of the prompt and model, so changing either
+    invalidates every cached translation.
+    """
+
+    def __init__(self, max_entries=512, ttl=86400, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (stored_at, sql)
+        if self.path:
+            self._init_store()
+
+    @staticmethod
+    def make_key(question, fingerprint):
+        """Build the cache key of a question for a prompt/model fingerprint"""
+        raw = f"{fingerprint}\n{normalize_question(question)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached SQL for a key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        entry = self._load(key)
+        if entry is None or now - entry[0] >= self.ttl:
+            return None
+        self._remember(key, entry[0], entry[1])
+        return entry[1]
+
+    def set(self, key, question, sql):
+        """Cache the SQL generated for a question"""
+        stored_at = time.time()
+        self._remember(key, stored_at, sql)
+        self._store(key, question, sql, stored_at)
+
+    def _remember(self, key, stored_at, sql):
+        with self._lock:
+            self._entries[key] = (stored_at, sql)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # SQLite persistence
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _init_store(self):
+        try:
+            with self._connect() as connection:
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS translation (
+                        cache_key TEXT PRIMARY KEY,
+                        question TEXT NOT NULL,
+                        sql TEXT NOT NULL,
+                        stored_at REAL NOT NULL
+                    )
+                """)
+                # Drop entries that expired while the process was down
+                connection.execute("DELETE FROM translation WHERE stored_at < ?", (time.time() - self.ttl,))
+        except sqlite3.Error as e:
+            logging.warning(f"Translation cache file unavailable, using memory only: {str(e)}")
+            self.path = None
+
+    def _load(self, key):
+        if not self.path:
+            return None
+        try:
+            with self._connect() as connection:
+                return connection.execute(
+                    "SELECT stored_at, sql FROM translation WHERE cache_key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Translation cache read failed: {str(e)}")
+            return None
+
+    def _store(self, key, question, sql, stored_at):
+        if not self.path:
+            return
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO translation (cache_key, question, sql, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, normalize_question(question), sql, stored_at)
+                )
+        except sqlite3.Error as e:
+            logging.warning(f"Translation cache write failed: {str(e)}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """Return the process-wide translation cache, created from config on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache(
+                max_entries=current_app.config.get('AI_TRANSLATION_CACHE_SIZE', 512),
+                ttl=current_app.config.get('AI_TRANSLATION_CACHE_TTL', 86400),
+                path=current_app.config.get('AI_TRANSLATION_CACHE_PATH') or None
+            )
+        return _cache
@@ -0,0 +1,83 @@
+"""
+Data Watermark Service
+
+This module computes a cheap watermark of the data behind an endpoint, used
+to build ETag and Last-Modified headers. The watermark of a set of tables
+is read from table_change_state (see migrations/0005_table_change_state.sql),
+whose per-table counters are bumped by triggers in the same transaction as
+every write, whichever process makes it. The watermark and Last-Modified
+therefore only depend on committed database state and are the same in
+every worker process.
+
+Watermarks are re-read at most every WATERMARK_CHECK_INTERVAL seconds per
+set of tables, which bounds how long a worker can keep answering with the
+previous watermark after a commit.
+"""
+import logging
+import threading
+import time
+from flask import current_app
+from sqlalchemy import text, bindparam
+from ..models.models import db
+
+_watermark_lock = threading.Lock()
+_watermarks = {}  # sorted table names -> (checked_at, watermark, last_modified)
+
+
+def get_data_watermark(table_names):
+    """
+    Get the watermark of a set of tables
+
+    Args:
+        table_names: Names of the tables an endpoint reads
+
+    Returns:
+        Tuple of (watermark, last_modified), where last_modified is the
+        latest change time of the tables, or None if the change state can't
+        be read or a table has no change counter
+    """
+    key = tuple(sorted(set(table_names)))
+    interval = current_app.config.get('WATERMARK_CHECK_INTERVAL', 5)
+    now = time.monotonic()
+
+    with _watermark_lock:
+        entry = _watermarks.get(key)
+        if entry and now - entry[0] < interval:
+            return entry[1], entry[2]
+
+    state = _read_change_state(key)
+    if state is None:
+        return None
+    watermark, last_modified = state
+
+    with _watermark_lock:
+        _watermarks[key] = (now, watermark, last_modified)
+    return watermark, last_modified
+
+
+def _read_change_state(table_names):
+    """Read the change counters of the tables on their own connection"""
+    query = text("""
+        SELECT table_name, change_count, changed_at
+        FROM table_change_state
+        WHERE table_name IN :names
+    """).bindparams(bindparam('names', expanding=True))
+
+    try:
+        with db.engine.connect() as connection:
+            rows = connection.execute(query, {'names': list(table_names)}).all()
+    except Exception as e:
+        logging.warning(f"Table change state unavailable, conditional GET disabled: {str(e)}")
+        return None
+
+    state = {name: (change_count, changed_at) for name, change_count, changed_at in rows}
+    missing = [name for name in table_names if name not in state]
+    if missing:
+        # Changes to an untracked table would never move the watermark
+        logging.warning(f"No change counter for {', '.join(missing)}, conditional GET disabled")
+        return None
+
+    watermark = tuple(state[name][0] for name in table_names)
+    # HTTP dates have a resolution of one second
+    last_modified = max(state[name][1] for name in table_names).replace(microsecond=0)
+    return watermark, last_modified
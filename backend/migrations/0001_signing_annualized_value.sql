@@ -0,0 +1,12 @@
+-- Persist the annualized contract value of each signing.
+--
+-- A stored generated column is computed for every existing row when it is
+-- added, which backfills the table, and is kept up to date by PostgreSQL on
+-- every insert and update. The expression must stay in sync with
+-- Signing.annualized_value in app/models/models.py.
+ALTER TABLE signing
+    ADD COLUMN IF NOT EXISTS annualized_value numeric
+    GENERATED ALWAYS AS (
+        total_contract_value /
+        GREATEST(EXTRACT(year FROM end_date) - EXTRACT(year FROM start_date) + 1, 1)
+    ) STORED;
@@ -0,0 +1,26 @@
+-- migrate: no-transaction
+--
+-- Composite indexes for the predicates used by the landing, clients and
+-- executives endpoints. The INCLUDE columns let the KPI and chart
+-- aggregates run as index-only scans. Built CONCURRENTLY so writes are not
+-- blocked, which is why this migration runs outside a transaction. An
+-- index left INVALID by a failed build is dropped and rebuilt by the next
+-- migrate run (see app/services/migrations.py).
+-- Keep in sync with the __table_args__ indexes in app/models/models.py.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_revenue_client_year
+    ON revenue (client_id, fiscal_year) INCLUDE (month, amount);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_win_client_year
+    ON win (client_id, fiscal_year) INCLUDE (fiscal_quarter, win_multiplier);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_signing_client_year
+    ON signing (client_id, fiscal_year) INCLUDE (fiscal_quarter, product_id, annualized_value);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_opportunity_client_created
+    ON opportunity (client_id, created_date) INCLUDE (forecast_category, amount, probability);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_client_account_executive
+    ON client (account_executive_id, client_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_directoraccountexecutive_director
+    ON directoraccountexecutive (director_id, account_executive_id);
@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+--
+-- Index for the (client_name, client_id) keyset pagination of the clients
+-- list. Keep in sync with the Client __table_args__ in app/models/models.py.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_client_name_id
+    ON client (client_name, client_id);
@@ -0,0 +1,19 @@
+-- migrate: no-transaction
+--
+-- Indexed lookups for the clients list filters:
+-- - industry_normalized is a stored lower(industry), so the case-insensitive
+--   industry filter is a plain indexed IN lookup
+-- - a trigram index on client_name serves the q= name search (ILIKE with
+--   leading and trailing wildcards)
+-- Keep in sync with the Client model in app/models/models.py.
+ALTER TABLE client
+    ADD COLUMN IF NOT EXISTS industry_normalized varchar(50)
+    GENERATED ALWAYS AS (lower(industry)) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_client_industry_normalized
+    ON client (industry_normalized);
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_client_name_trgm
+    ON client USING gin (client_name gin_trgm_ops);
@@ -0,0 +1,45 @@
+-- Per-table change counters for the conditional GET watermark.
+--
+-- A statement-level trigger on every table read by the API endpoints bumps
+-- the table's row in table_change_state in the same transaction as the
+-- write, so the counters are exact, survive restarts and are the same for
+-- every worker process (unlike pg_stat_user_tables, which is published with
+-- a delay and reset by pg_stat_reset). changed_at only moves forward, which
+-- makes it usable as Last-Modified. Writers to the same table serialize on
+-- its counter row until they commit.
+-- Tables passed to conditional_get (app/cache_utils.py) or read by cached
+-- /ai-insight results need a trigger here; untracked tables disable conditional GET.
+CREATE TABLE IF NOT EXISTS table_change_state (
+    table_name varchar(64) PRIMARY KEY,
+    change_count bigint NOT NULL DEFAULT 0,
+    changed_at timestamptz NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE OR REPLACE FUNCTION record_table_change() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_change_state (table_name, change_count, changed_at)
+    VALUES (TG_TABLE_NAME, 1, clock_timestamp())
+    ON CONFLICT (table_name) DO UPDATE
+        SET change_count = table_change_state.change_count + 1,
+            changed_at = GREATEST(table_change_state.changed_at, clock_timestamp());
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tracked text;
+BEGIN
+    FOREACH tracked IN ARRAY ARRAY[
+        'user', 'directoraccountexecutive', 'client', 'product', 'opportunity', 'signing',
+        'revenue', 'win', 'yearlytarget', 'quarterlytarget', 'updateevent', 'opportunityupdatelog'
+    ] LOOP
+        EXECUTE 'DROP TRIGGER IF EXISTS record_table_change ON ' || quote_ident(tracked);
+        EXECUTE 'CREATE TRIGGER record_table_change '
+            || 'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ' || quote_ident(tracked)
+            || ' FOR EACH STATEMENT EXECUTE FUNCTION record_table_change()';
+        INSERT INTO table_change_state (table_name) VALUES (tracked)
+        ON CONFLICT (table_name) DO NOTHING;
+    END LOOP;
+END;
+$$;
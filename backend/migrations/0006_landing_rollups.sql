@@ -0,0 +1,85 @@
+-- Landing page rollups: one materialized view per chart, keyed by
+-- (client_id, fiscal_year, period, category), plus rollup_refresh_state,
+-- which records when each view was last refreshed. The unique indexes are
+-- required for REFRESH MATERIALIZED VIEW CONCURRENTLY, which
+-- "python -m app.manage refresh-rollups" runs on a schedule.
+-- Keep the view definitions in sync with ROLLUP_DEFINITIONS in
+-- app/services/rollups.py.
+CREATE TABLE IF NOT EXISTS rollup_refresh_state (
+    rollup_name varchar(64) PRIMARY KEY,
+    refreshed_at timestamptz NOT NULL
+);
+
+-- Monthly revenue per client
+CREATE MATERIALIZED VIEW IF NOT EXISTS rollup_revenue_monthly AS
+    SELECT client_id,
+           fiscal_year,
+           month AS period,
+           ''::varchar AS category,
+           SUM(amount) AS amount,
+           COUNT(*) AS row_count
+    FROM revenue
+    GROUP BY client_id, fiscal_year, month;
+
+CREATE UNIQUE INDEX IF NOT EXISTS rollup_revenue_monthly_key
+    ON rollup_revenue_monthly (client_id, fiscal_year, period, category);
+
+-- Quarterly win multipliers per client and win category
+CREATE MATERIALIZED VIEW IF NOT EXISTS rollup_win_quarterly AS
+    SELECT client_id,
+           fiscal_year,
+           fiscal_quarter AS period,
+           win_category AS category,
+           SUM(win_multiplier) AS amount,
+           COUNT(*) AS row_count
+    FROM win
+    GROUP BY client_id, fiscal_year, fiscal_quarter, win_category;
+
+CREATE UNIQUE INDEX IF NOT EXISTS rollup_win_quarterly_key
+    ON rollup_win_quarterly (client_id, fiscal_year, period, category);
+
+-- Quarterly annualized signing value per client and product category
+CREATE MATERIALIZED VIEW IF NOT EXISTS rollup_signing_category AS
+    SELECT s.client_id,
+           s.fiscal_year,
+           s.fiscal_quarter AS period,
+           p.product_category AS category,
+           SUM(s.annualized_value) AS amount,
+           COUNT(*) AS row_count
+    FROM signing s
+    JOIN product p ON p.product_id = s.product_id
+    GROUP BY s.client_id, s.fiscal_year, s.fiscal_quarter, p.product_category;
+
+CREATE UNIQUE INDEX IF NOT EXISTS rollup_signing_category_key
+    ON rollup_signing_category (client_id, fiscal_year, period, category);
+
+-- Monthly weighted pipeline per client and forecast category, by creation date
+CREATE MATERIALIZED VIEW IF NOT EXISTS rollup_pipeline_category AS
+    SELECT client_id,
+           EXTRACT(year FROM created_date)::integer AS fiscal_year,
+           EXTRACT(month FROM created_date)::integer AS period,
+           forecast_category AS category,
+           SUM(CASE WHEN forecast_category != 'omit'
+                    THEN amount * probability / 100.0 ELSE 0.0 END) AS amount,
+           COUNT(*) AS row_count
+    FROM opportunity
+    GROUP BY client_id, EXTRACT(year FROM created_date), EXTRACT(month FROM created_date), forecast_category;
+
+CREATE UNIQUE INDEX IF NOT EXISTS rollup_pipeline_category_key
+    ON rollup_pipeline_category (client_id, fiscal_year, period, category);
+
+-- The views were populated when created
+INSERT INTO rollup_refresh_state (rollup_name, refreshed_at)
+VALUES ('rollup_revenue_monthly', clock_timestamp()),
+       ('rollup_win_quarterly', clock_timestamp()),
+       ('rollup_signing_category', clock_timestamp()),
+       ('rollup_pipeline_category', clock_timestamp())
+ON CONFLICT (rollup_name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at;
+
+-- Every refresh moves the conditional GET watermark (see 0005)
+DROP TRIGGER IF EXISTS record_table_change ON rollup_refresh_state;
+CREATE TRIGGER record_table_change
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rollup_refresh_state
+    FOR EACH STATEMENT EXECUTE FUNCTION record_table_change();
+INSERT INTO table_change_state (table_name) VALUES ('rollup_refresh_state')
+ON CONFLICT (table_name) DO NOTHING;
@@ -0,0 +1,104 @@
+"""
+Startup Benchmark
+
+Measures how long the backend takes to start: importing the application
+modules, creating the app and registering every blueprint. Each run is a
+fresh interpreter, so nothing is shared between measurements.
+
+Usage (from the backend directory):
+
+    python scripts/benchmark_startup.py --runs 10
+    python scripts/benchmark_startup.py --save startup_baseline.json
+    python scripts/benchmark_startup.py --baseline startup_baseline.json --max-regression 20
+
+With --baseline the script exits with status 1 when the median startup
+time is more than --max-regression percent slower than the saved median.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a child interpreter; prints import and app creation time in seconds
+STARTUP_SNIPPET = """
+import json
+import time
+
+start = time.perf_counter()
+from app.manage import create_cli_app
+from app.routes.auth import auth_bp
+from app.routes.landing import landing_bp
+from app.routes.clients import clients_bp
+from app.routes.executives import executives_bp
+from app.routes.ai import ai_bp
+imported = time.perf_counter()
+
+app = create_cli_app()
+for blueprint in (auth_bp, landing_bp, clients_bp, executives_bp, ai_bp):
+    app.register_blueprint(blueprint)
+created = time.perf_counter()
+
+print(json.dumps({'import': imported - start, 'create_app': created - imported, 'total': created - start}))
+"""
+
+
+def measure_once():
+    """Start a fresh interpreter and return its timings"""
+    result = subprocess.run(
+        [sys.executable, '-c', STARTUP_SNIPPET],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    """Min and median of each timing across runs"""
+    return {
+        key: {
+            'min': min(sample[key] for sample in samples),
+            'median': statistics.median(sample[key] for sample in samples)
+        }
+        for key in ('import', 'create_app', 'total')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure backend startup time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--save', help='Write the summary to this JSON file as a baseline')
+    parser.add_argument('--baseline', help='Compare against a summary saved with --save')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='Allowed slowdown of the median total, in percent')
+    args = parser.parse_args()
+
+    samples = [measure_once() for _ in range(args.runs)]
+    summary = summarize(samples)
+
+    for key, values in summary.items():
+        print(f"{key:<12} min {values['min'] * 1000:8.1f} ms   median {values['median'] * 1000:8.1f} ms")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        previous = baseline['total']['median']
+        current = summary['total']['median']
+        change = (current - previous) / previous * 100
+        print(f"Median total vs baseline: {change:+.1f}% ({previous * 1000:.1f} ms -> {current * 1000:.1f} ms)")
+        if change > args.max_regression:
+            print(f"Startup regressed by more than {args.max_regression:.0f}%")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
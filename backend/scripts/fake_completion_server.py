@@ -0,0 +1,107 @@
+"""
+Fake Completion Server
+
+A minimal OpenAI-compatible /v1/chat/completions server for exercising
+/ai-insight and /ai-insight/stream locally without calling OpenAI.
+
+Requests asking for SQL get FAKE_SQL back, every other request gets
+FAKE_SUMMARY, streamed word by word when "stream": true is requested.
+
+Usage (from the backend directory):
+
+    python scripts/fake_completion_server.py --port 8001 --delay 0.05
+    OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=fake flask run
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAKE_SQL = (
+    "SELECT client.client_name, SUM(revenue.amount) AS total_revenue "
+    "FROM revenue JOIN client ON revenue.client_id = client.client_id "
+    "WHERE revenue.fiscal_year = 2024 "
+    "GROUP BY client.client_name ORDER BY total_revenue DESC LIMIT 5"
+)
+FAKE_SUMMARY = "Your top clients this year were led by the largest accounts in the result."
+
+
+class CompletionHandler(BaseHTTPRequestHandler):
+    # Seconds to wait before each response or streamed token
+    delay = 0.0
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        content = FAKE_SQL if 'SQL query' in prompt else FAKE_SUMMARY
+        model = body.get('model', 'fake')
+
+        if body.get('stream'):
+            self._stream(model, content)
+        else:
+            time.sleep(self.delay)
+            self._send_json({
+                'id': 'chatcmpl-fake',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+            })
+
+    def _send_json(self, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, model, content):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+
+        words = content.split(' ')
+        for index, word in enumerate(words):
+            time.sleep(self.delay)
+            token = word if index == len(words) - 1 else word + ' '
+            self._send_chunk(model, {'content': token}, None)
+        self._send_chunk(model, {}, 'stop')
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+    def _send_chunk(self, model, delta, finish_reason):
+        chunk = {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake OpenAI-compatible completion server')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds before each response/token')
+    args = parser.parse_args()
+
+    CompletionHandler.delay = args.delay
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), CompletionHandler)
+    print(f"Fake completion server on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for check_read_only_select(), the gate in front of the SQL run
+by /ai-insight.
+
+Pure Python, no database needed.
+"""
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('sqlalchemy')
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT client.client_name, SUM(revenue.amount) AS total_revenue FROM revenue "
+    "JOIN client ON client.client_id = revenue.client_id GROUP BY client.client_name "
+    "ORDER BY total_revenue DESC LIMIT 5;",
+    "WITH t AS (SELECT COUNT(*) AS n FROM win) SELECT * FROM t",
+    "SELECT CAST(amount AS numeric(12, 2)), EXTRACT(year FROM created_date) FROM opportunity "
+    "WHERE client_id IN (SELECT client_id FROM client)",
+    "SELECT SUM(amount) FILTER (WHERE amount > 0) OVER (PARTITION BY client_id), "
+    "percentile_cont(0.5) WITHIN GROUP (ORDER BY amount) FROM opportunity",
+    "SELECT u.first_name || ' ' || u.last_name FROM \"user\" u",
+    "SELECT 'pg_sleep(10); DROP TABLE client' AS note -- delete; pg_sleep(1)",
+    "SELECT $$ ; $$ AS a, $tag$ pg_sleep(1) $tag$ AS b",
+])
+def test_accepts_read_only_queries(sql):
+    from app.services.ai_query import is_read_only_select
+
+    assert is_read_only_select(sql)
+
+
+@pytest.mark.parametrize('sql', [
+    "",
+    "DELETE FROM client",
+    "SELECT 1; DELETE FROM client",
+    "SELECT * INTO copy FROM client",
+    "WITH gone AS (DELETE FROM client RETURNING *) SELECT * FROM gone",
+    "SELECT E'\\'; DROP TABLE client; --'",
+    "SELECT 1 /* unterminated",
+    "SELECT set_config('statement_timeout', '0', false)",
+    "SELECT pg_sleep(10)",
+    "SELECT pg_sleep_for('1 hour')",
+    "SELECT pg_sleep_until('tomorrow')",
+    "SELECT pg_catalog.pg_sleep (10)",
+    "SELECT pg_sleep/**/(10)",
+    "SELECT \"pg_sleep\"(10)",
+    "SELECT lo_get(1)",
+    "SELECT lo_from_bytea(0, 'x')",
+    "SELECT lo_unlink(1)",
+    "SELECT pg_terminate_backend(1)",
+    "SELECT pg_advisory_lock(1)",
+    "SELECT * FROM generate_series(1, 1e9)",
+    "SELECT repeat('x', 1000000000)",
+    "SELECT * FROM dblink('host=elsewhere', 'SELECT 1') AS t(a int)",
+])
+def test_rejects_unsafe_queries(sql):
+    from app.services.ai_query import UnsafeQuery, check_read_only_select, is_read_only_select
+
+    assert not is_read_only_select(sql)
+    with pytest.raises(UnsafeQuery):
+        check_read_only_select(sql)
+
+
+def test_accepts_every_template():
+    from app.services.ai_query import is_read_only_select
+    from app.services.question_templates import match_question
+
+    for question in (
+        'top 5 clients by revenue in 2023',
+        'wins by AE this quarter',
+        'top 3 reps by revenue last year',
+        'total revenue in 2024',
+    ):
+        match = match_question(question)
+        assert match is not None, question
+        assert is_read_only_select(match.sql), match.sql
+
+
+def test_reports_the_disallowed_function():
+    from app.services.ai_query import UnsafeQuery, check_read_only_select
+
+    with pytest.raises(UnsafeQuery, match='PG_SLEEP_FOR'):
+        check_read_only_select("SELECT pg_sleep_for('1 hour')")
@@ -0,0 +1,54 @@
+"""
+Compile check for the client facet query: GROUPING SETS must include the
+empty grouping set for the grand total, rendered as "()".
+
+Needs no database; the query is compiled with the PostgreSQL dialect.
+"""
+import re
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+
+class Principal:
+    def __init__(self, user_id, role):
+        self.user_id = user_id
+        self.role = role
+
+
+@pytest.fixture
+def app():
+    from flask import Flask
+    from app.models.models import db
+
+    app = Flask(__name__)
+    # Never connected to, the query is only compiled
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    with app.app_context():
+        yield app
+
+
+def compile_postgresql(query):
+    from sqlalchemy.dialects import postgresql
+
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+    return re.sub(r'\s+', ' ', sql)
+
+
+def test_facet_query_renders_grand_total_grouping_set(app):
+    from app.routes.clients import build_client_facet_query
+
+    query, applied_filters = build_client_facet_query(
+        Principal(2, 'account-executive'), provinces=['ON'], industries=['Retail'], search='acme'
+    )
+    sql = compile_postgresql(query)
+
+    assert re.search(
+        r'GROUP BY GROUPING SETS ?\( ?\(client\.province\) ?, ?\(client\.industry\) ?, ?'
+        r'\(client\.province, client\.industry\) ?, ?\(\) ?\)',
+        sql
+    ), sql
+    assert 'JOIN' not in sql
+    assert applied_filters == {'provinces': ['ON'], 'industries': ['Retail'], 'q': 'acme'}
@@ -0,0 +1,107 @@
+"""
+The combined dashboard must read the rollup views when they are fresh, for
+the KPI cards as well as the charts, and return the same values as the raw
+tables.
+
+Runs against a disposable PostgreSQL database given by TEST_DATABASE_URL,
+seeded like test_kpi_single_query.py, with migrations 0005 and 0006 applied
+to create the change counters and the rollup views. Skipped when the
+variable is not set.
+"""
+import os
+import re
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+from test_kpi_single_query import YEAR, Principal, seed_data  # noqa: E402
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL is not set')
+
+MIGRATIONS = ('0005_table_change_state.sql', '0006_landing_rollups.sql')
+
+# Raw tables the dashboard sections read when the rollups are not used
+RAW_TABLE_READ = re.compile(r'\b(?:FROM|JOIN)\s+(?:revenue|win|signing|opportunity)\b', re.IGNORECASE)
+
+
+def drop_migration_objects(db):
+    from app.services.rollups import ROLLUP_DEFINITIONS
+
+    with db.engine.begin() as connection:
+        for name in ROLLUP_DEFINITIONS:
+            connection.exec_driver_sql(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
+        connection.exec_driver_sql("DROP TABLE IF EXISTS rollup_refresh_state, table_change_state")
+        connection.exec_driver_sql("DROP FUNCTION IF EXISTS record_table_change() CASCADE")
+
+
+@pytest.fixture(scope='module')
+def app():
+    from flask import Flask
+    from app.models.models import db
+    from app.services.migrations import MIGRATIONS_DIR
+
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=TEST_DATABASE_URL,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        ROLLUPS_ENABLED=True,
+        LANDING_DASHBOARD_WORKERS=1
+    )
+    db.init_app(app)
+
+    with app.app_context():
+        drop_migration_objects(db)
+        db.drop_all()
+        db.create_all()
+        seed_data(db)
+        # The rollup views are populated from the seeded rows when created
+        with db.engine.begin() as connection:
+            for name in MIGRATIONS:
+                with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                    connection.exec_driver_sql(f.read())
+        yield app
+        db.session.remove()
+        drop_migration_objects(db)
+        db.drop_all()
+
+
+def compute_dashboard(scope):
+    from app.routes.landing import DASHBOARD_PARTS, compute_dashboard_parts
+
+    return compute_dashboard_parts(scope, YEAR, list(DASHBOARD_PARTS))
+
+
+def test_default_dashboard_reads_rollups_when_fresh(app):
+    from app.services.query_plans import capture_statements
+    from app.services.rollups import ROLLUP_DEFINITIONS, invalidate_rollup_state, rollups_are_fresh
+    from app.services.scope import resolve_user_scope
+
+    scope = resolve_user_scope(Principal(1, 'director'), 'subquery')
+    invalidate_rollup_state()
+    assert rollups_are_fresh()
+
+    result = {}
+    statements = capture_statements(lambda: result.update(compute_dashboard(scope)))
+    sql = '\n'.join(statement for statement, parameters in statements)
+
+    assert result['kpis']['revenue'] > 0
+    for name in ROLLUP_DEFINITIONS:
+        assert name in sql
+    assert not RAW_TABLE_READ.search(sql), sql
+
+
+@pytest.mark.parametrize('user_id, role', [(1, 'director'), (2, 'account-executive'), (5, 'admin')])
+def test_rollup_dashboard_matches_raw_tables(app, user_id, role):
+    from app.services.rollups import invalidate_rollup_state, rollup_source
+    from app.services.scope import resolve_user_scope
+
+    scope = resolve_user_scope(Principal(user_id, role), 'subquery')
+    invalidate_rollup_state()
+
+    from_rollups = compute_dashboard(scope)
+    with rollup_source(False):
+        from_raw = compute_dashboard(scope)
+
+    assert from_rollups == from_raw
@@ -0,0 +1,153 @@
+"""
+Regression test: the single-statement KPI query must match the per-metric queries.
+
+Runs against a disposable PostgreSQL database given by TEST_DATABASE_URL;
+every table is created at the start and dropped at the end. Skipped when
+the variable is not set. Run from the backend directory:
+
+    TEST_DATABASE_URL=postgresql://localhost/sales_test python -m pytest tests
+"""
+import os
+from datetime import date, datetime
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL is not set')
+
+YEAR = 2024
+
+
+@pytest.fixture(scope='module')
+def app():
+    from flask import Flask
+    from app.models.models import db
+
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=TEST_DATABASE_URL,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        ROLLUPS_ENABLED=False
+    )
+    db.init_app(app)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_data(db)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def seed_data(db):
+    """A director with two AEs, a third unmanaged AE and an admin, with activity across years"""
+    from app.models.models import (
+        User, DirectorAccountExecutive, Client, Product, Opportunity, Signing, Revenue, Win
+    )
+
+    users = [
+        User(user_id=1, username='director', email='d@example.com', role='director', hashed_password='x'),
+        User(user_id=2, username='ae1', email='ae1@example.com', role='account-executive', hashed_password='x'),
+        User(user_id=3, username='ae2', email='ae2@example.com', role='account-executive', hashed_password='x'),
+        User(user_id=4, username='ae3', email='ae3@example.com', role='account-executive', hashed_password='x'),
+        User(user_id=5, username='admin', email='admin@example.com', role='admin', hashed_password='x'),
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add_all([
+        DirectorAccountExecutive(account_executive_id=2, director_id=1),
+        DirectorAccountExecutive(account_executive_id=3, director_id=1),
+    ])
+    db.session.add_all([
+        Client(client_id=client_id, client_name=f'Client {client_id}', account_executive_id=ae_id,
+               created_date=date(2020, 1, 1))
+        for client_id, ae_id in ((1, 2), (2, 2), (3, 3), (4, 4))
+    ])
+    db.session.add(Product(product_id=1, product_name='Compute', product_category='gcp'))
+    db.session.flush()
+
+    opportunity_id = 0
+    for client_id in (1, 2, 3, 4):
+        for year, category, created in (
+            (YEAR, 'pipeline', datetime(YEAR, 3, 15, 10, 0)),
+            (YEAR, 'omit', datetime(YEAR, 6, 1, 9, 30)),
+            (YEAR, 'commit', datetime(YEAR, 12, 31, 23, 59, 59)),
+            (YEAR - 1, 'upside', datetime(YEAR - 1, 12, 31, 12, 0)),
+        ):
+            opportunity_id += 1
+            db.session.add(Opportunity(
+                opportunity_id=opportunity_id, opportunity_name=f'Opportunity {opportunity_id}',
+                client_id=client_id, product_id=1, forecast_category=category, sales_stage='qualify',
+                close_date=date(year, 12, 31), probability=25 * client_id,
+                amount=1000 * opportunity_id + 0.5, created_date=created, last_modified_date=created
+            ))
+            db.session.flush()
+
+            db.session.add(Signing(
+                signing_id=opportunity_id, opportunity_id=opportunity_id, client_id=client_id, product_id=1,
+                total_contract_value=12000 + opportunity_id, incremental_acv=4000,
+                start_date=date(year, 1, 1), end_date=date(year + 2, 12, 31), signing_date=date(year, 2, 1),
+                fiscal_year=year, fiscal_quarter=1
+            ))
+            db.session.flush()
+            for month in (1, 7):
+                db.session.add(Revenue(
+                    opportunity_id=opportunity_id, client_id=client_id, signing_id=opportunity_id, product_id=1,
+                    fiscal_year=year, fiscal_quarter=(month - 1) // 3 + 1, month=month,
+                    amount=250.25 * opportunity_id
+                ))
+            db.session.add(Win(
+                client_id=client_id, opportunity_id=opportunity_id, product_id=1, win_category='gcp',
+                win_level=1, win_multiplier=0.5 if opportunity_id % 2 else 1.0,
+                fiscal_year=year, fiscal_quarter=2
+            ))
+    db.session.commit()
+
+
+class Principal:
+    def __init__(self, user_id, role):
+        self.user_id = user_id
+        self.role = role
+
+
+def per_metric_kpis(landing, scope, year):
+    return {
+        'pipeline': landing.calculate_pipeline_kpi(scope, year),
+        'revenue': landing.calculate_revenue_kpi(scope, year),
+        'signings': landing.calculate_signings_kpi(scope, year),
+        'wins': landing.calculate_wins_kpi(scope, year),
+    }
+
+
+@pytest.mark.parametrize('strategy', ['subquery', 'id-list'])
+@pytest.mark.parametrize('user_id, role', [(1, 'director'), (2, 'account-executive'), (5, 'admin')])
+@pytest.mark.parametrize('year', [YEAR, YEAR - 1, YEAR + 1])
+def test_single_query_matches_per_metric(app, strategy, user_id, role, year):
+    from app.routes import landing
+    from app.services.scope import resolve_user_scope
+
+    scope = resolve_user_scope(Principal(user_id, role), strategy)
+
+    assert landing.calculate_kpis_single_query(scope, year) == pytest.approx(
+        per_metric_kpis(landing, scope, year)
+    )
+
+
+@pytest.mark.parametrize('user_id, role', [(1, 'director'), (2, 'account-executive')])
+def test_fallback_matches_single_query(app, monkeypatch, user_id, role):
+    from app.routes import landing
+    from app.services.scope import resolve_user_scope
+
+    scope = resolve_user_scope(Principal(user_id, role), 'subquery')
+    expected = landing.calculate_kpis_single_query(scope, YEAR)
+    assert expected['revenue'] > 0
+
+    def failing_single_query(scope, year):
+        raise RuntimeError('single query unavailable')
+
+    monkeypatch.setattr(landing, 'calculate_kpis_single_query', failing_single_query)
+
+    assert landing.calculate_kpis_for_clients(scope, YEAR) == pytest.approx(expected)
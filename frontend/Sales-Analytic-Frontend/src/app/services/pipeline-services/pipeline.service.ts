@@ -20,8 +20,9 @@ export class PipelineService {
   }
 
   getQuarterlyTargets(username: string, year: number = 2024): Observable<any> {
-    const params = new HttpParams().set('username', username).set('year', year);
-    return this.http.get(`${this.baseUrl}/pipeline-quarterly-targets`, { params });
+    const params = new HttpParams().set('username', username).set('year', year).set('metric', 'pipeline');
+    // Served by the shared target attainment endpoint
+    return this.http.get(`${environment.apiUrl}/api/executives/quarterly-targets`, { params });
   }
 
   getHeatmapData(username: string, year: number = 2024): Observable<any> {
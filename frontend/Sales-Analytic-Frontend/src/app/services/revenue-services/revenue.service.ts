@@ -36,7 +36,8 @@ export class RevenueService {
   }
 
   getRevenueQuarterlyTargets(username: string, year = 2024): Observable<any> {
-    const params = new HttpParams().set('username', username).set('year', year.toString());
-    return this.http.get(`${this.baseUrl}/revenue-quarterly-targets`, { params });
+    const params = new HttpParams().set('username', username).set('year', year.toString()).set('metric', 'revenue');
+    // Served by the shared target attainment endpoint
+    return this.http.get(`${environment.apiUrl}/api/executives/quarterly-targets`, { params });
   }
 }
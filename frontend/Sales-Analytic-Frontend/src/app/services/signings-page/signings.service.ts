@@ -30,7 +30,8 @@ export class SigningsService {
   }
 
   getQuarterlyTargets(username: string, year = 2024): Observable<any> {
-    const params = new HttpParams().set('username', username).set('year', year.toString());
-    return this.http.get(`${this.baseUrl}/signings-quarterly-targets`, { params });
+    const params = new HttpParams().set('username', username).set('year', year.toString()).set('metric', 'signings');
+    // Served by the shared target attainment endpoint
+    return this.http.get(`${environment.apiUrl}/api/executives/quarterly-targets`, { params });
   }
 }
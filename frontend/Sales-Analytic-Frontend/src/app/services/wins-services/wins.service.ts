@@ -17,8 +17,9 @@ export class WinsService {
   }
 
   getWinsQuarterlyTargets(username: string, year = 2024): Observable<any> {
-    const params = new HttpParams().set('username', username).set('year', year);
-    return this.http.get(`${this.baseUrl}/wins-quarterly-targets`, { params });
+    const params = new HttpParams().set('username', username).set('year', year).set('metric', 'wins');
+    // Served by the shared target attainment endpoint
+    return this.http.get(`${environment.apiUrl}/api/executives/quarterly-targets`, { params });
   }
 
   getWinsCategoryDistribution(username: string, year = 2024): Observable<any> {